@@ -0,0 +1,29 @@
+"""add product_image status
+
+Revision ID: 0b3d8e6f2a19
+Revises: f4a7c2e91b58
+Create Date: 2026-10-18 17:05:52.390416
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b3d8e6f2a19'
+down_revision: Union[str, Sequence[str], None] = 'f4a7c2e91b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - ảnh đã có đều đã upload xong -> 'ready'"""
+    op.add_column('product_image', sa.Column('status', sqlmodel.sql.sqltypes.AutoString(), server_default='ready', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('product_image', 'status')
@@ -0,0 +1,99 @@
+"""add product search_text
+
+Revision ID: 3f8a61d5c9e7
+Revises: e2b94c07d1f3
+Create Date: 2026-10-18 13:48:19.630254
+
+"""
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8a61d5c9e7'
+down_revision: Union[str, Sequence[str], None] = 'e2b94c07d1f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+# Chép cố định từ app.utils.text lúc viết migration - migration không phụ thuộc code app
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize_text(text: str | None) -> str:
+    """Bỏ dấu tiếng Việt (cả đ/Đ), lowercase, tách từ rồi nối bằng 1 khoảng trắng"""
+    if not text:
+        return ""
+    text = text.replace("đ", "d").replace("Đ", "D")
+    decomposed = unicodedata.normalize("NFD", text)
+    text = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(TOKEN_RE.findall(text.lower()))
+
+
+def build_search_text(*parts: str | None) -> str:
+    return " ".join(filter(None, (normalize_text(p) for p in parts)))
+
+
+def upgrade() -> None:
+    """Upgrade schema - thêm cột search_text (không dấu) và backfill theo batch"""
+    op.add_column('product', sa.Column('search_text', sa.Text(), nullable=True))
+
+    # Backfill: đọc theo keyset trên id, mỗi batch BATCH_SIZE dòng
+    connection = op.get_bind()
+    product = sa.table(
+        'product',
+        sa.column('id', sa.Uuid()),
+        sa.column('name', sa.String()),
+        sa.column('description', sa.String()),
+        sa.column('search_text', sa.Text()),
+    )
+    last_id = None
+    while True:
+        query = sa.select(product.c.id, product.c.name, product.c.description)
+        if last_id is not None:
+            query = query.where(product.c.id > last_id)
+        rows = connection.execute(query.order_by(product.c.id).limit(BATCH_SIZE)).all()
+        if not rows:
+            break
+        connection.execute(
+            product.update().where(product.c.id == sa.bindparam('b_id')),
+            [
+                {'b_id': row.id, 'search_text': build_search_text(row.name, row.description)}
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+    # FULLTEXT (ngram để giữ các từ 2 ký tự như "ao", "do") thay cho index trên name/description
+    if connection.dialect.name == 'mysql':
+        op.drop_index('ft_product_name_description', table_name='product')
+        op.create_index(
+            'ft_product_search_text',
+            'product',
+            ['search_text'],
+            unique=False,
+            mysql_prefix='FULLTEXT',
+            mysql_with_parser='ngram',
+        )
+    else:
+        op.create_index('ft_product_search_text', 'product', ['search_text'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ft_product_search_text', table_name='product')
+    if op.get_bind().dialect.name == 'mysql':
+        op.create_index(
+            'ft_product_name_description',
+            'product',
+            ['name', 'description'],
+            unique=False,
+            mysql_prefix='FULLTEXT',
+            mysql_with_parser='ngram',
+        )
+    op.drop_column('product', 'search_text')
@@ -0,0 +1,29 @@
+"""add product keyset indexes
+
+Revision ID: 5c1e7a9d2b40
+Revises: 1be766acafcc
+Create Date: 2026-10-18 09:12:04.118532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e7a9d2b40'
+down_revision: Union[str, Sequence[str], None] = '1be766acafcc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_product_create_at_id', 'product', ['create_at', 'id'], unique=False)
+    op.create_index('ix_product_category_create_at_id', 'product', ['category_id', 'create_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_product_category_create_at_id', table_name='product')
+    op.drop_index('ix_product_create_at_id', table_name='product')
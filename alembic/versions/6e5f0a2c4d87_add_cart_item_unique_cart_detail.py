@@ -0,0 +1,61 @@
+"""add cart_item unique (cart_id, detail_id)
+
+Revision ID: 6e5f0a2c4d87
+Revises: 0b3d8e6f2a19
+Create Date: 2026-10-18 17:48:26.915204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e5f0a2c4d87'
+down_revision: Union[str, Sequence[str], None] = '0b3d8e6f2a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - gộp các dòng trùng (cart_id, detail_id) rồi thêm unique"""
+    connection = op.get_bind()
+    cart_item = sa.table(
+        'cart_item',
+        sa.column('id', sa.Uuid()),
+        sa.column('cart_id', sa.Uuid()),
+        sa.column('detail_id', sa.Uuid()),
+        sa.column('quantity', sa.Integer()),
+        sa.column('create_at', sa.DateTime()),
+    )
+    duplicates = connection.execute(
+        sa.select(cart_item.c.cart_id, cart_item.c.detail_id)
+        .group_by(cart_item.c.cart_id, cart_item.c.detail_id)
+        .having(sa.func.count() > 1)
+    ).all()
+    for cart_id, detail_id in duplicates:
+        rows = connection.execute(
+            sa.select(cart_item.c.id, cart_item.c.quantity)
+            .where(cart_item.c.cart_id == cart_id, cart_item.c.detail_id == detail_id)
+            .order_by(cart_item.c.create_at, cart_item.c.id)
+        ).all()
+        # Giữ dòng cũ nhất với tổng số lượng -> cart.total không đổi
+        keep, *others = rows
+        connection.execute(
+            cart_item.update()
+            .where(cart_item.c.id == keep.id)
+            .values(quantity=sum(row.quantity for row in rows))
+        )
+        connection.execute(
+            cart_item.delete().where(cart_item.c.id.in_([row.id for row in others]))
+        )
+
+    with op.batch_alter_table('cart_item') as batch_op:
+        batch_op.create_unique_constraint('uq_cart_item_cart_detail', ['cart_id', 'detail_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('cart_item') as batch_op:
+        batch_op.drop_constraint('uq_cart_item_cart_detail', type_='unique')
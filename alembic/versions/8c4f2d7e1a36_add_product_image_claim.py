@@ -0,0 +1,64 @@
+"""add product_image claimed_at, nullable cloudinary_public_id
+
+Revision ID: 8c4f2d7e1a36
+Revises: 6e5f0a2c4d87
+Create Date: 2026-10-18 19:12:40.518302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4f2d7e1a36'
+down_revision: Union[str, Sequence[str], None] = '6e5f0a2c4d87'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+product_image = sa.table(
+    'product_image',
+    sa.column('id', sa.Uuid()),
+    sa.column('status', sa.String()),
+    sa.column('cloudinary_public_id', sa.String()),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema - claimed_at cho claim ảnh giữa các worker; ảnh failed bỏ public_id 'pending:...'"""
+    op.add_column('product_image', sa.Column('claimed_at', sa.DateTime(), nullable=True))
+    with op.batch_alter_table('product_image') as batch_op:
+        batch_op.alter_column(
+            'cloudinary_public_id',
+            existing_type=sqlmodel.sql.sqltypes.AutoString(),
+            nullable=True,
+        )
+    op.execute(
+        product_image.update()
+        .where(product_image.c.status == 'failed')
+        .values(cloudinary_public_id=None)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema - public_id NULL -> 'failed:<id>' (vẫn unique) trước khi NOT NULL lại"""
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(product_image.c.id).where(product_image.c.cloudinary_public_id.is_(None))
+    ).all()
+    for (image_id,) in rows:
+        connection.execute(
+            product_image.update()
+            .where(product_image.c.id == image_id)
+            .values(cloudinary_public_id=f'failed:{image_id}')
+        )
+    with op.batch_alter_table('product_image') as batch_op:
+        batch_op.alter_column(
+            'cloudinary_public_id',
+            existing_type=sqlmodel.sql.sqltypes.AutoString(),
+            nullable=False,
+        )
+    op.drop_column('product_image', 'claimed_at')
@@ -0,0 +1,33 @@
+"""add order listing indexes
+
+Revision ID: a7d3f18c6e21
+Revises: 5c1e7a9d2b40
+Create Date: 2026-10-18 10:03:41.502917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3f18c6e21'
+down_revision: Union[str, Sequence[str], None] = '5c1e7a9d2b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_order_create_at_id', 'order', ['create_at', 'id'], unique=False)
+    op.create_index('ix_order_status_create_at_id', 'order', ['status', 'create_at', 'id'], unique=False)
+    op.create_index('ix_order_user_id_create_at_id', 'order', ['user_id', 'create_at', 'id'], unique=False)
+    op.create_index(op.f('ix_payment_detail_status'), 'payment_detail', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_payment_detail_status'), table_name='payment_detail')
+    op.drop_index('ix_order_user_id_create_at_id', table_name='order')
+    op.drop_index('ix_order_status_create_at_id', table_name='order')
+    op.drop_index('ix_order_create_at_id', table_name='order')
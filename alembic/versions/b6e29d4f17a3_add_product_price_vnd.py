@@ -0,0 +1,82 @@
+"""add product price_vnd
+
+Revision ID: b6e29d4f17a3
+Revises: 3f8a61d5c9e7
+Create Date: 2026-10-18 15:02:41.527316
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e29d4f17a3'
+down_revision: Union[str, Sequence[str], None] = '3f8a61d5c9e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+# Chép cố định từ app.utils.price lúc viết migration - migration không phụ thuộc code app
+NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+
+
+def parse_price(value: str | None) -> int | None:
+    """"150.000" / "150,000đ" / "150000.0" -> 150000; None nếu không đọc được"""
+    if value is None:
+        return None
+    match = NUMBER_RE.search(value.replace(" ", ""))
+    if not match:
+        return None
+    groups = re.split(r"[.,]", match.group())
+    if len(groups) == 1 or len(groups[-1]) == 3:
+        return int("".join(groups))
+    return round(float(f"{''.join(groups[:-1])}.{groups[-1]}"))
+
+
+def upgrade() -> None:
+    """
+    Upgrade schema - cột giá số nguyên VND, backfill từ price theo batch
+    Giá không đọc được để NULL (python -m app.scripts.backfill_price chạy lại sau khi sửa dữ liệu)
+    """
+    op.add_column('product', sa.Column('price_vnd', sa.BigInteger(), nullable=True))
+
+    # Backfill: đọc theo keyset trên id, mỗi batch BATCH_SIZE dòng
+    connection = op.get_bind()
+    product = sa.table(
+        'product',
+        sa.column('id', sa.Uuid()),
+        sa.column('price', sa.String()),
+        sa.column('price_vnd', sa.BigInteger()),
+    )
+    last_id = None
+    while True:
+        query = sa.select(product.c.id, product.c.price)
+        if last_id is not None:
+            query = query.where(product.c.id > last_id)
+        rows = connection.execute(query.order_by(product.c.id).limit(BATCH_SIZE)).all()
+        if not rows:
+            break
+        params = [
+            {'b_id': row.id, 'price_vnd': price_vnd}
+            for row in rows
+            if (price_vnd := parse_price(row.price)) is not None
+        ]
+        if params:
+            connection.execute(
+                product.update().where(product.c.id == sa.bindparam('b_id')), params
+            )
+        last_id = rows[-1].id
+
+    op.create_index('ix_product_price_vnd_id', 'product', ['price_vnd', 'id'], unique=False)
+    op.create_index('ix_product_category_price_vnd_id', 'product', ['category_id', 'price_vnd', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_product_category_price_vnd_id', table_name='product')
+    op.drop_index('ix_product_price_vnd_id', table_name='product')
+    op.drop_column('product', 'price_vnd')
@@ -0,0 +1,27 @@
+"""add product_image cover index
+
+Revision ID: d91c5b3e8a64
+Revises: b6e29d4f17a3
+Create Date: 2026-10-18 15:41:09.204718
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd91c5b3e8a64'
+down_revision: Union[str, Sequence[str], None] = 'b6e29d4f17a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_product_image_product_created_at', 'product_image', ['product_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_product_image_product_created_at', table_name='product_image')
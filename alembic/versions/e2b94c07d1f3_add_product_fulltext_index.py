@@ -0,0 +1,41 @@
+"""add product fulltext index
+
+Revision ID: e2b94c07d1f3
+Revises: a7d3f18c6e21
+Create Date: 2026-10-18 11:26:53.774102
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b94c07d1f3'
+down_revision: Union[str, Sequence[str], None] = 'a7d3f18c6e21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Upgrade schema - FULLTEXT chỉ có trên MySQL, DB khác dùng inverted index trong app
+    Parser ngram: parser mặc định bỏ từ ngắn hơn innodb_ft_min_token_size (3) như "áo", "đỏ"
+    """
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.create_index(
+        'ft_product_name_description',
+        'product',
+        ['name', 'description'],
+        unique=False,
+        mysql_prefix='FULLTEXT',
+        mysql_with_parser='ngram',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.drop_index('ft_product_name_description', table_name='product')
@@ -0,0 +1,69 @@
+"""add product_summary
+
+Revision ID: f4a7c2e91b58
+Revises: d91c5b3e8a64
+Create Date: 2026-10-18 16:20:37.861943
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a7c2e91b58'
+down_revision: Union[str, Sequence[str], None] = 'd91c5b3e8a64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - read model danh sách sản phẩm, dựng sẵn từ dữ liệu hiện có"""
+    op.create_table('product_summary',
+    sa.Column('product_id', sa.Uuid(), nullable=False),
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('price', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('price_vnd', sa.BigInteger(), nullable=True),
+    sa.Column('category_id', sa.Uuid(), nullable=True),
+    sa.Column('category_name', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('thumbnail_url', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('total_stock', sa.Integer(), nullable=False),
+    sa.Column('variant_count', sa.Integer(), nullable=False),
+    sa.Column('create_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+    op.create_index('ix_product_summary_create_at_id', 'product_summary', ['create_at', 'product_id'], unique=False)
+    op.create_index('ix_product_summary_category_create_at_id', 'product_summary', ['category_id', 'create_at', 'product_id'], unique=False)
+    op.create_index('ix_product_summary_price_vnd_id', 'product_summary', ['price_vnd', 'product_id'], unique=False)
+    op.create_index('ix_product_summary_category_price_vnd_id', 'product_summary', ['category_id', 'price_vnd', 'product_id'], unique=False)
+
+    # Cùng phép tính với ProductRepository.rebuild_summaries
+    op.execute(
+        """
+        INSERT INTO product_summary (
+            product_id, name, price, price_vnd, category_id, category_name,
+            thumbnail_url, total_stock, variant_count, create_at
+        )
+        SELECT
+            p.id, p.name, p.price, p.price_vnd, p.category_id, c.name,
+            (SELECT i.thumbnail_url FROM product_image i
+             WHERE i.product_id = p.id ORDER BY i.created_at, i.id LIMIT 1),
+            (SELECT COALESCE(SUM(d.stock), 0) FROM product_detail d WHERE d.product_id = p.id),
+            (SELECT COUNT(d.id) FROM product_detail d WHERE d.product_id = p.id),
+            p.create_at
+        FROM product p
+        LEFT JOIN category c ON c.id = p.category_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_product_summary_category_price_vnd_id', table_name='product_summary')
+    op.drop_index('ix_product_summary_price_vnd_id', table_name='product_summary')
+    op.drop_index('ix_product_summary_category_create_at_id', table_name='product_summary')
+    op.drop_index('ix_product_summary_create_at_id', table_name='product_summary')
+    op.drop_table('product_summary')
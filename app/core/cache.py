@@ -0,0 +1,245 @@
+"""
+Cache - lớp trừu tượng get/set/delete/invalidate theo tag
+- MemoryCache: TTL + LRU trong process (mặc định, 1 worker / môi trường dev)
+- RedisCache: dùng chung giữa nhiều uvicorn worker, nói giao thức Redis
+- aget/aset cho service `async def`: RedisCache chạy lệnh (I/O mạng, blocking) trên thread pool
+  để không chặn event loop; MemoryCache gọi thẳng
+Dữ liệu chỉ đổi khi admin sửa -> service invalidate theo tag (product:<id>, category:<id>...)
+"""
+import orjson
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Iterable, Set
+
+from fastapi.concurrency import run_in_threadpool
+
+from .settings import settings
+from app.utils.response_helper import orjson_default
+
+
+class CacheBackend(ABC):
+    """Interface chung; giá trị lưu phải serialize được sang JSON"""
+
+    def __init__(self, ttl: float = 300):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @abstractmethod
+    def get(self, key: str, default: Any = None) -> Any: ...
+
+    @abstractmethod
+    def set(
+        self, key: str, value: Any, ttl: float | None = None, tags: Iterable[str] = ()
+    ) -> None: ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    def invalidate_tags(self, *tags: str) -> None:
+        """Xóa mọi key được gắn một trong các tag"""
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    async def aget(self, key: str, default: Any = None) -> Any:
+        """get() cho code async - mặc định chạy trên thread pool"""
+        return await run_in_threadpool(self.get, key, default)
+
+    async def aset(
+        self, key: str, value: Any, ttl: float | None = None, tags: Iterable[str] = ()
+    ) -> None:
+        """set() cho code async - mặc định chạy trên thread pool"""
+        await run_in_threadpool(self.set, key, value, ttl, tags)
+
+    def get_or_set(
+        self,
+        key: str,
+        factory: Callable[[], Any],
+        ttl: float | None = None,
+        tags: Iterable[str] = (),
+    ) -> Any:
+        """Lấy từ cache, nếu miss thì gọi factory() và lưu kết quả"""
+        marker = object()
+        value = self.get(key, marker)
+        if value is marker:
+            value = factory()
+            self.set(key, value, ttl=ttl, tags=tags)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Số hit/miss (tính trong process hiện tại)"""
+        return {"backend": type(self).__name__, "hits": self.hits, "misses": self.misses}
+
+
+class MemoryCache(CacheBackend):
+    """
+    Cache giới hạn số phần tử (LRU) và thời gian sống (TTL), an toàn đa luồng
+    - _tags: tag -> keys, _key_tags: key -> tags; key rời cache (LRU, hết hạn, delete)
+      thì được gỡ khỏi cả hai để bộ nhớ của tag không tăng theo số key từng lưu
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        super().__init__(ttl=ttl)
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._tags: Dict[str, Set[Hashable]] = {}
+        self._key_tags: Dict[Hashable, Set[str]] = {}
+        self._lock = Lock()
+
+    def _discard(self, key: Hashable) -> None:
+        """Xóa key và liên kết tag của nó (gọi khi đang giữ lock)"""
+        self._data.pop(key, None)
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Lấy giá trị, trả về default nếu không có hoặc đã hết hạn"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._discard(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(
+        self, key: str, value: Any, ttl: float | None = None, tags: Iterable[str] = ()
+    ) -> None:
+        """Lưu giá trị, đẩy phần tử ít dùng nhất ra khi vượt maxsize"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._discard(key)
+            self._data[key] = (expires_at, value)
+            tags = set(tags)
+            if tags:
+                self._key_tags[key] = tags
+                for tag in tags:
+                    self._tags.setdefault(tag, set()).add(key)
+            while len(self._data) > self.maxsize:
+                self._discard(next(iter(self._data)))
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def invalidate_tags(self, *tags: str) -> None:
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._discard(key)
+
+    async def aget(self, key: str, default: Any = None) -> Any:
+        # Chỉ thao tác dict trong bộ nhớ, không cần thread pool
+        return self.get(key, default)
+
+    async def aset(
+        self, key: str, value: Any, ttl: float | None = None, tags: Iterable[str] = ()
+    ) -> None:
+        self.set(key, value, ttl=ttl, tags=tags)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+            self._key_tags.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **super().stats(),
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache trên Redis (hoặc server tương thích giao thức Redis)
+    - Giá trị lưu dạng JSON (orjson: UUID/datetime -> string), key có prefix
+    - Tag = Redis SET chứa các key được gắn tag đó
+    - client: truyền client có sẵn (VD: fakeredis khi test), mặc định tạo từ url
+    """
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        ttl: float = 300,
+        prefix: str = "",
+        client: Any = None,
+    ):
+        super().__init__(ttl=ttl)
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        raw = self.client.get(self._key(key))
+        if raw is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return orjson.loads(raw)
+
+    def set(
+        self, key: str, value: Any, ttl: float | None = None, tags: Iterable[str] = ()
+    ) -> None:
+        ttl = int(self.ttl if ttl is None else ttl)
+        full_key = self._key(key)
+        pipe = self.client.pipeline()
+        pipe.set(full_key, orjson.dumps(value, default=orjson_default), ex=ttl)
+        for tag in tags:
+            # Tag sống lâu hơn key một chút để không mất liên kết trước khi key hết hạn
+            pipe.sadd(self._tag_key(tag), full_key)
+            pipe.expire(self._tag_key(tag), ttl + 60)
+        pipe.execute()
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self._key(key))
+
+    def invalidate_tags(self, *tags: str) -> None:
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            keys = self.client.smembers(tag_key)
+            if keys:
+                self.client.delete(*keys)
+            self.client.delete(tag_key)
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=f"{self.prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+def create_cache() -> CacheBackend:
+    """Chọn backend theo settings.CACHE_BACKEND ("memory" | "redis")"""
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCache(
+            url=settings.CACHE_REDIS_URL,
+            ttl=settings.CACHE_TTL,
+            prefix=settings.CACHE_KEY_PREFIX,
+        )
+    return MemoryCache(maxsize=settings.CACHE_MAXSIZE, ttl=settings.CACHE_TTL)
+
+
+# Cache dùng chung: products, categories, địa chỉ GoShip
+shared_cache = create_cache()
@@ -0,0 +1,146 @@
+"""
+Change log - nhật ký thay đổi (append-only) để đồng bộ index trong process giữa các worker
+- MemoryChangeLog: trong process (CACHE_BACKEND=memory, 1 worker / môi trường dev)
+- RedisChangeLog: Redis Stream, mọi uvicorn worker cùng đọc (CACHE_BACKEND=redis)
+Tách khỏi shared_cache: cache LRU có thể đẩy key ra bất cứ lúc nào, log thì chỉ cắt phần cũ nhất
+Người ghi append(stream, entry); người đọc giữ vị trí đã áp dụng và read(stream, after) lấy phần mới
+"""
+import orjson
+from abc import ABC, abstractmethod
+from collections import deque
+from itertools import count, islice
+from threading import Lock
+from typing import Any, Deque, Dict, Iterator, List, Tuple
+
+from .settings import settings
+
+Entry = Dict[str, Any]
+
+
+class ChangeLog(ABC):
+    """
+    Interface chung; entry phải serialize được sang JSON
+    Log giữ tối đa maxlen entry mới nhất -> read() trả về None khi phần sau `after` đã bị cắt
+    """
+
+    def __init__(self, maxlen: int = 10000):
+        self.maxlen = maxlen
+
+    @abstractmethod
+    def append(self, stream: str, entry: Entry) -> None: ...
+
+    @abstractmethod
+    def head(self, stream: str) -> Any:
+        """Vị trí entry mới nhất; lấy TRƯỚC khi đọc dữ liệu nguồn để dựng index"""
+
+    @abstractmethod
+    def read(self, stream: str, after: Any) -> List[Tuple[Any, Entry]] | None:
+        """
+        Các (vị trí, entry) sau `after`, cũ trước
+        None: entry `after` không còn trong log (đã bị cắt / log bị xóa) -> người đọc dựng lại
+        """
+
+
+class MemoryChangeLog(ChangeLog):
+    """Log trong process: vị trí là số thứ tự tăng dần, 0 = log rỗng"""
+
+    def __init__(self, maxlen: int = 10000):
+        super().__init__(maxlen=maxlen)
+        self._streams: Dict[str, Deque[Tuple[int, Entry]]] = {}
+        self._counters: Dict[str, Iterator[int]] = {}
+        self._lock = Lock()
+
+    def append(self, stream: str, entry: Entry) -> None:
+        with self._lock:
+            entries = self._streams.setdefault(stream, deque(maxlen=self.maxlen))
+            position = next(self._counters.setdefault(stream, count(1)))
+            entries.append((position, entry))
+
+    def head(self, stream: str) -> int:
+        with self._lock:
+            entries = self._streams.get(stream)
+            return entries[-1][0] if entries else 0
+
+    def read(self, stream: str, after: int) -> List[Tuple[int, Entry]] | None:
+        with self._lock:
+            entries = self._streams.get(stream)
+            if not entries:
+                return [] if after == 0 else None
+            first = entries[0][0]
+            if after < first - 1:
+                return None
+            return list(islice(entries, after - first + 1, None))
+
+
+class RedisChangeLog(ChangeLog):
+    """
+    Redis Stream <prefix>changelog:<stream>, XADD có MAXLEN ~ maxlen
+    - vị trí = id của entry trong stream
+    - head() của stream rỗng ghi 1 entry mốc -> vị trí luôn là 1 entry có thật,
+      entry đó biến mất = log đã bị cắt qua vị trí người đọc
+    """
+
+    MARKER = b"marker"
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        prefix: str = "",
+        maxlen: int = 10000,
+        client: Any = None,
+    ):
+        super().__init__(maxlen=maxlen)
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, stream: str) -> str:
+        return f"{self.prefix}changelog:{stream}"
+
+    def append(self, stream: str, entry: Entry) -> None:
+        self.client.xadd(
+            self._key(stream),
+            {"data": orjson.dumps(entry)},
+            maxlen=self.maxlen,
+            approximate=True,
+        )
+
+    def head(self, stream: str) -> bytes:
+        key = self._key(stream)
+        last = self.client.xrevrange(key, count=1)
+        if last:
+            return last[0][0]
+        return self.client.xadd(key, {self.MARKER: b"1"}, maxlen=self.maxlen, approximate=True)
+
+    def read(self, stream: str, after: bytes) -> List[Tuple[bytes, Entry]] | None:
+        key = self._key(stream)
+        pipe = self.client.pipeline()
+        pipe.xrange(key, min=after, max=after, count=1)
+        pipe.xread({key: after})
+        present, newer = pipe.execute()
+        if not present:
+            return None
+        entries = newer[0][1] if newer else []
+        return [
+            (entry_id, orjson.loads(fields[b"data"]))
+            for entry_id, fields in entries
+            if b"data" in fields
+        ]
+
+
+def create_change_log() -> ChangeLog:
+    """Chọn backend theo settings.CACHE_BACKEND ("memory" | "redis")"""
+    if settings.CACHE_BACKEND == "redis":
+        return RedisChangeLog(
+            url=settings.CACHE_REDIS_URL,
+            prefix=settings.CACHE_KEY_PREFIX,
+            maxlen=settings.CHANGE_LOG_MAXLEN,
+        )
+    return MemoryChangeLog(maxlen=settings.CHANGE_LOG_MAXLEN)
+
+
+# Log dùng chung: đồng bộ search/suggest index giữa các worker
+change_log = create_change_log()
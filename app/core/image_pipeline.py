@@ -0,0 +1,277 @@
+"""
+Image pipeline - upload ảnh sản phẩm chạy nền
+- Request admin: lưu file vào spool (đĩa local), tạo ProductImage status=pending rồi trả về ngay
+- Worker pool: claim ảnh (pending -> processing, UPDATE có điều kiện), upload các ảnh đã claim
+  của 1 sản phẩm (ImageUploader.upload_many), retry có backoff, cập nhật url/thumbnail_url + status,
+  refresh product_summary và cache
+- Khởi động lại app: resume_pending() (chạy ở mọi uvicorn worker) xếp lại các ảnh pending còn file
+  trong spool; claim nguyên tử -> mỗi ảnh chỉ 1 worker upload
+- Tắt app: shutdown() bỏ job chưa chạy, job đang chờ retry trả ảnh về pending thay vì chờ hết backoff
+- Commit sản phẩm lỗi / xóa sản phẩm khi ảnh chưa upload: service gọi discard() dọn file spool
+"""
+import logging
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import BinaryIO, Dict, Iterable, List, Set
+from uuid import UUID, uuid4
+
+from sqlalchemy import update
+from sqlmodel import Session, and_, or_, select
+
+from .cache import shared_cache
+from .database import engine
+from .image_uploader import ImageUploader, UploadedImage, image_uploader
+from .settings import settings
+from app.enum.role_enum import ImageStatus
+from app.models.product_image_model import ProductImage
+from app.models.product_model import Product
+from app.repositories.product_repository import ProductRepository
+
+logger = logging.getLogger(__name__)
+
+# cloudinary_public_id tạm của ảnh pending/processing (cột unique) - giữ tên file trong spool
+PENDING_PREFIX = "pending:"
+
+
+class ImagePipeline:
+    def __init__(
+        self,
+        uploader: ImageUploader,
+        spool_dir: str,
+        max_workers: int = 2,
+        retries: int = 3,
+        backoff: float = 2,
+        lease: float = 1800,
+    ):
+        self.uploader = uploader
+        self.spool_dir = spool_dir
+        self.retries = retries
+        self.backoff = backoff
+        self.lease = lease
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="image-pipeline"
+        )
+        self._stopping = threading.Event()
+
+    def spool(self, file: BinaryIO, filename: str | None = None) -> ProductImage:
+        """Chép file vào spool, trả về ProductImage pending (chưa add vào session)"""
+        os.makedirs(self.spool_dir, exist_ok=True)
+        _, ext = os.path.splitext(filename or "")
+        spool_name = f"{uuid4().hex}{ext.lower()}"
+        with open(os.path.join(self.spool_dir, spool_name), "wb") as out:
+            shutil.copyfileobj(file, out)
+        return ProductImage(
+            cloudinary_public_id=f"{PENDING_PREFIX}{spool_name}",
+            url="",
+            thumbnail_url="",
+            status=ImageStatus.PENDING,
+        )
+
+    def submit(self, product_id: UUID, images: List[ProductImage]) -> None:
+        """Đưa các ảnh chưa upload của 1 sản phẩm vào hàng đợi (gọi sau khi đã commit)"""
+        jobs = {
+            image.id: image.cloudinary_public_id.removeprefix(PENDING_PREFIX)
+            for image in images
+            if image.status in (ImageStatus.PENDING, ImageStatus.PROCESSING)
+        }
+        if jobs:
+            self.executor.submit(self._process, product_id, jobs)
+
+    def resume_pending(self) -> None:
+        """
+        Xếp lại hàng đợi cho ảnh chưa upload còn file trong spool (sau khi app restart)
+        - pending, hoặc processing quá lease (worker nhận trước đó đã chết)
+        - mọi worker cùng gọi: ảnh bị xếp trùng chỉ được 1 worker claim thành công
+        """
+        with Session(engine) as session:
+            images = session.exec(
+                select(ProductImage).where(self._claimable(datetime.now()))
+            ).all()
+        by_product: Dict[UUID, List[ProductImage]] = {}
+        for image in images:
+            if os.path.exists(self._spool_path(image.cloudinary_public_id)):
+                by_product.setdefault(image.product_id, []).append(image)
+        for product_id, product_images in by_product.items():
+            self.submit(product_id, product_images)
+
+    def discard(self, public_ids: Iterable[str | None]) -> None:
+        """Xóa file spool của các ảnh không còn upload (commit sản phẩm lỗi, sản phẩm đã bị xóa)"""
+        for public_id in public_ids:
+            if public_id and public_id.startswith(PENDING_PREFIX):
+                self._remove_spool(public_id.removeprefix(PENDING_PREFIX))
+
+    def shutdown(self) -> None:
+        """
+        Dừng khi tắt app, không chờ hết lịch retry
+        - job chưa chạy bị hủy: ảnh vẫn pending, resume_pending() ở lần khởi động sau xếp lại
+        - job đang chạy dừng ở lần chờ backoff kế tiếp và trả ảnh về pending
+        -> chỉ chờ lượt upload đang dở (giới hạn bởi timeout của uploader)
+        """
+        self._stopping.set()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    # ==================== WORKER ====================
+
+    def _process(self, product_id: UUID, jobs: Dict[UUID, str]) -> None:
+        if self._stopping.is_set():
+            return
+        try:
+            claimed = self._claim(jobs)
+            if claimed:
+                self._upload_with_retry(
+                    product_id, {i: name for i, name in jobs.items() if i in claimed}
+                )
+        except Exception:
+            logger.exception("Xử lý ảnh nền cho sản phẩm %s thất bại", product_id)
+
+    def _claimable(self, now: datetime):
+        """Điều kiện ảnh được phép nhận: pending, hoặc processing đã quá lease"""
+        return or_(
+            ProductImage.status == ImageStatus.PENDING,
+            and_(
+                ProductImage.status == ImageStatus.PROCESSING,
+                ProductImage.claimed_at < now - timedelta(seconds=self.lease),
+            ),
+        )
+
+    def _claim(self, image_ids: Iterable[UUID]) -> Set[UUID]:
+        """
+        UPDATE ... SET status=processing WHERE id=? AND <claimable> cho từng ảnh, commit ngay
+        rowcount = 1 -> worker này giữ ảnh; worker khác chạy cùng lúc thấy 0 dòng và bỏ qua
+        """
+        claimed: Set[UUID] = set()
+        with Session(engine) as session:
+            for image_id in sorted(image_ids):
+                now = datetime.now()
+                result = session.exec(
+                    update(ProductImage)
+                    .where(ProductImage.id == image_id, self._claimable(now))
+                    .values(status=ImageStatus.PROCESSING, claimed_at=now)
+                )
+                session.commit()
+                if result.rowcount:
+                    claimed.add(image_id)
+        return claimed
+
+    def _open_spooled(
+        self, remaining: Dict[UUID, str]
+    ) -> List[tuple[BinaryIO, str]]:
+        """Mở file spool của các ảnh còn lại; file mất/không đọc được -> ảnh đó failed"""
+        files = []
+        for image_id, name in list(remaining.items()):
+            try:
+                files.append((open(os.path.join(self.spool_dir, name), "rb"), str(image_id)))
+            except OSError as e:
+                logger.error("Không đọc được file spool của ảnh %s: %s", image_id, e)
+                self._mark_failed(image_id)
+                del remaining[image_id]
+        return files
+
+    def _upload_with_retry(self, product_id: UUID, jobs: Dict[UUID, str]) -> None:
+        """Upload + retry các file còn lỗi; jobs: image_id -> tên file trong spool"""
+        remaining = dict(jobs)
+        for attempt in range(1, self.retries + 1):
+            files = self._open_spooled(remaining)
+            if not files:
+                return
+            try:
+                uploaded, failures = self.uploader.upload_many(files)
+            finally:
+                for file, _ in files:
+                    file.close()
+
+            if uploaded:
+                self._mark_ready(product_id, uploaded)
+                for image in uploaded:
+                    self._remove_spool(remaining.pop(UUID(image.filename)))
+
+            if not remaining:
+                return
+            logger.warning(
+                "Upload ảnh sản phẩm %s lỗi (lần %d/%d): %s",
+                product_id,
+                attempt,
+                self.retries,
+                [f.error for f in failures],
+            )
+            if attempt < self.retries and self._stopping.wait(self.backoff * 2 ** (attempt - 1)):
+                self._release(remaining)
+                return
+
+        for image_id, name in remaining.items():
+            self._mark_failed(image_id)
+            self._remove_spool(name)
+
+    def _release(self, image_ids: Iterable[UUID]) -> None:
+        """Trả ảnh đang giữ về pending (app đang tắt) - lần khởi động sau claim lại ngay, không chờ lease"""
+        with Session(engine) as session:
+            session.exec(
+                update(ProductImage)
+                .where(
+                    ProductImage.id.in_(list(image_ids)),
+                    ProductImage.status == ImageStatus.PROCESSING,
+                )
+                .values(status=ImageStatus.PENDING, claimed_at=None)
+            )
+            session.commit()
+
+    def _mark_ready(self, product_id: UUID, uploaded: List[UploadedImage]) -> None:
+        """Ghi url/thumbnail vào các ảnh đã upload, refresh product_summary + cache 1 lần"""
+        with Session(engine) as session:
+            for result in uploaded:
+                image = session.get(ProductImage, UUID(result.filename))
+                if image is None:
+                    # Sản phẩm/ảnh đã bị xóa trong lúc upload -> dọn trên CDN
+                    self.uploader.delete_quietly(result.public_id)
+                    continue
+                image.cloudinary_public_id = result.public_id
+                image.url = result.url
+                image.thumbnail_url = result.thumbnail_url
+                image.status = ImageStatus.READY
+                session.add(image)
+            session.flush()
+            ProductRepository().refresh_summary(product_id, session)
+            category_id = session.exec(
+                select(Product.category_id).where(Product.id == product_id)
+            ).first()
+            session.commit()
+        shared_cache.invalidate_tags(
+            f"product:{product_id}", "products:all", f"category:{category_id}"
+        )
+
+    def _mark_failed(self, image_id: UUID) -> None:
+        """status=failed, bỏ public_id tạm "pending:..." (file spool không còn dùng)"""
+        with Session(engine) as session:
+            image = session.get(ProductImage, image_id)
+            if image is not None:
+                image.status = ImageStatus.FAILED
+                image.cloudinary_public_id = None
+                session.add(image)
+                session.commit()
+
+    def _spool_path(self, public_id: str) -> str:
+        return os.path.join(self.spool_dir, public_id.removeprefix(PENDING_PREFIX))
+
+    def _remove_spool(self, name: str) -> None:
+        try:
+            os.remove(os.path.join(self.spool_dir, name))
+        except FileNotFoundError:
+            pass
+
+
+image_pipeline = ImagePipeline(
+    image_uploader,
+    spool_dir=settings.IMAGE_SPOOL_DIR,
+    max_workers=settings.IMAGE_PIPELINE_WORKERS,
+    retries=settings.IMAGE_UPLOAD_RETRIES,
+    backoff=settings.IMAGE_RETRY_BACKOFF,
+    lease=settings.IMAGE_CLAIM_LEASE,
+)
+
+
+def get_image_pipeline() -> ImagePipeline:
+    """Dependency - override bằng app.dependency_overrides khi test"""
+    return image_pipeline
@@ -0,0 +1,249 @@
+"""
+Image uploader - lớp trừu tượng lưu trữ ảnh sản phẩm
+- CloudinaryUploader: upload lên Cloudinary (mặc định)
+- LocalImageUploader: lưu trên đĩa, phục vụ qua /api/media (môi trường offline, giảm egress CDN)
+- upload_many: upload song song trên thread pool giới hạn, trong hạn chờ chung của cả batch,
+  trả về cả danh sách thành công lẫn thất bại (không dừng ở lỗi đầu tiên)
+ImagePipeline nhận uploader qua constructor -> test truyền uploader giả (tests/fakes.py)
+"""
+import logging
+import os
+import re
+import shutil
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError, as_completed
+from typing import BinaryIO, Dict, List, Tuple
+from uuid import uuid4
+
+from cloudinary.uploader import upload, destroy
+from cloudinary.utils import cloudinary_url
+from pydantic import BaseModel
+
+from .settings import settings
+from app.utils.image_variants import build_variant
+
+logger = logging.getLogger(__name__)
+
+
+class UploadedImage(BaseModel):
+    """Kết quả upload 1 ảnh"""
+
+    public_id: str
+    url: str
+    thumbnail_url: str
+    filename: str | None = None
+
+
+class UploadFailure(BaseModel):
+    """File upload thất bại (trả về cho client để upload lại)"""
+
+    filename: str | None
+    error: str
+
+
+class ImageUploader(ABC):
+    """
+    Interface chung; upload() chạy blocking, upload_many() tự fan-out ra thread pool
+    - timeout: giới hạn cho 1 request upload (backend tự áp, VD timeout HTTP của Cloudinary)
+    """
+
+    def __init__(self, max_workers: int = 4, timeout: float = 30):
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+    @abstractmethod
+    def upload(self, file: BinaryIO, filename: str | None = None) -> UploadedImage: ...
+
+    @abstractmethod
+    def delete(self, public_id: str) -> None: ...
+
+    def delete_quietly(self, public_id: str) -> None:
+        """Xóa ảnh khi dọn dẹp - lỗi chỉ ghi log (không che lỗi gốc của caller)"""
+        try:
+            self.delete(public_id)
+        except Exception:
+            logger.exception("Không xóa được ảnh %s, cần dọn tay", public_id)
+
+    def batch_timeout(self, count: int) -> float:
+        """Hạn chờ chung cho `count` file: mỗi lượt max_workers file tối đa `timeout` giây"""
+        return self.timeout * -(-count // self.max_workers)
+
+    def upload_many(
+        self, files: List[Tuple[BinaryIO, str | None]]
+    ) -> Tuple[List[UploadedImage], List[UploadFailure]]:
+        """
+        Upload song song, giữ nguyên thứ tự file đầu vào ở danh sách thành công
+        - chờ tối đa batch_timeout(len(files)); file chưa xong lúc đó tính là lỗi "timeout"
+        - upload quá hạn không hủy được (đang chạy trong thread): xong muộn thì tự xóa ảnh
+          (done-callback) -> không để lại ảnh mồ côi trên CDN
+        Returns: (ảnh đã upload, file thất bại)
+        """
+        if not files:
+            return [], []
+
+        results: Dict[int, UploadedImage] = {}
+        failures: List[UploadFailure] = []
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(files)))
+        futures = {
+            executor.submit(self.upload, file, filename): (index, filename)
+            for index, (file, filename) in enumerate(files)
+        }
+        pending = set(futures)
+        try:
+            for future in as_completed(futures, timeout=self.batch_timeout(len(files))):
+                pending.discard(future)
+                index, filename = futures[future]
+                try:
+                    results[index] = future.result().model_copy(
+                        update={"filename": filename}
+                    )
+                except Exception as e:
+                    failures.append(UploadFailure(filename=filename, error=str(e)))
+        except TimeoutError:
+            for future in pending:
+                _, filename = futures[future]
+                failures.append(UploadFailure(filename=filename, error="timeout"))
+                if not future.cancel():
+                    future.add_done_callback(self._discard_late_upload)
+        finally:
+            executor.shutdown(wait=False)
+
+        return [results[i] for i in sorted(results)], failures
+
+    def _discard_late_upload(self, future: Future) -> None:
+        """Done-callback của upload đã bị tính timeout: ảnh lên muộn thì xóa luôn"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.delete_quietly(future.result().public_id)
+
+
+class CloudinaryUploader(ImageUploader):
+    """Upload lên Cloudinary; thumbnail là URL biến đổi (crop 100x100) của cùng ảnh"""
+
+    def upload(self, file: BinaryIO, filename: str | None = None) -> UploadedImage:
+        result = upload(file, timeout=self.timeout)
+        thumbnail, _ = cloudinary_url(
+            result["public_id"],
+            format="jpg",
+            crop="fill",
+            width=100,
+            height=100,
+        )
+        return UploadedImage(
+            public_id=result["public_id"],
+            url=result["secure_url"],
+            thumbnail_url=thumbnail,
+        )
+
+    def delete(self, public_id: str) -> None:
+        destroy(public_id)
+
+
+class LocalImageUploader(ImageUploader):
+    """
+    Lưu ảnh trong media_root, public_id = tên file (uuid + đuôi)
+    - thumbnail_url: biến thể 100x100 WebP, được tạo lúc có request đầu tiên (xem variant_path)
+    - chỉ tạo biến thể trong VARIANT_SIZES x VARIANT_FORMATS -> số file trên đĩa có giới hạn
+    """
+
+    NAME_RE = re.compile(r"^[0-9a-f]{32}\.[a-z0-9]{1,5}$")
+    VARIANT_DIR = ".variants"
+    # (width, height); None = giữ tỉ lệ theo chiều còn lại, (None, None) = chỉ đổi định dạng
+    VARIANT_SIZES = frozenset(
+        {(None, None), (100, 100), (300, 300), (600, None), (1200, None)}
+    )
+    VARIANT_FORMATS = frozenset({"webp", "jpg", "png"})
+    FORMAT_ALIASES = {"jpeg": "jpg"}
+
+    def __init__(self, media_root: str, media_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self.media_root = media_root
+        self.media_url = media_url.rstrip("/")
+
+    def upload(self, file: BinaryIO, filename: str | None = None) -> UploadedImage:
+        os.makedirs(self.media_root, exist_ok=True)
+        _, ext = os.path.splitext(filename or "")
+        name = f"{uuid4().hex}{ext.lower() or '.jpg'}"
+        with open(os.path.join(self.media_root, name), "wb") as out:
+            shutil.copyfileobj(file, out)
+        return UploadedImage(
+            public_id=name,
+            url=f"{self.media_url}/{name}",
+            thumbnail_url=f"{self.media_url}/{name}?w=100&h=100&format=webp",
+        )
+
+    def delete(self, public_id: str) -> None:
+        path = self.original_path(public_id)
+        if path and os.path.exists(path):
+            os.remove(path)
+        variant_dir = os.path.join(self.media_root, self.VARIANT_DIR, public_id)
+        shutil.rmtree(variant_dir, ignore_errors=True)
+
+    def original_path(self, name: str) -> str | None:
+        """Đường dẫn file gốc, None nếu tên không hợp lệ (chặn path traversal)"""
+        if not self.NAME_RE.match(name):
+            return None
+        return os.path.join(self.media_root, name)
+
+    def allows_variant(
+        self, width: int | None = None, height: int | None = None, format: str | None = None
+    ) -> bool:
+        """Kích thước/định dạng có trong danh sách cho phép"""
+        format = self.FORMAT_ALIASES.get(format, format)
+        return (width, height) in self.VARIANT_SIZES and (
+            format is None or format in self.VARIANT_FORMATS
+        )
+
+    def variant_path(
+        self,
+        name: str,
+        width: int | None = None,
+        height: int | None = None,
+        format: str | None = None,
+    ) -> str | None:
+        """
+        Đường dẫn biến thể (resize/đổi định dạng) của ảnh, tạo lần đầu rồi cache trên đĩa
+        Không có tham số biến đổi -> trả về file gốc
+        None nếu ảnh không tồn tại hoặc biến thể không nằm trong allows_variant
+        InvalidImageError nếu file gốc không đọc được như ảnh
+        """
+        original = self.original_path(name)
+        if not original or not os.path.exists(original):
+            return None
+        if not (width or height or format):
+            return original
+        if not self.allows_variant(width, height, format):
+            return None
+
+        format = self.FORMAT_ALIASES.get(format, format)
+        ext = format or os.path.splitext(name)[1].lstrip(".")
+        variant = os.path.join(
+            self.media_root,
+            self.VARIANT_DIR,
+            name,
+            f"{width or 0}x{height or 0}.{ext}",
+        )
+        if not os.path.exists(variant):
+            if not build_variant(original, variant, width, height, format):
+                return original
+        return variant
+
+
+def create_uploader() -> ImageUploader:
+    """Chọn backend theo Settings.IMAGE_STORAGE ("cloudinary" | "local")"""
+    if settings.IMAGE_STORAGE == "local":
+        return local_storage
+    return CloudinaryUploader(
+        max_workers=settings.IMAGE_UPLOAD_WORKERS,
+        timeout=settings.IMAGE_UPLOAD_TIMEOUT,
+    )
+
+
+# Luôn khởi tạo: /api/media phục vụ ảnh local kể cả khi backend mặc định là Cloudinary
+local_storage = LocalImageUploader(
+    settings.MEDIA_ROOT,
+    settings.MEDIA_URL,
+    max_workers=settings.IMAGE_UPLOAD_WORKERS,
+    timeout=settings.IMAGE_UPLOAD_TIMEOUT,
+)
+image_uploader = create_uploader()
@@ -7,9 +7,46 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES : int
     REFRESH_TOKEN_EXPIRE_DAYS:int
     DATABASE_URL : str
+    # Read replica (để trống = dùng chung primary)
+    DATABASE_REPLICA_URL: str = ""
+
+    # Database engine / pool
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE: int = 1800  # giây, < wait_timeout của MySQL
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_PRE_PING: bool = True
+    DB_ISOLATION_LEVEL: str = ""  # VD: "READ COMMITTED", để trống = mặc định của DB
+
+    # Cache: "memory" (TTL + LRU trong process) hoặc "redis" (dùng chung nhiều worker)
+    CACHE_BACKEND: str = "memory"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_KEY_PREFIX: str = "ecommerce:"
+    CACHE_MAXSIZE: int = 2048
+    CACHE_TTL: int = 300  # giây
+    CACHE_LOCATION_TTL: int = 86400  # danh sách tỉnh/quận/phường ít thay đổi
+    # Nhật ký thay đổi đồng bộ search/suggest index giữa các worker (cùng backend với cache)
+    CHANGE_LOG_MAXLEN: int = 10000  # worker tụt sau quá số entry này thì dựng lại index
+
     CLOUDINARY_CLOUD_NAME:str
     CLOUDINARY_API_KEY:int
     CLOUDINARY_API_SECRET:str
+
+    # Lưu trữ ảnh sản phẩm: "cloudinary" hoặc "local" (đĩa, phục vụ qua MEDIA_URL)
+    IMAGE_STORAGE: str = "cloudinary"
+    MEDIA_ROOT: str = "var/media"
+    MEDIA_URL: str = "/api/media"
+    MEDIA_CACHE_MAX_AGE: int = 31536000  # giây; tên file là uuid nên nội dung không đổi
+    # Upload ảnh sản phẩm
+    IMAGE_UPLOAD_WORKERS: int = 4  # số file upload song song / request
+    IMAGE_UPLOAD_TIMEOUT: int = 30  # giây / request upload; cả batch chờ tối đa 30s x số lượt
+    # Upload chạy nền: file lưu tạm ở spool, worker upload + retry
+    IMAGE_SPOOL_DIR: str = "var/image_spool"
+    IMAGE_PIPELINE_WORKERS: int = 2  # số sản phẩm xử lý song song
+    IMAGE_UPLOAD_RETRIES: int = 3
+    IMAGE_RETRY_BACKOFF: float = 2  # giây, nhân đôi sau mỗi lần lỗi
+    IMAGE_CLAIM_LEASE: int = 1800  # giây; ảnh processing lâu hơn -> coi như worker đã chết
     
     # Google OAuth
     GOOGLE_CLIENT_ID: str = ""
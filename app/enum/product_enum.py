@@ -0,0 +1,10 @@
+"""
+Product Enum - Các giá trị dùng cho danh sách sản phẩm
+"""
+
+
+class ProductSort:
+    """Thứ tự danh sách sản phẩm"""
+    NEWEST = "newest"           # Mới nhất trước (mặc định, hỗ trợ cursor)
+    PRICE_ASC = "price_asc"     # Giá tăng dần
+    PRICE_DESC = "price_desc"   # Giá giảm dần
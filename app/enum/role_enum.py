@@ -23,4 +23,11 @@ class PaymentStatus:
     PENDING = "pending"         # Chờ thanh toán
     PAID = "paid"               # Đã thanh toán
     FAILED = "failed"           # Thanh toán thất bại
-    REFUNDED = "refunded"       # Đã hoàn tiền
\ No newline at end of file
+    REFUNDED = "refunded"       # Đã hoàn tiền
+
+class ImageStatus:
+    """Trạng thái ảnh sản phẩm (upload chạy nền)"""
+    PENDING = "pending"         # Đã nhận file, chờ upload
+    PROCESSING = "processing"   # Đã có worker nhận (claim), đang upload
+    READY = "ready"             # Đã upload, url/thumbnail_url dùng được
+    FAILED = "failed"           # Upload lỗi sau khi đã retry
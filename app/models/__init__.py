@@ -25,6 +25,9 @@ from .product_detail_model import (
 # Product Image Models
 from .product_image_model import ProductImage
 
+# Product Summary (read model danh sách sản phẩm)
+from .product_summary_model import ProductSummary
+
 # User Models
 from .user_model import User, UserBase, UserIn, UserOut
 
@@ -59,6 +62,8 @@ __all__ = [
     "ProductDetail", "ProductDetailBase", "ProductDetailIn", "ProductDetailOutputModel",
     # Product Image
     "ProductImage",
+    # Product Summary
+    "ProductSummary",
     # User
     "User", "UserBase", "UserIn", "UserOut",
     # Role
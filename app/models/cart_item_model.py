@@ -1,4 +1,5 @@
 from sqlmodel import Field, SQLModel, Relationship
+from sqlalchemy import UniqueConstraint
 from uuid import UUID, uuid4
 from datetime import datetime
 from typing import TYPE_CHECKING
@@ -25,6 +26,10 @@ class CartItemOut(CartItemBase):
 
 class CartItem(CartItemBase, table=True):
     __tablename__ = 'cart_item'
+    # Mỗi biến thể chỉ 1 dòng / giỏ -> add-to-cart dùng upsert (CartRepository.upsert_cart_item)
+    __table_args__ = (
+        UniqueConstraint("cart_id", "detail_id", name="uq_cart_item_cart_detail"),
+    )
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     create_at: datetime = Field(default_factory=datetime.now)
     update_at: datetime = Field(default_factory=datetime.now)
@@ -1,4 +1,5 @@
 from sqlmodel import Field, SQLModel, Relationship
+from sqlalchemy import Index
 from uuid import UUID, uuid4
 from datetime import datetime
 from typing import Optional, TYPE_CHECKING
@@ -22,6 +23,12 @@ class OrderOut(OrderBase):
 
 class Order(OrderBase, table=True):
     __tablename__ = 'order'
+    # Danh sách đơn admin/user: ORDER BY create_at DESC, id DESC kèm các bộ lọc
+    __table_args__ = (
+        Index("ix_order_create_at_id", "create_at", "id"),
+        Index("ix_order_status_create_at_id", "status", "create_at", "id"),
+        Index("ix_order_user_id_create_at_id", "user_id", "create_at", "id"),
+    )
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     create_at: datetime = Field(default_factory=datetime.now)
     update_at: datetime = Field(default_factory=datetime.now)
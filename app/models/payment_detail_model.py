@@ -6,7 +6,7 @@ class PaymentDetailBase(SQLModel):
     # order_id: UUID = Field(foreign_key="order.id")
     amount: int
     provider: str
-    status: str = "pending"
+    status: str = Field(default="pending", index=True)
 
 class PaymentDetailIn(PaymentDetailBase):
     pass
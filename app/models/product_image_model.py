@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from uuid import uuid4, UUID
 from datetime import datetime
 from typing import TYPE_CHECKING
@@ -8,14 +9,22 @@ if TYPE_CHECKING:
 
 class ProductImage(SQLModel, table=True): 
     __tablename__= 'product_image' 
+    # Ảnh bìa (ảnh đầu tiên) cho danh sách sản phẩm, xem cover_thumbnail_subquery
+    __table_args__ = (
+        Index("ix_product_image_product_created_at", "product_id", "created_at", "id"),
+    )
     id: UUID = Field(primary_key=True, default_factory= uuid4)
     product_id: UUID = Field(foreign_key='product.id',ondelete="CASCADE", nullable=False)
 
-    # cloudinary info to delete image 
-    cloudinary_public_id : str = Field(nullable=False, unique=True)
+    # cloudinary info to delete image; NULL khi upload lỗi (status=failed)
+    cloudinary_public_id : str | None = Field(default=None, nullable=True, unique=True)
     url:str # ảnh full size 
     thumbnail_url:str = Field(nullable=False) # ảnh nhỏ nếu click vào sẽ hiển thị ảnh lớn 
     created_at:datetime = Field(default_factory=datetime.now)
+    # pending -> processing -> ready/failed, xem app/core/image_pipeline.py
+    status: str = Field(default="ready", sa_column_kwargs={"server_default": "ready"})
+    # Lúc worker claim ảnh; processing quá IMAGE_CLAIM_LEASE -> worker khác nhận lại
+    claimed_at: datetime | None = None
     
     # Relationship
     product: "Product" = Relationship(back_populates="images"
@@ -1,5 +1,6 @@
 from sqlmodel import Field, SQLModel, Relationship
-from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, Index, Text
+from pydantic import BaseModel, ConfigDict, NonNegativeInt
 from fastapi import UploadFile
 from uuid import UUID, uuid4
 from datetime import datetime
@@ -41,6 +42,22 @@ class ProductResponseOut(BaseModel):
     update_at: datetime
 
 
+class ProductFilter(BaseModel):
+    """Bộ lọc facet cho danh sách sản phẩm (query params của GET /products)"""
+
+    min_price: Optional[NonNegativeInt] = None
+    max_price: Optional[NonNegativeInt] = None
+    color: Optional[str] = None
+    size: Optional[str] = None
+    in_stock: bool = False
+
+    def is_empty(self) -> bool:
+        return self == ProductFilter()
+
+    def cache_key(self) -> str:
+        return ":".join(str(v) for v in self.model_dump().values())
+
+
 class ProductOut(ProductBase):
     id: UUID
     create_at: datetime
@@ -75,9 +92,28 @@ class ProductDetailOut(BaseModel):
 
 class Product(ProductBase, table=True):
     __tablename__ = "product"
+    # Keyset pagination: ORDER BY create_at DESC, id DESC (có/không lọc category)
+    __table_args__ = (
+        Index("ix_product_create_at_id", "create_at", "id"),
+        Index("ix_product_category_create_at_id", "category_id", "create_at", "id"),
+        # Sắp xếp / lọc theo giá: sort=price_asc|price_desc, min_price/max_price
+        Index("ix_product_price_vnd_id", "price_vnd", "id"),
+        Index("ix_product_category_price_vnd_id", "category_id", "price_vnd", "id"),
+        # Full-text search không dấu (chỉ MySQL, xem ProductRepository.search)
+        Index(
+            "ft_product_search_text",
+            "search_text",
+            mysql_prefix="FULLTEXT",
+            mysql_with_parser="ngram",
+        ),
+    )
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     create_at: datetime = Field(default_factory=datetime.now)
     update_at: datetime = Field(default_factory=datetime.now)
+    # Tên + mô tả đã bỏ dấu, lowercase - ProductRepository cập nhật khi create/update
+    search_text: str | None = Field(default=None, sa_type=Text, exclude=True)
+    # Giá dạng số nguyên VND từ `price` - ProductRepository cập nhật khi create/update
+    price_vnd: int | None = Field(default=None, sa_type=BigInteger)
 
     # Relationships
     category: Optional["Category"] = Relationship(back_populates="products")
@@ -0,0 +1,43 @@
+from sqlmodel import Field, SQLModel
+from sqlalchemy import BigInteger, Index
+from uuid import UUID
+from datetime import datetime
+
+
+class ProductSummary(SQLModel, table=True):
+    """
+    Read model cho danh sách sản phẩm - 1 dòng / sản phẩm, không cần join khi đọc
+    ProductService cập nhật khi product/detail/ảnh đổi; dựng lại toàn bộ:
+    python -m app.scripts.rebuild_product_summary
+    """
+
+    __tablename__ = "product_summary"
+    __table_args__ = (
+        Index("ix_product_summary_create_at_id", "create_at", "product_id"),
+        Index(
+            "ix_product_summary_category_create_at_id",
+            "category_id",
+            "create_at",
+            "product_id",
+        ),
+        Index("ix_product_summary_price_vnd_id", "price_vnd", "product_id"),
+        Index(
+            "ix_product_summary_category_price_vnd_id",
+            "category_id",
+            "price_vnd",
+            "product_id",
+        ),
+    )
+    product_id: UUID = Field(
+        foreign_key="product.id", ondelete="CASCADE", primary_key=True
+    )
+    name: str = Field(nullable=False)
+    price: str | None = None
+    price_vnd: int | None = Field(default=None, sa_type=BigInteger)
+    category_id: UUID | None = None
+    category_name: str | None = None
+    thumbnail_url: str | None = None
+    total_stock: int = 0
+    variant_count: int = 0
+    # create_at của product - giữ nguyên thứ tự/cursor của danh sách
+    create_at: datetime
@@ -1,14 +1,20 @@
 """
 Cart Repository - Xử lý tất cả query liên quan đến giỏ hàng
+Các hàm ghi không tự commit: CartService commit 1 lần / thao tác (unit of work)
 """
 from sqlmodel import Session, select
-from typing import List
-from uuid import UUID
+from sqlalchemy import update, delete
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from typing import Any, Dict, Iterable, List, Tuple
+from uuid import UUID, uuid4
 from datetime import datetime
 
 from app.models.cart_model import Cart
 from app.models.cart_item_model import CartItem
+from app.models.product_detail_model import ProductDetail
 from app.models.product_model import Product
+from app.repositories.product_repository import cover_thumbnail_subquery
 
 
 class CartRepository:
@@ -35,18 +41,21 @@ class CartRepository:
         session.refresh(cart)
         return cart
     
-    def update_cart(self, cart: Cart, session: Session) -> Cart:
-        """Cập nhật giỏ hàng"""
-        session.add(cart)
-        session.commit()
-        session.refresh(cart)
-        return cart
-    
-    def update_cart_total(self, cart: Cart, total: int, session: Session) -> Cart:
-        """Cập nhật tổng số lượng giỏ hàng"""
-        cart.total = total
-        cart.update_at = datetime.now()
-        return self.update_cart(cart, session)
+    def increment_cart_total(self, cart_id: UUID, delta: int, session: Session) -> None:
+        """UPDATE cart SET total = total + :delta - không cần đọc lại toàn bộ items"""
+        session.exec(
+            update(Cart)
+            .where(Cart.id == cart_id)
+            .values(total=Cart.total + delta, update_at=datetime.now())
+        )
+
+    def set_cart_total(self, cart_id: UUID, total: int, session: Session) -> None:
+        """Gán tổng số lượng giỏ hàng"""
+        session.exec(
+            update(Cart)
+            .where(Cart.id == cart_id)
+            .values(total=total, update_at=datetime.now())
+        )
     
     # ==================== CART ITEM FUNCTIONS ====================
     
@@ -56,10 +65,42 @@ class CartRepository:
             select(CartItem).where(CartItem.cart_id == cart_id)
         ).all()
     
-    def get_cart_item_by_id(self, cart_item_id: UUID, session: Session) -> CartItem | None:
-        """Lấy cart item theo ID"""
+    def get_cart_lines(self, cart_id: UUID, session: Session) -> List[Dict[str, Any]]:
+        """
+        Các dòng giỏ hàng kèm tên/giá sản phẩm, màu/size/tồn kho của biến thể và ảnh bìa
+        - 1 query join cart_item + product + product_detail, client không phải gọi từng sản phẩm
+        """
         return session.exec(
-            select(CartItem).where(CartItem.id == cart_item_id)
+            select(
+                CartItem.id,
+                CartItem.cart_id,
+                CartItem.product_id,
+                CartItem.detail_id,
+                CartItem.quantity,
+                CartItem.create_at,
+                CartItem.update_at,
+                Product.name.label("product_name"),
+                Product.price,
+                Product.price_vnd,
+                ProductDetail.color,
+                ProductDetail.size,
+                ProductDetail.stock,
+                cover_thumbnail_subquery().label("thumbnail_url"),
+            )
+            .join(Product, Product.id == CartItem.product_id)
+            .join(ProductDetail, ProductDetail.id == CartItem.detail_id)
+            .where(CartItem.cart_id == cart_id)
+            .order_by(CartItem.create_at, CartItem.id)
+        ).mappings().all()
+
+    def get_cart_item_with_owner(
+        self, cart_item_id: UUID, session: Session
+    ) -> Tuple[CartItem, UUID] | None:
+        """Lấy cart item kèm user_id chủ giỏ hàng (1 query thay vì item rồi cart)"""
+        return session.exec(
+            select(CartItem, Cart.user_id)
+            .join(Cart, Cart.id == CartItem.cart_id)
+            .where(CartItem.id == cart_item_id)
         ).first()
     
     def get_cart_item_by_product(
@@ -82,37 +123,94 @@ class CartRepository:
                 (CartItem.cart_id == cart_id) & (CartItem.detail_id == detail_id)
             )
         ).first()
-    def create_cart_item(self, cart_item: CartItem, session: Session) -> CartItem:
-        """Tạo cart item mới"""
-        session.add(cart_item)
-        session.commit()
-        session.refresh(cart_item)
-        return cart_item
-    
+    def upsert_cart_item(
+        self,
+        cart_id: UUID,
+        product_id: UUID,
+        detail_id: UUID,
+        quantity: int,
+        session: Session,
+    ) -> UUID:
+        """
+        Thêm biến thể vào giỏ hoặc cộng dồn số lượng - 1 câu lệnh, an toàn khi double-click
+        - MySQL: INSERT ... ON DUPLICATE KEY UPDATE quantity = quantity + :q
+        - SQLite (test): INSERT ... ON CONFLICT (cart_id, detail_id) DO UPDATE
+        - dialect khác: NotImplementedError
+        Dựa trên unique (cart_id, detail_id); trả về id dùng cho dòng mới (chưa commit)
+        """
+        now = datetime.now()
+        values = dict(
+            id=uuid4(),
+            cart_id=cart_id,
+            product_id=product_id,
+            detail_id=detail_id,
+            quantity=quantity,
+            create_at=now,
+            update_at=now,
+        )
+        dialect = session.get_bind().dialect.name
+        if dialect == "mysql":
+            stmt = mysql_insert(CartItem).values(**values)
+            stmt = stmt.on_duplicate_key_update(
+                quantity=CartItem.quantity + stmt.inserted.quantity,
+                update_at=stmt.inserted.update_at,
+            )
+        elif dialect == "sqlite":
+            stmt = sqlite_insert(CartItem).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["cart_id", "detail_id"],
+                set_={
+                    "quantity": CartItem.quantity + stmt.excluded.quantity,
+                    "update_at": stmt.excluded.update_at,
+                },
+            )
+        else:
+            raise NotImplementedError(f"upsert_cart_item chưa hỗ trợ dialect '{dialect}'")
+        session.exec(stmt)
+        return values["id"]
+
     def update_cart_item(self, cart_item: CartItem, session: Session) -> CartItem:
-        """Cập nhật cart item"""
+        """Cập nhật cart item (chưa commit)"""
         cart_item.update_at = datetime.now()
         session.add(cart_item)
-        session.commit()
-        session.refresh(cart_item)
         return cart_item
     
     def delete_cart_item(self, cart_item: CartItem, session: Session) -> None:
-        """Xóa cart item"""
-        session.delete(cart_item)
-        session.commit()
-    
-    def delete_all_cart_items(self, cart_id: UUID, session: Session) -> None:
-        """Xóa tất cả cart items"""
-        cart_items = self.get_cart_items(cart_id, session)
-        for item in cart_items:
-            session.delete(item)
-        session.commit()
+        """Xóa cart item (chưa commit); dòng vừa add chưa flush thì chỉ bỏ khỏi session"""
+        if cart_item in session.new:
+            session.expunge(cart_item)
+        else:
+            session.delete(cart_item)
+    
+    def delete_all_cart_items(self, cart_id: UUID, session: Session) -> int:
+        """DELETE FROM cart_item WHERE cart_id = ? - 1 câu lệnh, chưa commit; trả về số dòng đã xóa"""
+        result = session.exec(
+            delete(CartItem)
+            .where(CartItem.cart_id == cart_id)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
     
     # ==================== PRODUCT FUNCTIONS ====================
     
-    def get_product_by_id(self, product_id: UUID, session: Session) -> Product | None:
-        """Lấy sản phẩm theo ID"""
+    def detail_exists(self, product_id: UUID, detail_id: UUID, session: Session) -> bool:
+        """Biến thể detail_id có tồn tại và thuộc sản phẩm product_id (1 query)"""
         return session.exec(
-            select(Product).where(Product.id == product_id)
-        ).first()
+            select(ProductDetail.id).where(
+                ProductDetail.id == detail_id, ProductDetail.product_id == product_id
+            )
+        ).first() is not None
+
+    def get_detail_products(
+        self, detail_ids: Iterable[UUID], session: Session
+    ) -> Dict[UUID, UUID]:
+        """detail_id -> product_id của các biến thể tồn tại (1 query IN)"""
+        ids = set(detail_ids)
+        if not ids:
+            return {}
+        rows = session.exec(
+            select(ProductDetail.id, ProductDetail.product_id).where(
+                ProductDetail.id.in_(ids)
+            )
+        ).all()
+        return {detail_id: product_id for detail_id, product_id in rows}
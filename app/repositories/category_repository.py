@@ -1,5 +1,6 @@
 from app.models.category_model import Category, CategoryIn, CategoryOut
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import Dict , Any, List
 from uuid import UUID
 
@@ -27,4 +28,16 @@ class CategoryRepository:
         if category: 
             session.delete(category)
         else: 
-            return ResponseHandler.error("Lỗi không thể xóa từ server" , 500)
\ No newline at end of file
+            return ResponseHandler.error("Lỗi không thể xóa từ server" , 500)
+
+
+class AsyncCategoryRepository:
+    """Bản async của CategoryRepository cho các route `async def`"""
+
+    async def get_all(self, session: AsyncSession) -> List[Category]:
+        result = await session.exec(select(Category))
+        return result.all()
+
+    async def get_by_id(self, id: UUID, session: AsyncSession) -> Category | None:
+        result = await session.exec(select(Category).where(Category.id == id))
+        return result.first()
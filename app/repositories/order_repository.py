@@ -1,15 +1,19 @@
 """
 Order Repository - Xử lý tất cả query liên quan đến đơn hàng
 """
-from sqlmodel import Session, select
-from typing import List
+from sqlmodel import Session, select, or_, and_
+from sqlalchemy import func, delete
+from typing import List, Dict, Iterable
 from uuid import UUID
+from datetime import datetime
 
 from app.models.order_model import Order
 from app.models.order_item_model import OrderItem
+from app.models.payment_detail_model import PaymentDetail
 from app.models.cart_model import Cart
 from app.models.cart_item_model import CartItem
 from app.models.product_model import Product
+from app.models.product_detail_model import ProductDetail
 from app.models.user_model import User
 from app.enum.role_enum import OrderStatus
 
@@ -31,14 +35,26 @@ class OrderRepository:
             select(CartItem).where(CartItem.cart_id == cart_id)
         ).all()
     
-    def delete_cart_item(self, item: CartItem, session: Session) -> None:
-        """Xóa item khỏi giỏ"""
-        session.delete(item)
+    def delete_cart_items(
+        self,
+        cart_id: UUID,
+        session: Session,
+        item_ids: Iterable[UUID] | None = None,
+    ) -> int:
+        """
+        DELETE FROM cart_item WHERE cart_id = ? [AND id IN (...)] - 1 câu lệnh, chưa commit
+        Returns: số dòng đã xóa
+        """
+        stmt = delete(CartItem).where(CartItem.cart_id == cart_id)
+        if item_ids is not None:
+            stmt = stmt.where(CartItem.id.in_(list(item_ids)))
+        result = session.exec(stmt.execution_options(synchronize_session=False))
+        return result.rowcount
     
     def update_cart_total(self, cart: Cart, session: Session) -> None:
-        """Cập nhật tổng tiền giỏ"""
+        """Cập nhật tổng số lượng giỏ (chưa commit - caller commit cùng đơn hàng)"""
+        cart.update_at = datetime.now()
         session.add(cart)
-        session.commit()
     
     # ==================== ORDER FUNCTIONS ====================
     
@@ -69,15 +85,36 @@ class OrderRepository:
         user_id: UUID, 
         session: Session,
         skip: int = 0,
-        limit: int = 20
-    ) -> List[Order]:
-        """Lấy danh sách đơn hàng của user"""
-        return session.exec(
-            select(Order)
+        limit: int = 20,
+        cursor: tuple[datetime, UUID] | None = None,
+    ) -> List[tuple[Order, int, int]]:
+        """
+        Lấy danh sách đơn hàng của user, mới nhất trước
+        - Mỗi dòng: (order, số dòng item, tổng số lượng) - 1 query GROUP BY
+        - cursor: (create_at, id) của đơn cuối trang trước -> keyset, bỏ qua skip
+        """
+        query = (
+            select(
+                Order,
+                func.count(OrderItem.id).label("items_count"),
+                func.coalesce(func.sum(OrderItem.quantity), 0).label("items_quantity"),
+            )
+            .outerjoin(OrderItem, OrderItem.order_id == Order.id)
             .where(Order.user_id == user_id)
-            .offset(skip)
-            .limit(limit)
-        ).all()
+            .group_by(Order.id)
+        )
+        if cursor:
+            cursor_create_at, cursor_id = cursor
+            query = query.where(
+                or_(
+                    Order.create_at < cursor_create_at,
+                    and_(Order.create_at == cursor_create_at, Order.id < cursor_id),
+                )
+            )
+        else:
+            query = query.offset(skip)
+        query = query.order_by(Order.create_at.desc(), Order.id.desc()).limit(limit)
+        return session.exec(query).all()
     
     def get_order_items(self, order_id: UUID, session: Session) -> List[OrderItem]:
         """Lấy tất cả items của đơn hàng"""
@@ -85,23 +122,87 @@ class OrderRepository:
             select(OrderItem).where(OrderItem.order_id == order_id)
         ).all()
     
+    def _filter_orders(
+        self,
+        stmt,
+        status_filter: str | None = None,
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+        user_id: UUID | None = None,
+        payment_status: str | None = None,
+    ):
+        """Áp dụng các bộ lọc admin dùng chung cho query danh sách và COUNT"""
+        if status_filter:
+            stmt = stmt.where(Order.status == status_filter)
+        if date_from:
+            stmt = stmt.where(Order.create_at >= date_from)
+        if date_to:
+            stmt = stmt.where(Order.create_at < date_to)
+        if user_id:
+            stmt = stmt.where(Order.user_id == user_id)
+        if payment_status:
+            stmt = stmt.where(PaymentDetail.status == payment_status)
+        return stmt
+
     def get_all_orders(
         self,
         session: Session,
         skip: int = 0,
         limit: int = 50,
-        status_filter: str | None = None
-    ) -> tuple[List[Order], int]:
-        """Lấy tất cả đơn hàng (admin)"""
-        query = select(Order)
-        
-        if status_filter:
-            query = query.where(Order.status == status_filter)
-        
-        orders = session.exec(query.offset(skip).limit(limit)).all()
-        total = len(session.exec(query).all())
+        status_filter: str | None = None,
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+        user_id: UUID | None = None,
+        payment_status: str | None = None,
+        cursor: tuple[datetime, UUID] | None = None,
+    ) -> tuple[List[tuple[Order, str | None, str | None, int]], int]:
+        """
+        Lấy tất cả đơn hàng (admin), mới nhất trước
+        - Mỗi dòng: (order, user_email, payment_status, items_count) trong 1 câu SELECT
+        - cursor: (create_at, id) của đơn cuối trang trước -> keyset, bỏ qua skip
+        - total: COUNT(*) với cùng bộ lọc
+        """
+        filters = dict(
+            status_filter=status_filter,
+            date_from=date_from,
+            date_to=date_to,
+            user_id=user_id,
+            payment_status=payment_status,
+        )
+        items_count = (
+            select(func.count(OrderItem.id))
+            .where(OrderItem.order_id == Order.id)
+            .correlate(Order)
+            .scalar_subquery()
+        )
+        query = (
+            select(Order, User.email, PaymentDetail.status, items_count.label("items_count"))
+            .outerjoin(User, Order.user_id == User.id)
+            .outerjoin(PaymentDetail, Order.payment_id == PaymentDetail.id)
+        )
+        query = self._filter_orders(query, **filters)
+        if cursor:
+            cursor_create_at, cursor_id = cursor
+            query = query.where(
+                or_(
+                    Order.create_at < cursor_create_at,
+                    and_(Order.create_at == cursor_create_at, Order.id < cursor_id),
+                )
+            )
+        else:
+            query = query.offset(skip)
+        query = query.order_by(Order.create_at.desc(), Order.id.desc()).limit(limit)
+        rows = session.exec(query).all()
+
+        count_query = select(func.count()).select_from(Order)
+        if payment_status:
+            count_query = count_query.join(
+                PaymentDetail, Order.payment_id == PaymentDetail.id
+            )
+        count_query = self._filter_orders(count_query, **filters)
+        total = session.exec(count_query).one()
         
-        return orders, total
+        return rows, total
     
     def update_order_status(
         self, 
@@ -128,6 +229,28 @@ class OrderRepository:
             select(Product).where(Product.id == product_id)
         ).first()
     
+    def get_products_by_ids(
+        self, product_ids: Iterable[UUID], session: Session
+    ) -> Dict[UUID, Product]:
+        """Lấy nhiều sản phẩm trong 1 query IN (...), trả về dict theo id"""
+        ids = set(product_ids)
+        if not ids:
+            return {}
+        products = session.exec(select(Product).where(Product.id.in_(ids))).all()
+        return {product.id: product for product in products}
+
+    def get_details_by_ids(
+        self, detail_ids: Iterable[UUID], session: Session
+    ) -> Dict[UUID, ProductDetail]:
+        """Lấy nhiều variant trong 1 query IN (...), trả về dict theo id"""
+        ids = set(detail_ids)
+        if not ids:
+            return {}
+        details = session.exec(
+            select(ProductDetail).where(ProductDetail.id.in_(ids))
+        ).all()
+        return {detail.id: detail for detail in details}
+    
     # ==================== USER FUNCTIONS ====================
     
     def get_user_by_id(self, user_id: UUID, session: Session) -> User | None:
@@ -1,27 +1,256 @@
-from sqlmodel import Session, select, or_
+from sqlmodel import Session, select, or_, and_
+from sqlalchemy import func, distinct, delete, insert, case
+from sqlalchemy.dialects.mysql import match as mysql_match
+from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException
 from typing import Any
 from sqlalchemy.orm import selectinload , joinedload
-from app.models.product_model import ProductIn, Product, ProductOut
+from app.models.product_model import ProductIn, Product, ProductOut, ProductFilter
 from app.models.product_image_model import ProductImage
+from app.models.category_model import Category
 from app.utils.response_helper import ResponseHandler
 from app.models.product_detail_model import ProductDetail
+from app.models.product_summary_model import ProductSummary
 from uuid import UUID
+from datetime import datetime
 from typing import List, Dict, Any
+from app.core.cache import shared_cache
+from app.utils.search_index import product_search_index
+from app.utils.text import normalize_text, build_search_text
+from app.utils.price import parse_price
+from app.enum.product_enum import ProductSort
+from app.enum.role_enum import ImageStatus
+
+def cover_thumbnail_subquery():
+    """Scalar subquery: thumbnail ảnh đầu tiên đã upload xong (theo created_at) của Product đang select"""
+    return (
+        select(ProductImage.thumbnail_url)
+        .where(
+            ProductImage.product_id == Product.id,
+            ProductImage.status == ImageStatus.READY,
+        )
+        .order_by(ProductImage.created_at, ProductImage.id)
+        .limit(1)
+        .correlate(Product)
+        .scalar_subquery()
+    )
+
+
+def ready_images():
+    """Loader option: chỉ load ảnh đã upload xong (ảnh pending/failed chưa có url)"""
+    return selectinload(Product.images.and_(ProductImage.status == ImageStatus.READY))
+
+
+def total_stock_subquery():
+    """Scalar subquery: tổng stock mọi biến thể của Product đang select"""
+    return (
+        select(func.coalesce(func.sum(ProductDetail.stock), 0))
+        .where(ProductDetail.product_id == Product.id)
+        .correlate(Product)
+        .scalar_subquery()
+    )
+
+
+def variant_count_subquery():
+    """Scalar subquery: số biến thể (product_detail) của Product đang select"""
+    return (
+        select(func.count(ProductDetail.id))
+        .where(ProductDetail.product_id == Product.id)
+        .correlate(Product)
+        .scalar_subquery()
+    )
+
+
+def summary_projection():
+    """SELECT các cột của product_summary tính từ bảng gốc (refresh 1 dòng / rebuild toàn bộ)"""
+    return select(
+        Product.id.label("product_id"),
+        Product.name,
+        Product.price,
+        Product.price_vnd,
+        Product.category_id,
+        Category.name.label("category_name"),
+        cover_thumbnail_subquery().label("thumbnail_url"),
+        total_stock_subquery().label("total_stock"),
+        variant_count_subquery().label("variant_count"),
+        Product.create_at,
+    ).outerjoin(Category, Category.id == Product.category_id)
+
 
 class ProductRepository :
     def get_all(self, session: Session,
                  category_id : UUID | None = None, 
                 page: int = 1, 
-                limit: int = 20
-                ) -> Dict[str,Any]: 
-        off_set = (page - 1) * limit
-        stmt = select(Product).options(joinedload(Product.category),selectinload(Product.images)).offset(offset=off_set).limit(limit=limit)
-        if category_id: 
-              stmt = select(Product).options(joinedload(Product.category),selectinload(Product.images)).where(Product.category_id == category_id).offset(offset=off_set).limit(limit=limit)
-        products = session.exec(stmt).all()
-        return products
-        
+                limit: int = 20,
+                cursor: tuple[datetime, UUID] | None = None,
+                filters: ProductFilter | None = None,
+                sort: str = ProductSort.NEWEST,
+                ) -> List[Dict[str, Any]]: 
+        """
+        Lấy danh sách sản phẩm cho trang lưới từ read model product_summary (1 index scan, không join)
+        - sắp xếp ổn định theo (create_at, id) hoặc (price_vnd, id)
+        - cursor: (create_at, id) của record cuối trang trước -> keyset, bỏ qua page (chỉ sort newest)
+        - không có cursor: phân trang OFFSET theo page
+        - filters: khoảng giá, màu, size, còn hàng (lọc trong SQL)
+        """
+        stmt = select(
+            ProductSummary.product_id.label("id"),
+            ProductSummary.name,
+            ProductSummary.price,
+            ProductSummary.price_vnd,
+            ProductSummary.category_id,
+            ProductSummary.category_name,
+            ProductSummary.thumbnail_url,
+            ProductSummary.total_stock,
+            ProductSummary.variant_count,
+            ProductSummary.create_at,
+        )
+        stmt = self._apply_filters(stmt, category_id, filters)
+        if cursor:
+            cursor_create_at, cursor_id = cursor
+            stmt = stmt.where(
+                or_(
+                    ProductSummary.create_at < cursor_create_at,
+                    and_(
+                        ProductSummary.create_at == cursor_create_at,
+                        ProductSummary.product_id < cursor_id,
+                    ),
+                )
+            )
+        else:
+            stmt = stmt.offset((page - 1) * limit)
+        stmt = stmt.order_by(*self._order_by(sort)).limit(limit)
+        return session.exec(stmt).mappings().all()
+
+    def _order_by(self, sort: str) -> tuple:
+        """Helper: ORDER BY theo sort, luôn kèm id để thứ tự ổn định giữa các trang"""
+        if sort == ProductSort.PRICE_ASC:
+            return ProductSummary.price_vnd.asc(), ProductSummary.product_id.asc()
+        if sort == ProductSort.PRICE_DESC:
+            return ProductSummary.price_vnd.desc(), ProductSummary.product_id.desc()
+        return ProductSummary.create_at.desc(), ProductSummary.product_id.desc()
+
+    def count(
+        self,
+        session: Session,
+        category_id: UUID | None = None,
+        filters: ProductFilter | None = None,
+    ) -> int:
+        """Tổng số sản phẩm (COUNT(*)), cache theo category + bộ lọc"""
+        def _count() -> int:
+            stmt = select(func.count()).select_from(ProductSummary)
+            stmt = self._apply_filters(stmt, category_id, filters)
+            return session.exec(stmt).one()
+
+        filter_key = filters.cache_key() if filters else ""
+        return shared_cache.get_or_set(
+            f"products:count:{category_id}:{filter_key}",
+            _count,
+            tags=[f"category:{category_id}" if category_id else "products:all"],
+        )
+
+    def get_facets(self, session: Session, category_id: UUID | None = None) -> Dict[str, Any]:
+        """
+        Facet của danh mục (không phụ thuộc bộ lọc đang chọn), cache theo category
+        - colors/sizes: số sản phẩm có biến thể mang màu/size đó
+        - price: giá thấp nhất/cao nhất
+        - in_stock: số sản phẩm còn ít nhất một biến thể có hàng
+        """
+        def _facets() -> Dict[str, Any]:
+            def _variant_counts(column) -> List[Dict[str, Any]]:
+                stmt = (
+                    select(column, func.count(distinct(ProductDetail.product_id)))
+                    .join(ProductSummary, ProductSummary.product_id == ProductDetail.product_id)
+                    .where(column.is_not(None))
+                    .group_by(column)
+                    .order_by(column)
+                )
+                if category_id:
+                    stmt = stmt.where(ProductSummary.category_id == category_id)
+                return [{"value": v, "count": c} for v, c in session.exec(stmt).all()]
+
+            summary_stmt = select(
+                func.min(ProductSummary.price_vnd),
+                func.max(ProductSummary.price_vnd),
+                func.count(case((ProductSummary.total_stock > 0, 1))),
+            )
+            if category_id:
+                summary_stmt = summary_stmt.where(ProductSummary.category_id == category_id)
+            min_price, max_price, in_stock = session.exec(summary_stmt).one()
+
+            return {
+                "colors": _variant_counts(ProductDetail.color),
+                "sizes": _variant_counts(ProductDetail.size),
+                "price": {"min": min_price, "max": max_price},
+                "in_stock": in_stock,
+            }
+
+        return shared_cache.get_or_set(
+            f"products:facets:{category_id}",
+            _facets,
+            tags=[f"category:{category_id}" if category_id else "products:all"],
+        )
+
+    def _apply_filters(self, stmt, category_id: UUID | None, filters: ProductFilter | None):
+        """
+        Helper: thêm điều kiện lọc (trên product_summary) vào stmt
+        - màu/size/còn hàng phải cùng thuộc một biến thể (IN subquery trên product_detail)
+        - chỉ lọc còn hàng: dùng total_stock có sẵn, không cần subquery
+        """
+        if category_id:
+            stmt = stmt.where(ProductSummary.category_id == category_id)
+        if not filters:
+            return stmt
+
+        if filters.min_price is not None:
+            stmt = stmt.where(ProductSummary.price_vnd >= filters.min_price)
+        if filters.max_price is not None:
+            stmt = stmt.where(ProductSummary.price_vnd <= filters.max_price)
+
+        variant_conditions = []
+        if filters.color:
+            variant_conditions.append(ProductDetail.color == filters.color)
+        if filters.size:
+            variant_conditions.append(ProductDetail.size == filters.size)
+        if filters.in_stock:
+            if not variant_conditions:
+                return stmt.where(ProductSummary.total_stock > 0)
+            variant_conditions.append(ProductDetail.stock > 0)
+        if variant_conditions:
+            stmt = stmt.where(
+                ProductSummary.product_id.in_(
+                    select(ProductDetail.product_id).where(*variant_conditions)
+                )
+            )
+        return stmt
+
+    # ==================== PRODUCT SUMMARY (READ MODEL) ====================
+
+    def refresh_summary(self, product_id: UUID, session: Session) -> None:
+        """
+        Tính lại dòng product_summary của 1 sản phẩm (xóa nếu sản phẩm không còn)
+        Chưa commit: gọi trong cùng transaction với thay đổi product/detail/ảnh,
+        caller commit 1 lần -> read model không lệch với bảng gốc
+        """
+        row = session.exec(
+            summary_projection().where(Product.id == product_id)
+        ).mappings().first()
+        if row is None:
+            session.exec(delete(ProductSummary).where(ProductSummary.product_id == product_id))
+        else:
+            session.merge(ProductSummary(**row))
+
+    def rebuild_summaries(self, session: Session) -> int:
+        """Dựng lại toàn bộ product_summary bằng 1 INSERT ... SELECT, trả về số dòng"""
+        projection = summary_projection()
+        session.exec(delete(ProductSummary))
+        session.exec(
+            insert(ProductSummary).from_select(
+                [c.name for c in projection.selected_columns], projection
+            )
+        )
+        session.commit()
+        return session.exec(select(func.count()).select_from(ProductSummary)).one()
 
     def get_by_id(self,  product_id: UUID, session: Session) -> Product:         
             product = session.exec(
@@ -39,29 +268,41 @@ class ProductRepository :
             return products
     
     def create(self ,session: Session , product: Product) -> Product: 
+            """Tạo sản phẩm (flush, chưa commit - service commit cùng product_summary)"""
+            product.search_text = build_search_text(product.name, product.description)
+            product.price_vnd = parse_price(product.price)
             session.add(product)
-            session.commit()
-            session.refresh(product)
+            session.flush()
             return product
     
     def update(self, session: Session, product: Product) -> Product:
-        """Cập nhật sản phẩm"""
+        """Cập nhật sản phẩm (flush, chưa commit)"""
+        product.search_text = build_search_text(product.name, product.description)
+        product.price_vnd = parse_price(product.price)
         session.add(product)
-        session.commit()
-        session.refresh(product)
+        session.flush()
         return product
     
     def delete(self, product : Product, session: Session) -> None: 
+        """Xóa sản phẩm (flush, chưa commit)"""
         session.delete(product)
-        session.commit()
+        session.flush()
+
+    def get_spooled_public_ids(self, product_id: UUID, session: Session) -> List[str]:
+        """public_id tạm ("pending:...") của các ảnh chưa upload xong - tên file trong spool"""
+        return session.exec(
+            select(ProductImage.cloudinary_public_id).where(
+                ProductImage.product_id == product_id,
+                ProductImage.status.in_([ImageStatus.PENDING, ImageStatus.PROCESSING]),
+            )
+        ).all()
     
     # ==================== PRODUCT DETAIL METHODS ====================
     
     def create_detail(self, detail: ProductDetail, session : Session) -> ProductDetail: 
-        """Tạo chi tiết sản phẩm mới"""
+        """Tạo chi tiết sản phẩm mới (flush, chưa commit)"""
         session.add(detail)
-        session.commit()
-        session.refresh(detail)
+        session.flush()
         return detail
 
     def get_detail_by_id(self, detail_id: UUID, session: Session) -> ProductDetail | None: 
@@ -77,32 +318,90 @@ class ProductRepository :
         return results
     
     def update_detail(self, detail: ProductDetail, session: Session) -> ProductDetail:
-        """Cập nhật chi tiết sản phẩm"""
+        """Cập nhật chi tiết sản phẩm (flush, chưa commit)"""
         session.add(detail)
-        session.commit()
-        session.refresh(detail)
+        session.flush()
         return detail
     
     def delete_detail(self, detail: ProductDetail, session: Session) -> None:
-        """Xóa chi tiết sản phẩm"""
+        """Xóa chi tiết sản phẩm (flush, chưa commit)"""
         session.delete(detail)
-        session.commit()
+        session.flush()
+
+    def get_suggest_entries(self, session: Session) -> List[tuple[str, UUID, str]]:
+        """(kind, id, tên) của mọi sản phẩm và danh mục - dùng dựng SuggestIndex"""
+        products = session.exec(select(Product.id, Product.name)).all()
+        categories = session.exec(select(Category.id, Category.name)).all()
+        return [("product", id, name) for id, name in products] + [
+            ("category", id, name) for id, name in categories
+        ]
 
     def search(
         self, keyword: str, session: Session, skip: int = 0, limit: int = 20
-    ) -> List[Product]:
-        """Tìm kiếm sản phẩm theo tên hoặc mô tả"""
+    ) -> tuple[List[Product], int]:
+        """
+        Tìm kiếm sản phẩm theo tên hoặc mô tả, xếp theo độ liên quan
+        - Không phân biệt dấu: so khớp trên search_text / keyword đã chuẩn hóa
+        - MySQL: FULLTEXT index (ngram) trên search_text, MATCH ... AGAINST (BOOLEAN MODE)
+        - DB khác (SQLite khi test): inverted index trong process
+        Returns: (sản phẩm của trang hiện tại, tổng số kết quả)
+        """
+        if session.get_bind().dialect.name == "mysql":
+            return self._search_fulltext(keyword, session, skip, limit)
+        return self._search_index(keyword, session, skip, limit)
+
+    def _search_fulltext(
+        self, keyword: str, session: Session, skip: int, limit: int
+    ) -> tuple[List[Product], int]:
+        # BOOLEAN MODE "+t1 +t2": bắt buộc có mọi từ, cùng ngữ nghĩa AND với inverted index
+        terms = normalize_text(keyword).split()
+        if not terms:
+            return [], 0
+        score = mysql_match(
+            Product.search_text, against=" ".join(f"+{term}" for term in terms)
+        ).in_boolean_mode()
         stmt = (
             select(Product)
-            .options(joinedload(Product.category), selectinload(Product.images))
-            .where(
-                or_(
-                    Product.name.ilike(f"%{keyword}%"),
-                    Product.description.ilike(f"%{keyword}%"),
-                )
-            )
+            .options(joinedload(Product.category), ready_images())
+            .where(score > 0)
+            .order_by(score.desc(), Product.id)
             .offset(skip)
             .limit(limit)
         )
         products = session.exec(stmt).all()
-        return products
+        total = session.exec(
+            select(func.count()).select_from(Product).where(score > 0)
+        ).one()
+        return products, total
+
+    def _search_index(
+        self, keyword: str, session: Session, skip: int, limit: int
+    ) -> tuple[List[Product], int]:
+        product_search_index.sync(
+            lambda: session.exec(select(Product.id, Product.name, Product.description)).all()
+        )
+        ranked = product_search_index.search(keyword)
+        page_ids = [doc_id for doc_id, _ in ranked[skip : skip + limit]]
+        if not page_ids:
+            return [], len(ranked)
+        stmt = (
+            select(Product)
+            .options(joinedload(Product.category), ready_images())
+            .where(Product.id.in_(page_ids))
+        )
+        by_id = {p.id: p for p in session.exec(stmt).all()}
+        products = [by_id[i] for i in page_ids if i in by_id]
+        return products, len(ranked)
+
+
+class AsyncProductRepository:
+    """Bản async của ProductRepository - relationship phải load sẵn (không lazy load được)"""
+
+    async def get_by_id(self, product_id: UUID, session: AsyncSession) -> Product | None:
+        stmt = (
+            select(Product)
+            .options(ready_images(), selectinload(Product.product_details))
+            .where(Product.id == product_id)
+        )
+        result = await session.exec(stmt)
+        return result.first()
@@ -11,6 +11,7 @@ from app.core.database import get_session
 from app.models.user_model import User
 from app.services.cart_service import CartService
 from app.deps.auth_dependency import get_current_user
+from app.schemas.cart_schemas import CartBatchRequest
 from typing import Dict, Any, Optional
 
 cartRouter = APIRouter(prefix="/cart", tags=["Cart"])
@@ -71,6 +72,26 @@ def add_to_cart(
     )
 
 
+@cartRouter.patch("/items:batch", summary="[USER] Thêm/sửa/xóa nhiều sản phẩm trong giỏ")
+def apply_cart_batch(
+    data: CartBatchRequest,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+    service: CartService = Depends()
+) -> Dict[str, Any]:
+    """
+    [USER] Áp dụng danh sách thao tác add/set/remove trong 1 transaction
+    - Yêu cầu đăng nhập
+    - Dùng khi gộp giỏ hàng khách sau đăng nhập, mua lại đơn cũ...
+    - Trả về toàn bộ giỏ hàng sau khi áp dụng
+    """
+    return service.apply_batch(
+        current_user=current_user,
+        operations=data.operations,
+        session=session,
+    )
+
+
 @cartRouter.patch("/items/{cart_item_id}", summary="[USER] Cập nhật số lượng")
 def update_cart_item(
     cart_item_id: UUID,
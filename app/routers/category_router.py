@@ -5,8 +5,9 @@ User/Guest: Xem danh mục
 """
 from fastapi import APIRouter, Depends
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
-from app.core.database import get_session
+from app.core.database import get_session, get_async_read_session
 from app.models.category_model import CategoryIn, CategoryOut
 from app.models.user_model import User
 from app.services.category_service import CategoryService
@@ -21,10 +22,10 @@ categoryRouter = APIRouter(prefix="/categories", tags=["Categories"])
 # ==================== PUBLIC ENDPOINTS (Guest có thể xem) ====================
 
 @categoryRouter.get("/", summary="[PUBLIC] Lấy danh sách danh mục")
-def get_all_categories(
+async def get_all_categories(
     skip: int = 0,
     limit: int = 100,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_read_session),
     service: CategoryService = Depends()
 ) -> List[CategoryOut]:
     """
@@ -33,20 +34,20 @@ def get_all_categories(
     - **skip**: Số record bỏ qua
     - **limit**: Số record tối đa trả về
     """
-    return service.get_all_categories(session=session)
+    return await service.get_all_categories(session=session)
 
 
 @categoryRouter.get("/{category_id}", summary="[PUBLIC] Lấy chi tiết danh mục")
-def get_category_by_id(
+async def get_category_by_id(
     category_id: UUID,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_read_session),
     service: CategoryService = Depends()
 ) -> CategoryOut:
     """
     [PUBLIC] Lấy thông tin chi tiết của một danh mục
     - Không cần đăng nhập
     """
-    return service.get_category_by_id(category_id=category_id, session=session)
+    return await service.get_category_by_id(category_id=category_id, session=session)
 
 
 # ==================== ADMIN ENDPOINTS ====================
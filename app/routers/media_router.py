@@ -0,0 +1,53 @@
+"""
+Media Router - phục vụ ảnh của LocalImageUploader (IMAGE_STORAGE=local)
+- ?w=&h=&format=webp: biến thể tạo lần đầu, cache trên đĩa; chỉ nhận kích thước/định dạng
+  trong LocalImageUploader.VARIANT_SIZES / VARIANT_FORMATS (400 nếu khác)
+- file gốc không phải ảnh đọc được -> 415
+- ETag + Cache-Control, trả 304 khi If-None-Match khớp; FileResponse hỗ trợ Range
+"""
+import os
+from fastapi import APIRouter, HTTPException, Header, Response, status
+from fastapi.responses import FileResponse
+from typing import Annotated, Literal
+
+from app.core.image_uploader import local_storage
+from app.core.settings import settings
+from app.utils.image_variants import InvalidImageError
+
+mediaRouter = APIRouter(prefix="/media", tags=["Media"])
+
+
+@mediaRouter.get("/{name}", summary="[PUBLIC] Ảnh sản phẩm lưu local")
+def get_media(
+    name: str,
+    w: int | None = None,
+    h: int | None = None,
+    format: Literal["webp", "jpg", "jpeg", "png"] | None = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    if not local_storage.allows_variant(w, h, format):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Kích thước ảnh không được hỗ trợ",
+        )
+    try:
+        path = local_storage.variant_path(name, width=w, height=h, format=format)
+    except InvalidImageError:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="File không phải ảnh hợp lệ",
+        )
+    if not path:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Không tìm thấy ảnh")
+
+    stat = os.stat(path)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}, immutable",
+    }
+    if if_none_match and etag in (
+        tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return FileResponse(path, headers=headers)
@@ -6,6 +6,7 @@ User: CRUD đơn hàng cá nhân
 from fastapi import APIRouter, Depends, Query
 from sqlmodel import Session
 from uuid import UUID
+from datetime import datetime
 from pydantic import BaseModel
 from app.core.database import get_session
 from app.models.order_model import OrderOut
@@ -30,13 +31,17 @@ def get_my_orders(
     service: Annotated[OrderService, Depends()],
     skip: int = 0,
     limit: int = 100,
+    cursor: Annotated[
+        str | None, Query(description="`cursor` của đơn cuối cùng trang trước")
+    ] = None,
 ) -> List[Dict[str, Any]]:
     """
     [USER] Lấy danh sách đơn hàng của user hiện tại
     - Yêu cầu đăng nhập
+    - Mới nhất trước; truyền `cursor` của đơn cuối để lấy trang tiếp theo
     """
     return service.get_my_orders(
-        user=current_user, session=session, skip=skip, limit=limit
+        user=current_user, session=session, skip=skip, limit=limit, cursor=cursor
     )
 
 
@@ -99,17 +104,36 @@ def get_all_orders(
     status_filter: Annotated[
         str | None, Query(description="Lọc theo trạng thái")
     ] = None,
+    date_from: Annotated[
+        datetime | None, Query(description="Từ ngày (create_at >= date_from)")
+    ] = None,
+    date_to: Annotated[
+        datetime | None, Query(description="Đến ngày (create_at < date_to)")
+    ] = None,
+    user_id: Annotated[UUID | None, Query(description="Lọc theo user")] = None,
+    payment_status: Annotated[
+        str | None, Query(description="Lọc theo trạng thái thanh toán")
+    ] = None,
+    cursor: Annotated[
+        str | None, Query(description="Keyset cursor (next_cursor của trang trước)")
+    ] = None,
 ) -> Dict[str, Any]:
     """
     [ADMIN] Lấy danh sách tất cả đơn hàng
     - Yêu cầu quyền Admin
-    - Có thể lọc theo trạng thái
+    - Có thể lọc theo trạng thái, khoảng ngày, user, trạng thái thanh toán
+    - Truyền `cursor` để phân trang keyset thay cho skip
     """
     return service.get_all_orders(
         session=session,
         skip=skip,
         limit=limit,
-        status_filter=status_filter
+        status_filter=status_filter,
+        date_from=date_from,
+        date_to=date_to,
+        user_id=user_id,
+        payment_status=payment_status,
+        cursor=cursor,
     )
 
 
@@ -5,12 +5,13 @@ User/Guest: Xem sản phẩm
 """
 from fastapi import APIRouter, Depends, Query, Form, File, UploadFile
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
-from typing import Annotated
+from typing import Annotated, Literal
 
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session, get_async_read_session
 from app.deps.auth_dependency import admin_required
-from app.models.product_model import ProductIn, ProductOut, ProductDetailOut, Product
+from app.models.product_model import ProductIn, ProductOut, ProductDetailOut, Product, ProductFilter
 from app.models.user_model import User
 from app.services.product_service import ProductService
 from app.models.product_detail_model import ProductDetailIn, ProductDetailOut
@@ -25,16 +26,27 @@ productRouter = APIRouter(prefix="/products", tags=["Products"])
 
 @productRouter.get("", summary="[PUBLIC] Lấy danh sách sản phẩm")
 def get_all_products(
-    session: Annotated[Session, Depends(get_session)],
+    session: Annotated[Session, Depends(get_read_session)],
     service: Annotated[ProductService, Depends()],
+    filters: Annotated[ProductFilter, Depends()],
     category_id: UUID | None = None,
     page: int = 0,
     limit: int = 20,
+    cursor: Annotated[
+        str | None, Query(description="Keyset cursor (next_cursor của trang trước)")
+    ] = None,
+    sort: Literal["newest", "price_asc", "price_desc"] = "newest",
 ) -> Dict[str, Any]:
     # off set = (page -1 ) * pageSize(limit)
     # limit = pageSize
     return service.get_all_products(
-        session=session, category_id=category_id, page=page, limit=limit
+        session=session,
+        category_id=category_id,
+        page=page,
+        limit=limit,
+        cursor=cursor,
+        filters=filters,
+        sort=sort,
     )
 
 
@@ -43,12 +55,13 @@ def search_products(
     keyword: str = Query(..., description="Từ khóa tìm kiếm"),
     skip: int = 0,
     limit: int = 100,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     service: ProductService = Depends()
 ) -> List[ProductOut]:
     """
     [PUBLIC] Tìm kiếm sản phẩm theo tên hoặc mô tả
     - Không cần đăng nhập
+    - Kết quả xếp theo độ liên quan, `total_item` là tổng số kết quả khớp
     """
     return service.search_products(
         keyword=keyword, 
@@ -58,17 +71,32 @@ def search_products(
     )
 
 
+@productRouter.get("/suggest", summary="[PUBLIC] Gợi ý tìm kiếm (typeahead)")
+def suggest_products(
+    session: Annotated[Session, Depends(get_read_session)],
+    service: Annotated[ProductService, Depends()],
+    q: str = Query(..., min_length=1, description="Chuỗi người dùng đang gõ"),
+    limit: int = Query(10, ge=1, le=50),
+) -> Dict[str, Any]:
+    """
+    [PUBLIC] Gợi ý tên sản phẩm và danh mục theo prefix, không phân biệt dấu
+    - Không cần đăng nhập
+    - Phục vụ từ index trong bộ nhớ, không query DB mỗi lần gõ phím
+    """
+    return service.suggest(q=q, session=session, limit=limit)
+
+
 @productRouter.get("/{product_id}", summary="[PUBLIC] Lấy chi tiết sản phẩm")
-def get_product_by_id(
+async def get_product_by_id(
     product_id: UUID,
-    session: Annotated[Session, Depends(get_session)],
+    session: Annotated[AsyncSession, Depends(get_async_read_session)],
     service: Annotated[ProductService, Depends()],
 ) -> Dict[str, Any]:
     """
     [PUBLIC] Lấy thông tin chi tiết sản phẩm
     - Không cần đăng nhập
     """
-    return service.get_product_by_id(product_id=product_id, session=session)
+    return await service.get_product_by_id(product_id=product_id, session=session)
 
 
 # ==================== ADMIN ENDPOINTS ====================
@@ -144,7 +172,7 @@ def add_product_detail(
 )
 def get_product_details(
     product_id: UUID,
-    session: Annotated[Session, Depends(get_session)],
+    session: Annotated[Session, Depends(get_read_session)],
     service: Annotated[ProductService, Depends()],
 ) -> Dict[str, Any]:
     """
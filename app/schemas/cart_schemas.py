@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal
+from uuid import UUID
+
+
+class CartBatchOperation(BaseModel):
+    """
+    1 thao tác trong PATCH /cart/items:batch, định danh dòng bằng detail_id
+    - add: cộng thêm quantity
+    - set: gán quantity
+    - remove: xóa dòng (bỏ qua quantity)
+    """
+    op: Literal["add", "set", "remove"]
+    detail_id: UUID
+    product_id: UUID | None = None  # không bắt buộc, lấy theo detail_id
+    quantity: int = Field(default=1, gt=0)
+
+class CartBatchRequest(BaseModel):
+    operations: List[CartBatchOperation] = Field(min_length=1, max_length=100)
@@ -0,0 +1,68 @@
+"""
+Backfill product.price_vnd từ product.price (chuỗi)
+Chạy: python -m app.scripts.backfill_price [--batch-size 500]
+- Đọc theo keyset trên id, mỗi batch một transaction -> không giữ lock lâu
+- Chỉ xử lý dòng price_vnd IS NULL nên chạy lại nhiều lần vẫn an toàn
+- product_summary.price_vnd cập nhật cùng batch (sort/lọc/facet giá đọc từ read model)
+"""
+import argparse
+
+from sqlalchemy import bindparam, update
+from sqlmodel import Session, select
+
+from app.core.cache import shared_cache
+from app.core.database import engine
+from app.models.category_model import Category
+from app.models.product_model import Product
+from app.models.product_summary_model import ProductSummary
+from app.utils.price import parse_price
+
+
+def backfill_price_vnd(session: Session, batch_size: int = 500) -> int:
+    """Điền price_vnd theo batch, trả về số dòng đã cập nhật"""
+    stmt = update(Product).where(Product.id == bindparam("b_id")).values(
+        price_vnd=bindparam("b_price_vnd")
+    )
+    summary_stmt = (
+        update(ProductSummary)
+        .where(ProductSummary.product_id == bindparam("b_id"))
+        .values(price_vnd=bindparam("b_price_vnd"))
+    )
+    updated = 0
+    last_id = None
+    while True:
+        query = select(Product.id, Product.price).where(Product.price_vnd.is_(None))
+        if last_id is not None:
+            query = query.where(Product.id > last_id)
+        rows = session.exec(query.order_by(Product.id).limit(batch_size)).all()
+        if not rows:
+            break
+
+        parsed = ((id, parse_price(price)) for id, price in rows)
+        params = [
+            {"b_id": id, "b_price_vnd": price_vnd}
+            for id, price_vnd in parsed
+            if price_vnd is not None
+        ]
+        if params:
+            session.connection().execute(stmt, params)
+            session.connection().execute(summary_stmt, params)
+        session.commit()
+
+        updated += len(params)
+        last_id = rows[-1][0]
+        print(f"... {updated} sản phẩm")
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        total = backfill_price_vnd(session, batch_size=args.batch_size)
+        category_ids = session.exec(select(Category.id)).all()
+    # Cache danh sách/COUNT/facet đang giữ giá cũ (có tác dụng khi dùng Redis)
+    shared_cache.invalidate_tags("products:all", *(f"category:{c}" for c in category_ids))
+    print(f"Đã cập nhật price_vnd cho {total} sản phẩm")
@@ -0,0 +1,96 @@
+"""
+Benchmark serialize response danh sách sản phẩm: JSONResponse (trước) vs ORJSONResponse (sau)
+Chạy: python -m app.scripts.bench_serialization [--items 100] [--number 200] [--repeat 5]
+- trước: jsonable_encoder + json.dumps (đường mặc định của FastAPI khi route trả về dict)
+- sau: ORJSONResponse.render nhận thẳng dict chứa UUID/datetime
+Payload cố định (seed) -> chạy lại cho kết quả so sánh được
+"""
+import argparse
+import random
+import timeit
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.utils.response_helper import ORJSONResponse
+
+
+def build_payload(items: int = 100, seed: int = 42) -> Dict[str, Any]:
+    """Response GET /api/products (1 trang) với các cột của product_summary"""
+    rng = random.Random(seed)
+    started = datetime(2026, 1, 1)
+    categories = [(UUID(int=rng.getrandbits(128)), name) for name in ("Áo", "Quần", "Giày", "Túi")]
+    data = []
+    for i in range(items):
+        category_id, category_name = rng.choice(categories)
+        price = rng.randrange(50, 2000) * 1000
+        data.append(
+            {
+                "product_id": UUID(int=rng.getrandbits(128)),
+                "name": f"{category_name} thời trang mẫu {i}",
+                "price": f"{price:,}".replace(",", "."),
+                "price_vnd": price,
+                "category_id": category_id,
+                "category_name": category_name,
+                "thumbnail_url": f"https://res.cloudinary.com/demo/image/upload/c_fill,h_100,w_100/p{i}.jpg",
+                "total_stock": rng.randrange(0, 500),
+                "variant_count": rng.randrange(1, 12),
+                "create_at": started + timedelta(minutes=i),
+            }
+        )
+    return {
+        "message": "Lấy danh sách sản phẩm thành công",
+        "payload": {
+            "data": data,
+            "pagination": {
+                "page": 1,
+                "pageSize": items,
+                "total_item": items * 10,
+                "totalPages": 10,
+                "next_cursor": "MjAyNi0wMS0wMVQwMDowMDowMHwwMDAw",
+            },
+            "facets": {
+                "colors": [{"value": c, "count": rng.randrange(1, 50)} for c in ("đen", "trắng", "xanh")],
+                "sizes": [{"value": s, "count": rng.randrange(1, 50)} for s in ("S", "M", "L", "XL")],
+            },
+        },
+        "status": 200,
+    }
+
+
+def render_json(payload: Dict[str, Any]) -> bytes:
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def render_orjson(payload: Dict[str, Any]) -> bytes:
+    return ORJSONResponse(payload).body
+
+
+def measure(render: Callable[[Dict[str, Any]], bytes], payload, number: int, repeat: int) -> float:
+    """Thời gian tốt nhất (ms) cho 1 lần render"""
+    timings = timeit.repeat(lambda: render(payload), number=number, repeat=repeat)
+    return min(timings) / number * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payload = build_payload(args.items)
+    size = len(render_orjson(payload))
+    before = measure(render_json, payload, args.number, args.repeat)
+    after = measure(render_orjson, payload, args.number, args.repeat)
+    print(f"payload: {args.items} sản phẩm, {size / 1024:.1f} KiB")
+    print(f"JSONResponse + jsonable_encoder: {before:.3f} ms")
+    print(f"ORJSONResponse:                 {after:.3f} ms")
+    print(f"nhanh hơn: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""
+Dựng lại read model product_summary từ product / product_detail / product_image
+Chạy: python -m app.scripts.rebuild_product_summary
+- Dùng khi dữ liệu bị sửa ngoài ProductService (import tay, sửa trực tiếp DB...)
+"""
+from sqlmodel import Session, select
+
+from app.core.database import engine
+from app.core.cache import shared_cache
+from app.models.category_model import Category
+from app.repositories.product_repository import ProductRepository
+
+
+if __name__ == "__main__":
+    with Session(engine) as session:
+        total = ProductRepository().rebuild_summaries(session)
+        category_ids = session.exec(select(Category.id)).all()
+    # Cache danh sách/COUNT/facet đang giữ dữ liệu cũ (có tác dụng khi dùng Redis)
+    shared_cache.invalidate_tags("products:all", *(f"category:{c}" for c in category_ids))
+    print(f"Đã dựng lại product_summary cho {total} sản phẩm")
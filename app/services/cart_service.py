@@ -7,10 +7,13 @@ from app.models.cart_model import Cart, CartOut
 from app.models.cart_item_model import CartItem, CartItemOut
 from app.models.user_model import User
 from app.repositories.cart_repository import CartRepository
+from app.schemas.cart_schemas import CartBatchOperation
+from app.utils.price import unit_price
 from fastapi import HTTPException, status, Depends
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session
 from uuid import UUID
-from typing import Dict, Any, Annotated, Optional
+from typing import Dict, Any, Annotated, List
 
 
 class CartService:
@@ -28,7 +31,7 @@ class CartService:
             current_user: User hiện tại
             session: Database session
         Returns:
-            Dict chứa cart và cart items
+            Dict chứa cart và các dòng (kèm tên, giá, màu/size, tồn kho, ảnh sản phẩm)
         """
         # Tìm hoặc tạo cart cho user
         cart = self.repository.get_cart_by_user_id(current_user.id, session)
@@ -38,14 +41,7 @@ class CartService:
             cart = Cart(user_id=current_user.id, total=0)
             cart = self.repository.create_cart(cart, session)
 
-        # Lấy cart items
-        cart_items = self.repository.get_cart_items(cart.id, session)
-
-        return {
-            "cart": CartOut.model_validate(cart),
-            "items": [CartItemOut.model_validate(item) for item in cart_items],
-            "total_items": len(cart_items),
-        }
+        return self._cart_response(cart, session)
 
     def add_to_cart(
         self,
@@ -56,55 +52,45 @@ class CartService:
         session: Session = None,
     ) -> Dict[str, Any]:
         """
-        [USER] Thêm sản phẩm vào giỏ hàng
+        [USER] Thêm sản phẩm vào giỏ hàng (1 transaction, total cập nhật theo delta)
         Args:
             current_user: User hiện tại
             product_id: ID sản phẩm
+            detail_id: ID biến thể (màu/size)
             quantity: Số lượng
             session: Database session
         Returns:
             Dict chứa message và cart item
         """
-        # Kiểm tra sản phẩm tồn tại
-        product = self.repository.get_product_by_id(product_id, session)
-
-        if not product:
+        # Kiểm tra biến thể tồn tại và thuộc sản phẩm
+        if not self.repository.detail_exists(product_id, detail_id, session):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Sản phẩm không tồn tại"
             )
 
         # Tìm hoặc tạo cart
         cart = self.repository.get_cart_by_user_id(current_user.id, session)
+        if not cart:
+            cart = Cart(user_id=current_user.id, total=0)
+            session.add(cart)
 
-        # if not cart:
-        #     cart = Cart(user_id=current_user.id, total=0)
-        #     cart = self.repository.create_cart(cart, session)
-
-        # Kiểm tra sản phẩm đã có trong cart chưa
-        existing_item = self.repository.get_cart_item_by_detail(
-            cart.id, detail_id, session
+        # Upsert: thêm mới hoặc cộng dồn trong 1 câu lệnh (unique cart_id + detail_id)
+        new_id = self.repository.upsert_cart_item(
+            cart.id, product_id, detail_id, quantity, session
+        )
+        self.repository.increment_cart_total(cart.id, quantity, session)
+        cart_item = self.repository.get_cart_item_by_detail(cart.id, detail_id, session)
+        message = (
+            "Thêm sản phẩm vào giỏ hàng thành công"
+            if cart_item.id == new_id
+            else "Cập nhật số lượng sản phẩm trong giỏ hàng"
         )
-        print("exist cart: ", existing_item)
-        if existing_item:
-            # Cập nhật số lượng
-            existing_item.quantity += quantity
-            cart_item = self.repository.update_cart_item(existing_item, session)
-            message = "Cập nhật số lượng sản phẩm trong giỏ hàng"
-        else:
-            # Thêm mới
-            cart_item = CartItem(
-                cart_id=cart.id,
-                product_id=product_id,
-                quantity=quantity,
-                detail_id=detail_id,
-            )
-            cart_item = self.repository.create_cart_item(cart_item, session)
-            message = "Thêm sản phẩm vào giỏ hàng thành công"
 
-        # Cập nhật tổng số lượng trong cart
-        self._update_cart_total(cart=cart, session=session)
+        # Dựng response trước commit -> không phải refresh lại sau commit
+        result = {"message": message, "cart_item": CartItemOut.model_validate(cart_item)}
+        session.commit()
 
-        return {"message": message, "cart_item": CartItemOut.model_validate(cart_item)}
+        return result
 
     def update_cart_item(
         self, current_user: User, cart_item_id: UUID, quantity: int, session: Session
@@ -119,28 +105,29 @@ class CartService:
         Returns:
             Dict chứa message và cart item
         """
-        # Kiểm tra cart item thuộc về user
-        cart_item = self._get_user_cart_item(
-            current_user=current_user, cart_item_id=cart_item_id, session=session
-        )
-
         if quantity <= 0:
             # Xóa nếu số lượng <= 0
             return self.remove_from_cart(
                 current_user=current_user, cart_item_id=cart_item_id, session=session
             )
 
+        # Kiểm tra cart item thuộc về user
+        cart_item = self._get_user_cart_item(
+            current_user=current_user, cart_item_id=cart_item_id, session=session
+        )
+
+        delta = quantity - cart_item.quantity
         cart_item.quantity = quantity
         cart_item = self.repository.update_cart_item(cart_item, session)
+        self.repository.increment_cart_total(cart_item.cart_id, delta, session)
 
-        # Cập nhật tổng cart
-        cart = self.repository.get_cart_by_id(cart_item.cart_id, session)
-        self._update_cart_total(cart=cart, session=session)
-
-        return {
+        result = {
             "message": "Cập nhật số lượng thành công",
             "cart_item": CartItemOut.model_validate(cart_item),
         }
+        session.commit()
+
+        return result
 
     def remove_from_cart(
         self, current_user: User, cart_item_id: UUID, session: Session
@@ -158,15 +145,96 @@ class CartService:
             current_user=current_user, cart_item_id=cart_item_id, session=session
         )
 
-        cart = self.repository.get_cart_by_id(cart_item.cart_id, session)
-
         self.repository.delete_cart_item(cart_item, session)
-
-        # Cập nhật tổng cart
-        self._update_cart_total(cart=cart, session=session)
+        self.repository.increment_cart_total(
+            cart_item.cart_id, -cart_item.quantity, session
+        )
+        session.commit()
 
         return {"message": "Xóa sản phẩm khỏi giỏ hàng thành công"}
     
+    def apply_batch(
+        self,
+        current_user: User,
+        operations: List[CartBatchOperation],
+        session: Session,
+    ) -> Dict[str, Any]:
+        """
+        [USER] Áp dụng nhiều thao tác add/set/remove lên giỏ trong 1 transaction
+        (gộp giỏ khách khi đăng nhập, mua lại đơn cũ...)
+        Args:
+            current_user: User hiện tại
+            operations: Danh sách thao tác theo thứ tự, định danh dòng bằng detail_id
+            session: Database session
+        Returns:
+            Giỏ hàng đầy đủ sau khi áp dụng
+        Raises:
+            HTTPException 404: Có biến thể không tồn tại
+            HTTPException 409: Giỏ hàng bị thay đổi đồng thời
+        """
+        # Product của mọi biến thể được nhắc tới (1 query IN)
+        detail_products = self.repository.get_detail_products(
+            {op.detail_id for op in operations}, session
+        )
+        missing = [
+            str(op.detail_id)
+            for op in operations
+            if op.detail_id not in detail_products
+            or (op.product_id and op.product_id != detail_products[op.detail_id])
+        ]
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={"message": "Sản phẩm không tồn tại", "detail_ids": missing},
+            )
+
+        cart = self.repository.get_cart_by_user_id(current_user.id, session)
+        if not cart:
+            cart = Cart(user_id=current_user.id, total=0)
+            session.add(cart)
+
+        # Áp dụng lần lượt trên các dòng hiện có (1 query), chưa ghi gì tới lúc flush
+        items = {
+            item.detail_id: item
+            for item in self.repository.get_cart_items(cart.id, session)
+        }
+        for op in operations:
+            item = items.get(op.detail_id)
+            if op.op == "remove":
+                if item:
+                    self.repository.delete_cart_item(items.pop(op.detail_id), session)
+                continue
+
+            # quantity > 0 (CartBatchOperation) -> dòng sau add/set luôn có số lượng dương
+            if item is None:
+                item = CartItem(
+                    cart_id=cart.id,
+                    product_id=detail_products[op.detail_id],
+                    detail_id=op.detail_id,
+                    quantity=0,
+                )
+                items[op.detail_id] = item
+            item.quantity = op.quantity if op.op == "set" else item.quantity + op.quantity
+            self.repository.update_cart_item(item, session)
+
+        try:
+            # Flush tường minh: dòng trùng (cart_id, detail_id) do request song song -> 409
+            session.flush()
+            # Tính lại total 1 lần cho cả batch
+            self.repository.set_cart_total(
+                cart.id, sum(item.quantity for item in items.values()), session
+            )
+            result = self._cart_response(cart, session)
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Giỏ hàng vừa được thay đổi, vui lòng thử lại",
+            )
+
+        return result
+
     def clear_cart(self, current_user: User, session: Session) -> Dict[str, str]:
         """
         [USER] Xóa toàn bộ giỏ hàng
@@ -184,15 +252,34 @@ class CartService:
                 detail="Giỏ hàng không tồn tại"
             )
         
-        # Xóa tất cả cart items
+        # Xóa tất cả cart items + reset total trong cùng transaction
         self.repository.delete_all_cart_items(cart.id, session)
-
-        # Cập nhật cart total
-        self.repository.update_cart_total(cart, 0, session)
+        self.repository.set_cart_total(cart.id, 0, session)
+        session.commit()
         
         return {"message": "Đã xóa toàn bộ giỏ hàng"}
     
     # ==================== HELPER FUNCTIONS ====================
+
+    def _cart_response(self, cart: Cart, session: Session) -> Dict[str, Any]:
+        """
+        Helper: response giỏ hàng đầy đủ, mỗi dòng kèm thông tin sản phẩm (1 query)
+        """
+        items = []
+        subtotal = 0
+        for line in self.repository.get_cart_lines(cart.id, session):
+            # price_vnd chưa backfill -> đọc chuỗi price; giá không đọc được -> line_total None
+            price = unit_price(line["price_vnd"], line["price"])
+            line_total = price * line["quantity"] if price is not None else None
+            subtotal += line_total or 0
+            items.append({**line, "line_total": line_total})
+
+        return {
+            "cart": CartOut.model_validate(cart),
+            "items": items,
+            "total_items": len(items),
+            "subtotal": subtotal,
+        }
     
     def _get_user_cart_item(
         self, 
@@ -201,31 +288,21 @@ class CartService:
         session: Session
     ) -> CartItem:
         """
-        Helper: Lấy cart item và kiểm tra quyền sở hữu
+        Helper: Lấy cart item và kiểm tra quyền sở hữu (1 query join cart)
         """
-        cart_item = self.repository.get_cart_item_by_id(cart_item_id, session)
+        row = self.repository.get_cart_item_with_owner(cart_item_id, session)
         
-        if not cart_item:
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Sản phẩm không có trong giỏ hàng"
             )
         
-        # Kiểm tra cart thuộc về user
-        cart = self.repository.get_cart_by_id(cart_item.cart_id, session)
-        
-        if cart.user_id != current_user.id:
+        cart_item, owner_id = row
+        if owner_id != current_user.id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Bạn không có quyền thao tác với giỏ hàng này"
             )
         
         return cart_item
-    
-    def _update_cart_total(self, cart: Cart, session: Session) -> None:
-        """
-        Helper: Cập nhật tổng số lượng trong cart
-        """
-        cart_items = self.repository.get_cart_items(cart.id, session)
-        total = sum(item.quantity for item in cart_items)
-        self.repository.update_cart_total(cart, total, session)
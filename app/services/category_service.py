@@ -4,25 +4,43 @@ Admin: CRUD danh mục
 User/Guest: Xem danh mục
 """
 from app.models.category_model import Category, CategoryIn, CategoryOut
-from app.repositories.category_repository import CategoryRepository
+from app.models.product_summary_model import ProductSummary
+from app.repositories.category_repository import CategoryRepository, AsyncCategoryRepository
+from app.core.cache import shared_cache
+from app.utils.search_index import suggest_index
 from fastapi import HTTPException, status, Depends
 from sqlmodel import Session, select
+from sqlalchemy import update
+from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
 from typing import List, Dict, Any, Annotated
 
 
 class CategoryService:
     """Service quản lý danh mục sản phẩm"""
-    def __init__(self, repository : Annotated[CategoryRepository, Depends()]):
+    def __init__(
+        self,
+        repository : Annotated[CategoryRepository, Depends()],
+        async_repository: Annotated[AsyncCategoryRepository, Depends()],
+    ):
         self.repository = repository
+        self.async_repository = async_repository
     # ==================== GUEST/USER FUNCTIONS ====================
     
-    def get_all_categories(self, session: Session) -> List[CategoryOut]:
-        return self.repository.get_all(session=session)
+    async def get_all_categories(self, session: AsyncSession) -> List[CategoryOut]:
+        cached = await shared_cache.aget("categories:all")
+        if cached is not None:
+            return cached
+        categories = await self.async_repository.get_all(session=session)
+        result = [
+            CategoryOut.model_validate(c).model_dump(mode="json") for c in categories
+        ]
+        await shared_cache.aset("categories:all", result, tags=["categories"])
+        return result
     
     
-    def get_category_by_id(self, category_id: UUID, session: Session) -> CategoryOut:
-         return self.repository.get_by_id(category_id, session=session)
+    async def get_category_by_id(self, category_id: UUID, session: AsyncSession) -> CategoryOut:
+         return await self.async_repository.get_by_id(category_id, session=session)
     
     # ==================== ADMIN FUNCTIONS ====================
     
@@ -39,6 +57,8 @@ class CategoryService:
             description=data.description
         )
         result = self.repository.create(category=category, session=session)
+        shared_cache.invalidate_tags("categories")
+        suggest_index.publish_upsert("category", result.id, result.name)
         
         return {
             "message": "Tạo danh mục thành công",
@@ -87,8 +107,17 @@ class CategoryService:
         category.name = data.name
         category.description = data.description
         session.add(category)
+        # Tên danh mục được chép sẵn trong product_summary
+        session.exec(
+            update(ProductSummary)
+            .where(ProductSummary.category_id == category_id)
+            .values(category_name=data.name)
+        )
         session.commit()
         session.refresh(category)
+        # Danh sách sản phẩm (products:all, category:<id>) chứa category_name cũ
+        shared_cache.invalidate_tags("categories", f"category:{category_id}", "products:all")
+        suggest_index.publish_upsert("category", category.id, category.name)
         
         return {
             "message": "Cập nhật danh mục thành công",
@@ -125,5 +154,7 @@ class CategoryService:
         
         session.delete(category)
         session.commit()
+        shared_cache.invalidate_tags("categories", f"category:{category_id}", "products:all")
+        suggest_index.publish_remove("category", category_id)
         
         return {"message": "Xóa danh mục thành công"}
\ No newline at end of file
@@ -7,12 +7,13 @@ import re
 import logging
 from typing import AsyncGenerator
 from groq import Groq, BadRequestError
-from sqlmodel import Session, select, or_
+from sqlmodel import Session, select
 from sqlalchemy.orm import selectinload
 
 from app.core.settings import settings
 from app.models.product_model import Product
 from app.models.category_model import Category
+from app.repositories.product_repository import ProductRepository, ready_images
 from app.services.chatbot_prompt import SYSTEM_PROMPT, FUNCTION_DECLARATIONS
 
 logger = logging.getLogger(__name__)
@@ -51,19 +52,8 @@ class ChatbotService:
             return json.dumps({"error": f"Unknown function: {function_name}"})
 
     def _search_products(self, keyword: str, session: Session) -> str:
-        """Tìm kiếm sản phẩm theo từ khóa"""
-        stmt = (
-            select(Product)
-            .options(selectinload(Product.images))
-            .where(
-                or_(
-                    Product.name.ilike(f"%{keyword}%"),
-                    Product.description.ilike(f"%{keyword}%"),
-                )
-            )
-            .limit(10)
-        )
-        products = session.exec(stmt).all()
+        """Tìm kiếm sản phẩm theo từ khóa (dùng chung full-text search với API)"""
+        products, _ = ProductRepository().search(keyword, session, limit=10)
 
         if not products:
             return json.dumps(
@@ -91,7 +81,7 @@ class ChatbotService:
             stmt = (
                 select(Product)
                 .options(
-                    selectinload(Product.images),
+                    ready_images(),
                     selectinload(Product.product_details),
                 )
                 .where(Product.id == product_id)
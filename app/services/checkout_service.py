@@ -8,6 +8,7 @@ from app.models.payment_detail_model import PaymentDetail
 from app.models.user_model import User
 from app.enum.role_enum import OrderStatus, PaymentStatus
 from app.repositories.order_repository import OrderRepository
+from app.utils.price import product_unit_price
 from app.repositories.address_repository import AddressRepository
 from app.utils.vnpay import VNPayHelper
 from app.core.settings import settings
@@ -68,13 +69,20 @@ class CheckoutService:
                     detail="Không tìm thấy sản phẩm đã chọn trong giỏ hàng",
                 )
 
-        # Lấy thông tin sản phẩm
+        # Lấy thông tin sản phẩm + variant (2 query IN thay vì 1 query / item)
+        products = self.order_repo.get_products_by_ids(
+            (item.product_id for item in cart_items), session
+        )
+        details = self.order_repo.get_details_by_ids(
+            (item.detail_id for item in cart_items), session
+        )
         items = []
         subtotal = 0
         for item in cart_items:
-            product = self.order_repo.get_product_by_id(item.product_id, session)
-            if product and product.price:
-                price = float(product.price)
+            product = products.get(item.product_id)
+            if product:
+                detail = details.get(item.detail_id)
+                price = product_unit_price(product)
                 item_total = price * item.quantity
                 subtotal += item_total
                 items.append(
@@ -83,6 +91,8 @@ class CheckoutService:
                         "product_id": str(item.product_id),
                         "detail_id": str(item.detail_id),
                         "product_name": product.name,
+                        "color": detail.color if detail else None,
+                        "size": detail.size if detail else None,
                         "price": price,
                         "quantity": item.quantity,
                         "item_total": item_total,
@@ -158,13 +168,15 @@ class CheckoutService:
                 )
 
         # Tính tổng tiền
+        products = self.order_repo.get_products_by_ids(
+            (item.product_id for item in cart_items), session
+        )
         total = 0
         for item in cart_items:
-            product = self.order_repo.get_product_by_id(item.product_id, session)
-            if product and product.price:
-                total += float(product.price) * item.quantity
+            product = products.get(item.product_id)
+            if product:
+                total += product_unit_price(product) * item.quantity
 
-        total = int(total)
         total_with_shipping = total + shipping_fee
 
         # Tạo PaymentDetail
@@ -219,7 +231,7 @@ class CheckoutService:
             }
         else:
             # COD: xóa giỏ hàng ngay
-            self._clear_cart(cart, cart_items, session)
+            self._clear_cart(cart, session, cart_items=cart_items)
 
             order.status = OrderStatus.CONFIRMED
             session.add(order)
@@ -235,15 +247,22 @@ class CheckoutService:
                 "total": total,
             }
 
-    def _clear_cart(self, cart, cart_items, session: Session) -> None:
-        """Xóa các items đã checkout khỏi giỏ hàng"""
-        for item in cart_items:
-            self.order_repo.delete_cart_item(item, session)
-        # Lấy lại remaining items để cập nhật total
-        remaining = self.order_repo.get_cart_items(cart.id, session)
-        if not remaining:
+    def _clear_cart(self, cart, session: Session, cart_items=None) -> int:
+        """
+        Xóa các items đã checkout khỏi giỏ hàng (1 câu DELETE, commit cùng đơn hàng)
+        - cart_items=None: xóa toàn bộ giỏ
+        Returns: số dòng đã xóa
+        """
+        if cart_items is None:
+            deleted = self.order_repo.delete_cart_items(cart.id, session)
             cart.total = 0
+        else:
+            deleted = self.order_repo.delete_cart_items(
+                cart.id, session, item_ids=[item.id for item in cart_items]
+            )
+            cart.total = max(cart.total - sum(item.quantity for item in cart_items), 0)
         self.order_repo.update_cart_total(cart, session)
+        return deleted
 
     def process_vnpay_return(
         self, params: Dict[str, str], session: Session
@@ -299,9 +318,7 @@ class CheckoutService:
             # Xóa giỏ hàng sau khi thanh toán VNPay thành công
             cart = self.order_repo.get_cart_by_user_id(order.user_id, session)
             if cart:
-                cart_items = self.order_repo.get_cart_items(cart.id, session)
-                if cart_items:
-                    self._clear_cart(cart, cart_items, session)
+                self._clear_cart(cart, session)
 
             session.commit()
 
@@ -375,9 +392,7 @@ class CheckoutService:
             # Xóa giỏ hàng sau khi IPN xác nhận thành công
             cart = self.order_repo.get_cart_by_user_id(order.user_id, session)
             if cart:
-                cart_items = self.order_repo.get_cart_items(cart.id, session)
-                if cart_items:
-                    self._clear_cart(cart, cart_items, session)
+                self._clear_cart(cart, session)
         else:
             if order.payment_id:
                 payment = session.get(PaymentDetail, order.payment_id)
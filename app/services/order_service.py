@@ -8,9 +8,12 @@ from app.models.order_item_model import OrderItem
 from app.models.user_model import User
 from app.enum.role_enum import OrderStatus
 from app.repositories.order_repository import OrderRepository
+from app.utils.price import product_unit_price
+from app.utils.pagination import encode_cursor, decode_cursor
 from fastapi import HTTPException, status, Depends
 from sqlmodel import Session
 from uuid import UUID
+from datetime import datetime
 from typing import Dict, Any, List, Annotated
 
 
@@ -50,14 +53,17 @@ class OrderService:
             )
 
         # Tính tổng tiền
+        products = self.repository.get_products_by_ids(
+            (item.product_id for item in cart_items), session
+        )
         total = 0
         for item in cart_items:
-            product = self.repository.get_product_by_id(item.product_id, session)
-            if product and product.price:
-                total += float(product.price) * item.quantity
+            product = products.get(item.product_id)
+            if product:
+                total += product_unit_price(product) * item.quantity
 
         # Tạo order
-        order = Order(user_id=user.id, total=int(total), status=OrderStatus.PENDING)
+        order = Order(user_id=user.id, total=total, status=OrderStatus.PENDING)
         order = self.repository.create_order(order, session)
 
         # Tạo order items
@@ -69,9 +75,8 @@ class OrderService:
             )
             self.repository.create_order_item(order_item, session)
 
-        # Xóa giỏ hàng sau khi tạo order
-        for item in cart_items:
-            self.repository.delete_cart_item(item, session)
+        # Xóa giỏ hàng sau khi tạo order (1 câu DELETE)
+        self.repository.delete_cart_items(cart.id, session)
         cart.total = 0
         self.repository.update_cart_total(cart, session)
         self.repository.bulk_commit(session)
@@ -83,31 +88,44 @@ class OrderService:
         }
 
     def get_my_orders(
-        self, user: User, session: Session, skip: int = 0, limit: int = 20
+        self,
+        user: User,
+        session: Session,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
     ) -> List[Dict[str, Any]]:
         """
-        [USER] Lấy danh sách đơn hàng của user
+        [USER] Lấy danh sách đơn hàng của user, mới nhất trước
         Args:
             user: User hiện tại
             session: Database session
-            skip: Số record bỏ qua
+            skip: Số record bỏ qua (bị bỏ qua khi có cursor)
             limit: Số record tối đa
+            cursor: `cursor` của đơn cuối cùng trang trước (keyset pagination)
         Returns:
             List các order
         """
-        orders = self.repository.get_orders_by_user_id(user.id, session, skip, limit)
+        try:
+            keyset = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-        result = []
-        for order in orders:
-            order_items = self.repository.get_order_items(order.id, session)
+        rows = self.repository.get_orders_by_user_id(
+            user.id, session, skip, limit, cursor=keyset
+        )
 
+        result = []
+        for order, items_count, items_quantity in rows:
             result.append(
                 {
                     "id": order.id,
                     "total": order.total,
                     "status": getattr(order, "status", OrderStatus.PENDING),
                     "create_at": order.create_at,
-                    "items_count": len(order_items),
+                    "items_count": items_count,
+                    "items_quantity": items_quantity,
+                    "cursor": encode_cursor(order.create_at, order.id),
                 }
             )
 
@@ -137,9 +155,13 @@ class OrderService:
         # Lấy order items kèm product info
         order_items = self.repository.get_order_items(order.id, session)
 
+        products = self.repository.get_products_by_ids(
+            (item.product_id for item in order_items), session
+        )
+
         items_detail = []
         for item in order_items:
-            product = self.repository.get_product_by_id(item.product_id, session)
+            product = products.get(item.product_id)
             items_detail.append(
                 {
                     "product_id": item.product_id,
@@ -215,9 +237,13 @@ class OrderService:
         # Lấy order items kèm product info
         order_items = self.repository.get_order_items(order.id, session)
 
+        products = self.repository.get_products_by_ids(
+            (item.product_id for item in order_items), session
+        )
+
         items_detail = []
         for item in order_items:
-            product = self.repository.get_product_by_id(item.product_id, session)
+            product = products.get(item.product_id)
             items_detail.append(
                 {
                     "product_id": item.product_id,
@@ -250,31 +276,53 @@ class OrderService:
         skip: int = 0,
         limit: int = 50,
         status_filter: str | None = None,
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+        user_id: UUID | None = None,
+        payment_status: str | None = None,
+        cursor: str | None = None,
     ) -> Dict[str, Any]:
         """
         [ADMIN] Lấy tất cả đơn hàng
         Args:
             session: Database session
-            skip: Số record bỏ qua
+            skip: Số record bỏ qua (bị bỏ qua khi có cursor)
             limit: Số record tối đa
             status_filter: Lọc theo trạng thái
+            date_from, date_to: Lọc theo ngày tạo [date_from, date_to)
+            user_id: Lọc theo user
+            payment_status: Lọc theo trạng thái thanh toán
+            cursor: Keyset cursor (next_cursor của trang trước)
         Returns:
             Dict chứa orders và pagination
         """
-        orders, total = self.repository.get_all_orders(
-            session, skip, limit, status_filter
+        try:
+            keyset = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        rows, total = self.repository.get_all_orders(
+            session,
+            skip,
+            limit,
+            status_filter,
+            date_from=date_from,
+            date_to=date_to,
+            user_id=user_id,
+            payment_status=payment_status,
+            cursor=keyset,
         )
 
         result = []
-        for order in orders:
-            user = self.repository.get_user_by_id(order.user_id, session)
-
+        for order, user_email, order_payment_status, items_count in rows:
             result.append(
                 {
                     "id": order.id,
-                    "user_email": user.email if user else None,
+                    "user_email": user_email,
                     "total": order.total,
                     "status": getattr(order, "status", OrderStatus.PENDING),
+                    "payment_status": order_payment_status,
+                    "items_count": items_count,
                     "create_at": order.create_at,
                     "shipping_code": getattr(order, "shipping_code", None),
                     "carrier": getattr(order, "carrier", None),
@@ -284,7 +332,18 @@ class OrderService:
                 }
             )
 
-        return {"orders": result, "total": total, "skip": skip, "limit": limit}
+        next_cursor = None
+        if len(rows) == limit:
+            last = rows[-1][0]
+            next_cursor = encode_cursor(last.create_at, last.id)
+
+        return {
+            "orders": result,
+            "total": total,
+            "skip": skip,
+            "limit": limit,
+            "next_cursor": next_cursor,
+        }
 
     def update_order_status(
         self, order_id: UUID, new_status: str, session: Session
@@ -4,35 +4,44 @@ Admin: CRUD sản phẩm
 User/Guest: Xem sản phẩm, tìm kiếm, lọc
 """
 from fastapi import HTTPException, status, Depends, Form, UploadFile, File
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
 from sqlmodel import Session, select, or_
+from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
 from typing import List, Dict, Any, Annotated, Optional
-from cloudinary.uploader import upload
-from cloudinary.utils import cloudinary_url
 from app.models.product_model import (
     Product,
     ProductIn,
     ProductOut,
     ProductDetailOut,
     ProductResponseOut,
+    ProductFilter,
 )
 from app.models.product_detail_model import (
     ProductDetail,
     ProductDetailIn,
     ProductDetailOut,
 )
-from app.models.product_image_model import ProductImage
-from app.repositories.product_repository import ProductRepository
-from app.utils.response_helper import ResponseHandler
+from app.repositories.product_repository import ProductRepository, AsyncProductRepository
+from app.utils.response_helper import ResponseHandler, ORJSONResponse
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.enum.product_enum import ProductSort
+from app.core.cache import shared_cache
+from app.core.image_pipeline import ImagePipeline, get_image_pipeline
+from app.utils.search_index import product_search_index, suggest_index
 import math
 
 class ProductService:
     """Service quản lý sản phẩm"""
 
-    def __init__(self, repository: Annotated[ProductRepository, Depends()]):
+    def __init__(
+        self,
+        repository: Annotated[ProductRepository, Depends()],
+        async_repository: Annotated[AsyncProductRepository, Depends()],
+        image_pipeline: Annotated[ImagePipeline, Depends(get_image_pipeline)],
+    ):
         self.repository = repository
+        self.async_repository = async_repository
+        self.image_pipeline = image_pipeline
 
     # ==================== GUEST/USER FUNCTIONS ====================
 
@@ -42,40 +51,100 @@ class ProductService:
         category_id: UUID | None = None,
         page: int = 1,
         limit: int = 20,
+        cursor: str | None = None,
+        filters: ProductFilter | None = None,
+        sort: str = ProductSort.NEWEST,
     ) -> Dict[str, Any]:
-        """[PUBLIC] Lấy danh sách sản phẩm"""
+        """
+        [PUBLIC] Lấy danh sách sản phẩm
+        - page: phân trang OFFSET (mặc định)
+        - cursor: keyset pagination cho infinite scroll, lấy từ `next_cursor` trang trước (chỉ sort newest)
+        - filters: lọc theo giá, màu, size, còn hàng; `facets` trả kèm để dựng bộ lọc
+        - sort: newest | price_asc | price_desc, sắp xếp trong DB
+        """
+        page = page if page and page > 0 else 1
+        limit = limit if limit and limit > 0 else 20
+        if cursor and sort != ProductSort.NEWEST:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="cursor chỉ dùng được với sort=newest",
+            )
+        try:
+            keyset = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        if filters and filters.is_empty():
+            filters = None
+        if (
+            filters
+            and filters.min_price is not None
+            and filters.max_price is not None
+            and filters.min_price > filters.max_price
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="min_price không được lớn hơn max_price",
+            )
+
+        filter_key = filters.cache_key() if filters else ""
+        cache_key = f"products:list:{category_id}:{page}:{limit}:{cursor}:{sort}:{filter_key}"
+        cached = shared_cache.get(cache_key)
+        if cached is not None:
+            return ORJSONResponse(cached, 200)
+
         products = self.repository.get_all(
             session=session,
             category_id=category_id if category_id else None,
-            page=page if page else 1,
-            limit=limit if limit else 20,
+            page=page,
+            limit=limit,
+            cursor=keyset,
+            filters=filters,
+            sort=sort,
         )
-        response = {"data": []}
-        for product in products:
-            response["data"].append(
-                {
-                    **product.model_dump(),
-                    "images": [img.model_dump() for img in product.images],
-                }
-            )
+        total = self.repository.count(
+            session=session, category_id=category_id, filters=filters
+        )
+        response = {"data": [dict(product) for product in products]}
+
+        next_cursor = None
+        if len(products) == limit and sort == ProductSort.NEWEST:
+            last = products[-1]
+            next_cursor = encode_cursor(last["create_at"], last["id"])
 
         response.update(
             {
                 "pagination": {
                     "page": page,
                     "pageSize": limit,
-                    "total_item": len(response["data"]),
-                    "totalPages": math.ceil(len(response["data"]) / int(limit))
-                    if limit > 0
-                    else 0,
-                }
+                    "total_item": total,
+                    "totalPages": math.ceil(total / limit),
+                    "next_cursor": next_cursor,
+                },
+                "facets": self.repository.get_facets(
+                    session=session, category_id=category_id
+                ),
             }
         )
-        return JSONResponse(jsonable_encoder(response), 200)
+        shared_cache.set(
+            cache_key,
+            response,
+            tags=[f"category:{category_id}" if category_id else "products:all"],
+        )
+        return ORJSONResponse(response, 200)
 
-    def get_product_by_id(self, product_id: UUID, session: Session) -> Dict[str, Any]:
+    async def get_product_by_id(
+        self, product_id: UUID, session: AsyncSession
+    ) -> Dict[str, Any]:
         """[PUBLIC] Lấy chi tiết sản phẩm"""
-        product = self.repository.get_by_id(product_id=product_id, session=session)
+        cache_key = f"products:detail:{product_id}"
+        cached = await shared_cache.aget(cache_key)
+        if cached is not None:
+            return ORJSONResponse(cached, 200)
+
+        product = await self.async_repository.get_by_id(
+            product_id=product_id, session=session
+        )
 
         if not product:
             raise HTTPException(
@@ -88,7 +157,8 @@ class ProductService:
                 detail.model_dump() for detail in product.product_details
             ],
         }
-        return JSONResponse(jsonable_encoder(res), 200)
+        await shared_cache.aset(cache_key, res, tags=[f"product:{product_id}"])
+        return ORJSONResponse(res, 200)
 
     def get_products_by_category(
         self, category_id: UUID, session: Session, skip: int = 0, limit: int = 20
@@ -103,8 +173,8 @@ class ProductService:
     def search_products(
         self, keyword: str, session: Session, skip: int = 0, limit: int = 20
     ) -> Dict[str, Any]:
-        """[PUBLIC] Tìm kiếm sản phẩm theo tên hoặc mô tả"""
-        products = self.repository.search(
+        """[PUBLIC] Tìm kiếm sản phẩm theo tên hoặc mô tả, xếp theo độ liên quan"""
+        products, total = self.repository.search(
             keyword=keyword, session=session, skip=skip, limit=limit
         )
         response = {"data": []}
@@ -120,11 +190,16 @@ class ProductService:
                 "pagination": {
                     "skip": skip,
                     "limit": limit,
-                    "total_item": len(response["data"]),
+                    "total_item": total,
                 }
             }
         )
-        return JSONResponse(jsonable_encoder(response), 200)
+        return ORJSONResponse(response, 200)
+
+    def suggest(self, q: str, session: Session, limit: int = 10) -> Dict[str, Any]:
+        """[PUBLIC] Gợi ý tên sản phẩm / danh mục theo prefix (typeahead)"""
+        suggest_index.sync(lambda: self.repository.get_suggest_entries(session))
+        return {"data": suggest_index.suggest(q, limit=limit)}
 
     # ==================== ADMIN FUNCTIONS - PRODUCT ====================
 
@@ -137,31 +212,33 @@ class ProductService:
         category_id: UUID,
         files: List[UploadFile],
     ) -> Dict[str, Any]:
-        """[ADMIN] Tạo sản phẩm mới"""
+        """
+        [ADMIN] Tạo sản phẩm mới
+        - Ảnh chỉ được lưu vào spool và trả về với status=pending, không chờ CDN
+        - Worker nền upload + retry, xong thì cập nhật url/thumbnail_url (status=ready)
+        """
         product = Product(
             name=name, description=description, price=price, category_id=category_id
         )
         images = []
         for file in files:
-            result = upload(file.file)
-            if result:
-                thumbnail, _ = cloudinary_url(
-                    result["public_id"],
-                    format="jpg",
-                    crop="fill",
-                    width=100,
-                    height=100,
-                )
-                image = ProductImage(
-                    cloudinary_public_id=result["public_id"],
-                    url=result["secure_url"],
-                    thumbnail_url=thumbnail,
-                    product_id=product.id,
-                )
-                images.append(image)
+            image = self.image_pipeline.spool(file.file, file.filename)
+            image.product_id = product.id
+            images.append(image)
         product.images = images
 
-        data = self.repository.create(session=session, product=product)
+        try:
+            data = self.repository.create(session=session, product=product)
+            self.repository.refresh_summary(data.id, session)
+            session.commit()
+        except Exception:
+            # Không có dòng ProductImage nào trỏ tới file spool -> xóa luôn
+            self.image_pipeline.discard(image.cloudinary_public_id for image in images)
+            raise
+        session.refresh(data)
+        self._invalidate_catalog(product.id, category_id)
+        self._publish_search_upsert(data)
+        self.image_pipeline.submit(data.id, product.images)
 
         if data:
             product_data = data.model_dump()
@@ -181,11 +258,20 @@ class ProductService:
                 status_code=status.HTTP_404_NOT_FOUND, detail="Sản phẩm không tồn tại"
             )
 
+        old_category_id = product.category_id
+
         # Cập nhật các fields
         for key, value in data.model_dump(exclude_unset=True).items():
             setattr(product, key, value)
 
         updated_product = self.repository.update(session=session, product=product)
+        self.repository.refresh_summary(product_id, session)
+        session.commit()
+        session.refresh(updated_product)
+        self._invalidate_catalog(
+            product_id, old_category_id, updated_product.category_id
+        )
+        self._publish_search_upsert(updated_product)
 
         return {
             "message": "Cập nhật sản phẩm thành công",
@@ -201,9 +287,17 @@ class ProductService:
                 status_code=status.HTTP_404_NOT_FOUND, detail="Sản phẩm không tồn tại"
             )
 
+        category_id = product.category_id
+        spooled = self.repository.get_spooled_public_ids(product_id, session)
         self.repository.delete(product=product, session=session)
+        self.repository.refresh_summary(product_id, session)
+        session.commit()
+        self.image_pipeline.discard(spooled)
+        self._invalidate_catalog(product_id, category_id)
+        product_search_index.publish_remove(product_id)
+        suggest_index.publish_remove("product", product_id)
 
-        return JSONResponse("Xóa sản phẩm thành công", status_code=status.HTTP_200_OK)
+        return ORJSONResponse("Xóa sản phẩm thành công", status_code=status.HTTP_200_OK)
 
     # ==================== ADMIN FUNCTIONS - PRODUCT DETAIL ====================
 
@@ -212,13 +306,13 @@ class ProductService:
         # Kiểm tra sản phẩm tồn tại
         product = self.repository.get_by_id(product_id=product_id, session=session)
         if not product:
-            return JSONResponse("Sản phẩm không tồn tại", 404)
+            return ORJSONResponse("Sản phẩm không tồn tại", 404)
 
         details = self.repository.get_details_by_product(
             product_id=product_id, session=session
         )
 
-        return JSONResponse(jsonable_encoder(details), 200)
+        return ORJSONResponse([detail.model_dump() for detail in details], 200)
 
     def add_product_detail(
         self, product_id: UUID, data: ProductDetailIn, session: Session
@@ -236,6 +330,10 @@ class ProductService:
         detail = ProductDetail(product_id=product_id, **data.model_dump())
 
         res = self.repository.create_detail(detail=detail, session=session)
+        self.repository.refresh_summary(product_id, session)
+        session.commit()
+        session.refresh(res)
+        self._invalidate_catalog(product_id, product.category_id)
 
         if res:
             return {
@@ -267,6 +365,10 @@ class ProductService:
             setattr(detail, key, value)
 
         updated_detail = self.repository.update_detail(detail=detail, session=session)
+        self.repository.refresh_summary(product_id, session)
+        session.commit()
+        session.refresh(updated_detail)
+        self._invalidate_catalog(product_id, detail.product.category_id)
         
         return {
             "message": "Cập nhật chi tiết sản phẩm thành công",
@@ -292,6 +394,29 @@ class ProductService:
                 detail="Chi tiết này không thuộc sản phẩm",
             )
 
+        category_id = detail.product.category_id
         self.repository.delete_detail(detail=detail, session=session)
-
-        return {"message": "Xóa chi tiết sản phẩm thành công"}
\ No newline at end of file
+        self.repository.refresh_summary(product_id, session)
+        session.commit()
+        self._invalidate_catalog(product_id, category_id)
+
+        return {"message": "Xóa chi tiết sản phẩm thành công"}
+
+    # ==================== HELPER FUNCTIONS ====================
+
+    def _invalidate_catalog(
+        self, product_id: UUID, *category_ids: UUID | None
+    ) -> None:
+        """
+        Helper: Xóa cache liên quan tới sản phẩm sau khi dữ liệu đổi
+        - product:<id>: chi tiết sản phẩm
+        - category:<id> + products:all: danh sách/COUNT có (hoặc không) lọc danh mục
+        """
+        tags = {f"product:{product_id}", "products:all"}
+        tags.update(f"category:{c}" for c in category_ids if c)
+        shared_cache.invalidate_tags(*tags)
+
+    def _publish_search_upsert(self, product: Product) -> None:
+        """Helper: ghi delta tên/mô tả mới cho search + suggest index (sau commit)"""
+        product_search_index.publish_upsert(product.id, product.name, product.description)
+        suggest_index.publish_upsert("product", product.id, product.name)
@@ -8,6 +8,7 @@ import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from app.core.settings import settings
+from app.core.cache import shared_cache
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +68,33 @@ class GoShipClient:
     # ==================== LOCATIONS (provinces.open-api.vn) ====================
 
     def get_cities(self) -> List[Dict[str, Any]]:
+        """Lấy danh sách tỉnh/thành phố (cache CACHE_LOCATION_TTL)"""
+        return shared_cache.get_or_set(
+            "goship:cities",
+            self._fetch_cities,
+            ttl=settings.CACHE_LOCATION_TTL,
+            tags=["goship:locations"],
+        )
+
+    def get_districts(self, city_id: int) -> List[Dict[str, Any]]:
+        """Lấy danh sách quận/huyện theo tỉnh/thành (cache CACHE_LOCATION_TTL)"""
+        return shared_cache.get_or_set(
+            f"goship:districts:{city_id}",
+            lambda: self._fetch_districts(city_id),
+            ttl=settings.CACHE_LOCATION_TTL,
+            tags=["goship:locations"],
+        )
+
+    def get_wards(self, district_id: int) -> List[Dict[str, Any]]:
+        """Lấy danh sách phường/xã theo quận/huyện (cache CACHE_LOCATION_TTL)"""
+        return shared_cache.get_or_set(
+            f"goship:wards:{district_id}",
+            lambda: self._fetch_wards(district_id),
+            ttl=settings.CACHE_LOCATION_TTL,
+            tags=["goship:locations"],
+        )
+
+    def _fetch_cities(self) -> List[Dict[str, Any]]:
         """Lấy danh sách tỉnh/thành phố từ Vietnam Provinces API"""
         response = httpx.get(
             f"{PROVINCES_API}/",
@@ -78,7 +106,7 @@ class GoShipClient:
         # Chuẩn hóa: {id, name} format
         return [{"id": p["code"], "name": p["name"]} for p in data]
 
-    def get_districts(self, city_id: int) -> List[Dict[str, Any]]:
+    def _fetch_districts(self, city_id: int) -> List[Dict[str, Any]]:
         """Lấy danh sách quận/huyện theo tỉnh/thành"""
         response = httpx.get(
             f"{PROVINCES_API}/p/{city_id}?depth=2",
@@ -90,7 +118,7 @@ class GoShipClient:
         districts = data.get("districts", [])
         return [{"id": d["code"], "name": d["name"]} for d in districts]
 
-    def get_wards(self, district_id: int) -> List[Dict[str, Any]]:
+    def _fetch_wards(self, district_id: int) -> List[Dict[str, Any]]:
         """Lấy danh sách phường/xã theo quận/huyện"""
         response = httpx.get(
             f"{PROVINCES_API}/d/{district_id}?depth=2",
@@ -0,0 +1,62 @@
+"""
+Image variants - resize / đổi định dạng ảnh cho LocalImageUploader
+Pillow là dependency tùy chọn: không cài thì trả về False và phục vụ ảnh gốc
+File gốc không đọc được như ảnh -> InvalidImageError (router trả 415)
+"""
+import os
+from uuid import uuid4
+
+try:
+    from PIL import Image, ImageOps, UnidentifiedImageError
+except ImportError:
+    Image = None
+
+# format query param -> format của Pillow
+FORMATS = {"webp": "WEBP", "jpg": "JPEG", "jpeg": "JPEG", "png": "PNG"}
+
+
+class InvalidImageError(Exception):
+    """File gốc không phải ảnh Pillow đọc được (sai định dạng, hỏng, quá lớn)"""
+
+
+def build_variant(
+    src: str,
+    dst: str,
+    width: int | None = None,
+    height: int | None = None,
+    format: str | None = None,
+) -> bool:
+    """
+    Tạo biến thể của src và ghi vào dst
+    - có cả width và height: crop fill (giống crop="fill" của Cloudinary)
+    - chỉ một chiều: thu nhỏ giữ tỉ lệ
+    Ghi ra file tạm rồi os.replace -> request song song không đọc phải file dở
+    """
+    if Image is None:
+        return False
+
+    try:
+        with Image.open(src) as img:
+            source_format = img.format or "JPEG"
+            img = ImageOps.exif_transpose(img)
+            if width and height:
+                img = ImageOps.fit(img, (width, height))
+            elif width or height:
+                img.thumbnail((width or img.width, height or img.height))
+
+            pil_format = FORMATS.get(format or "", source_format)
+            if pil_format == "JPEG" and img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        # Lỗi đọc/giải mã file gốc; lỗi ghi biến thể (đầy đĩa...) vẫn để lọt ra ngoài
+        raise InvalidImageError(str(e)) from e
+
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    tmp = f"{dst}.{uuid4().hex}.tmp"
+    try:
+        img.save(tmp, format=pil_format)
+        os.replace(tmp, dst)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return True
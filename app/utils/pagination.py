@@ -0,0 +1,24 @@
+"""
+Pagination helpers - cursor cho keyset pagination
+Cursor = base64("<create_at iso>|<id>") của record cuối trang trước
+"""
+import base64
+from datetime import datetime
+from uuid import UUID
+
+
+def encode_cursor(create_at: datetime, id: UUID) -> str:
+    """Tạo cursor từ (create_at, id) của record cuối cùng"""
+    raw = f"{create_at.isoformat()}|{id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Giải mã cursor, raise ValueError nếu cursor không hợp lệ"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        create_at, id = raw.split("|", 1)
+        return datetime.fromisoformat(create_at), UUID(id)
+    except Exception as e:
+        raise ValueError(f"Cursor không hợp lệ: {cursor}") from e
@@ -0,0 +1,49 @@
+"""
+Price helpers - đổi giá dạng chuỗi (product.price) sang số nguyên VND
+VD: "150000" / "150.000" / "150,000đ" / "150000.0" -> 150000
+"""
+import re
+
+from fastapi import HTTPException, status
+
+NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+
+
+def parse_price(value: str | int | float | None) -> int | None:
+    """
+    Giá VND (số nguyên, VND không có đơn vị lẻ), None nếu không đọc được
+    - nhóm cuối sau dấu . hoặc , có đúng 3 chữ số -> dấu phân cách hàng nghìn
+    - ngược lại -> phần thập phân, làm tròn
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return round(value)
+
+    match = NUMBER_RE.search(value.replace(" ", ""))
+    if not match:
+        return None
+    number = match.group()
+
+    groups = re.split(r"[.,]", number)
+    if len(groups) == 1 or len(groups[-1]) == 3:
+        return int("".join(groups))
+    return round(float(f"{''.join(groups[:-1])}.{groups[-1]}"))
+
+
+def unit_price(price_vnd: int | None, price: str | None) -> int | None:
+    """Đơn giá VND của sản phẩm: price_vnd, dòng chưa backfill thì đọc từ chuỗi price"""
+    if price_vnd is not None:
+        return price_vnd
+    return parse_price(price)
+
+
+def product_unit_price(product) -> int:
+    """Đơn giá khi tính tiền đơn hàng; giá không đọc được -> 400 (không bỏ qua dòng, sai tổng tiền)"""
+    price = unit_price(product.price_vnd, product.price)
+    if price is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Sản phẩm '{product.name}' chưa có giá hợp lệ",
+        )
+    return price
@@ -1,4 +1,29 @@
 from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from typing import Any
+import orjson
+
+
+def orjson_default(obj: Any) -> Any:
+    """orjson tự xử lý UUID/datetime/dataclass; thêm pydantic/SQLModel"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSONResponse serialize bằng orjson
+    - Nhận thẳng dict chứa UUID/datetime/model, không cần jsonable_encoder đi trước
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content, default=orjson_default, option=orjson.OPT_NON_STR_KEYS
+        )
+
+
 class ResponseHandler: 
     @staticmethod
     def success(message , payload , status): 
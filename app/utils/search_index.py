@@ -0,0 +1,381 @@
+"""
+Index tìm kiếm trong process
+- InvertedIndex: fallback cho full-text search khi DB không phải MySQL (SQLite khi test/dev).
+  MySQL dùng FULLTEXT index, xem ProductRepository.search
+- SuggestIndex: gợi ý theo prefix cho ô tìm kiếm (/api/products/suggest)
+Index nằm trong từng worker, đồng bộ qua change_log (Redis Stream khi chạy nhiều worker):
+ghi dữ liệu nguồn -> publish_*() ghi delta -> mỗi worker áp delta vào index của mình ở lần đọc sau
+"""
+import bisect
+import heapq
+import itertools
+import math
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple
+from uuid import UUID
+
+from app.core.change_log import ChangeLog, Entry, change_log
+from app.utils.text import normalize_text
+
+# Từ khớp ở tên quan trọng hơn ở mô tả
+NAME_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+# Prefix ngắn (1-2 ký tự) khớp rất nhiều tên -> giữ sẵn top-k đã xếp hạng thay vì quét khoảng bisect
+SHORT_PREFIX = 2
+SHORT_PREFIX_TOP = 100  # > limit tối đa của /suggest (50): xóa vài mục top chưa phải tính lại
+# Số prefix dài (> SHORT_PREFIX) giữ top-k đã tính, LRU
+PREFIX_CACHE_SIZE = 10000
+
+
+def tokenize(text: str | None) -> List[str]:
+    """Tách từ đã bỏ dấu + lowercase ("Áo thun" và "ao thun" cho cùng token)"""
+    return normalize_text(text).split()
+
+
+class SyncedIndex(ABC):
+    """
+    Index trong process, đồng bộ giữa các worker qua change_log
+    - Sau khi commit dữ liệu nguồn: publish_*() ghi delta vào log
+    - Trước khi truy vấn: sync(load) - lần đầu hoặc khi log đã bị cắt qua vị trí của worker thì
+      dựng toàn bộ từ load(), còn lại chỉ áp các delta mới (của mọi worker)
+    """
+
+    def __init__(self, name: str, log: ChangeLog | None = None):
+        self.name = name
+        self.log = log or change_log
+        self.position: Any = None
+        self._lock = Lock()
+        # Request song song chờ 1 lần dựng/áp delta thay vì cùng dựng lại
+        self._sync_lock = Lock()
+
+    def sync(self, load: Callable[[], Iterable]) -> None:
+        with self._sync_lock:
+            if self.position is not None:
+                entries = self.log.read(self.name, self.position)
+                if entries is not None:
+                    for position, entry in entries:
+                        self._apply(entry)
+                        self.position = position
+                    return
+            # Lấy vị trí TRƯỚC khi đọc DB: delta ghi trong lúc dựng sẽ được áp lại (idempotent)
+            position = self.log.head(self.name)
+            self.build(load())
+            self.position = position
+
+    def publish(self, entry: Entry) -> None:
+        self.log.append(self.name, entry)
+
+    @abstractmethod
+    def build(self, docs: Iterable) -> None:
+        """Dựng lại toàn bộ index"""
+
+    @abstractmethod
+    def _apply(self, entry: Entry) -> None:
+        """Áp 1 delta đọc từ log"""
+
+
+class InvertedIndex(SyncedIndex):
+    """
+    Index term -> {doc_id: trọng số}, xếp hạng kiểu TF-IDF
+    Query nhiều từ: doc phải chứa tất cả các từ (AND)
+    """
+
+    def __init__(self, name: str, log: ChangeLog | None = None):
+        super().__init__(name, log)
+        self._postings: Dict[str, Dict[UUID, float]] = {}
+        self._doc_terms: Dict[UUID, Counter] = {}
+
+    def build(self, docs: Iterable[Tuple[UUID, str | None, str | None]]) -> None:
+        """Dựng lại toàn bộ index từ (id, name, description)"""
+        postings: Dict[str, Dict[UUID, float]] = {}
+        doc_terms: Dict[UUID, Counter] = {}
+        for doc_id, name, description in docs:
+            weights = self._weights(name, description)
+            doc_terms[doc_id] = weights
+            for term, weight in weights.items():
+                postings.setdefault(term, {})[doc_id] = weight
+        with self._lock:
+            self._postings = postings
+            self._doc_terms = doc_terms
+
+    def publish_upsert(self, doc_id: UUID, name: str | None, description: str | None) -> None:
+        self.publish(
+            {"op": "upsert", "id": str(doc_id), "name": name, "description": description}
+        )
+
+    def publish_remove(self, doc_id: UUID) -> None:
+        self.publish({"op": "remove", "id": str(doc_id)})
+
+    def upsert(self, doc_id: UUID, name: str | None, description: str | None) -> None:
+        weights = self._weights(name, description)
+        with self._lock:
+            self._remove(doc_id)
+            self._doc_terms[doc_id] = weights
+            for term, weight in weights.items():
+                self._postings.setdefault(term, {})[doc_id] = weight
+
+    def remove(self, doc_id: UUID) -> None:
+        with self._lock:
+            self._remove(doc_id)
+
+    def search(self, query: str) -> List[Tuple[UUID, float]]:
+        """Trả về [(doc_id, score)] giảm dần theo score"""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            postings = [self._postings.get(term, {}) for term in terms]
+            if not all(postings):
+                return []
+            total_docs = len(self._doc_terms)
+            candidates = set.intersection(*(set(p) for p in postings))
+            scores: Dict[UUID, float] = {}
+            for posting in postings:
+                idf = math.log(1 + total_docs / len(posting))
+                for doc_id in candidates:
+                    scores[doc_id] = scores.get(doc_id, 0.0) + posting[doc_id] * idf
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+    def _apply(self, entry: Entry) -> None:
+        doc_id = UUID(entry["id"])
+        if entry["op"] == "upsert":
+            self.upsert(doc_id, entry["name"], entry["description"])
+        else:
+            self.remove(doc_id)
+
+    def _remove(self, doc_id: UUID) -> None:
+        """Gỡ doc khỏi postings (gọi khi đang giữ lock)"""
+        for term in self._doc_terms.pop(doc_id, ()):
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self._postings[term]
+
+    def _weights(self, name: str | None, description: str | None) -> Counter:
+        weights: Counter = Counter()
+        for term in tokenize(name):
+            weights[term] += NAME_WEIGHT
+        for term in tokenize(description):
+            weights[term] += DESCRIPTION_WEIGHT
+        return weights
+
+
+# Index sản phẩm của worker hiện tại
+product_search_index = InvertedIndex("products")
+
+# (vị trí từ khớp, độ dài tên, tên, ref) - nhỏ hơn = gợi ý tốt hơn
+Rank = Tuple[int, int, str, int]
+
+
+class SuggestIndex(SyncedIndex):
+    """
+    Gợi ý (typeahead) theo prefix - mảng đã sắp xếp + bisect
+    Mỗi tên được index tại mọi vị trí đầu từ: "ao thun do" -> "ao thun do", "thun do", "do"
+    nên gõ "thu" vẫn gợi ý được "Áo thun đỏ"
+    Kết quả theo prefix giữ sẵn dạng top-k đã xếp hạng, cập nhật theo upsert/remove:
+    - prefix <= SHORT_PREFIX ký tự (khớp rất nhiều tên): dựng cùng index
+    - prefix dài hơn: tính ở lần hỏi đầu, giữ LRU tối đa PREFIX_CACHE_SIZE prefix
+    """
+
+    def __init__(self, name: str, log: ChangeLog | None = None):
+        super().__init__(name, log)
+        # Mục được đánh số (ref) trong process: hash int nhanh hơn hash (kind, UUID)
+        self._terms: List[Tuple[str, int, int]] = []  # (term, vị trí từ, ref)
+        self._entries: Dict[int, Tuple[str, UUID, str]] = {}  # ref -> (kind, id, label)
+        self._refs: Dict[Tuple[str, UUID], int] = {}
+        self._next_ref = itertools.count()
+        # prefix -> top-k Rank tăng dần; luôn là k mục tốt nhất (k có thể < SHORT_PREFIX_TOP
+        # sau khi xóa); prefix trong _complete: danh sách chứa mọi mục khớp
+        self._top: Dict[str, List[Rank]] = {}
+        self._long_top: "OrderedDict[str, List[Rank]]" = OrderedDict()
+        self._complete: Set[str] = set()
+
+    def build(self, entries: Iterable[Tuple[str, UUID, str]]) -> None:
+        """Dựng lại toàn bộ từ (kind, id, label)"""
+        terms: List[Tuple[str, int, int]] = []
+        by_ref: Dict[int, Tuple[str, UUID, str]] = {}
+        refs: Dict[Tuple[str, UUID], int] = {}
+        for ref, (kind, entry_id, label) in enumerate(entries):
+            by_ref[ref] = (kind, entry_id, label)
+            refs[(kind, entry_id)] = ref
+            terms.extend(self._terms_for(ref, label))
+        terms.sort()
+        top: Dict[str, List[Rank]] = {}
+        complete: Set[str] = set()
+        for length in range(1, SHORT_PREFIX + 1):
+            for prefix, group in itertools.groupby(terms, key=lambda t: t[0][:length]):
+                if len(prefix) < length:
+                    continue
+                top[prefix] = self._rank(group, by_ref, SHORT_PREFIX_TOP + 1)
+                if len(top[prefix]) <= SHORT_PREFIX_TOP:
+                    complete.add(prefix)
+                else:
+                    top[prefix].pop()
+        with self._lock:
+            self._terms = terms
+            self._entries = by_ref
+            self._refs = refs
+            self._next_ref = itertools.count(len(by_ref))
+            self._top = top
+            self._long_top = OrderedDict()
+            self._complete = complete
+
+    def publish_upsert(self, kind: str, entry_id: UUID, label: str) -> None:
+        self.publish({"op": "upsert", "kind": kind, "id": str(entry_id), "label": label})
+
+    def publish_remove(self, kind: str, entry_id: UUID) -> None:
+        self.publish({"op": "remove", "kind": kind, "id": str(entry_id)})
+
+    def upsert(self, kind: str, entry_id: UUID, label: str) -> None:
+        with self._lock:
+            ref = self._refs.get((kind, entry_id))
+            if ref is not None:
+                if self._entries[ref][2] == label:
+                    return
+                self._remove(ref)
+            ref = next(self._next_ref)
+            self._refs[(kind, entry_id)] = ref
+            self._entries[ref] = (kind, entry_id, label)
+            for term in self._terms_for(ref, label):
+                bisect.insort(self._terms, term)
+            for prefix, rank in self._prefix_ranks(ref, label).items():
+                top = self._cached_top(prefix)
+                if top is None:  # prefix ngắn chưa có mục nào khớp
+                    self._top[prefix] = [rank]
+                    self._complete.add(prefix)
+                    continue
+                # Danh sách chưa đủ mọi mục: chỉ chèn được khi rank đứng trước mục cuối
+                if prefix in self._complete or (top and rank < top[-1]):
+                    bisect.insort(top, rank)
+                    if len(top) > SHORT_PREFIX_TOP:
+                        top.pop()
+                        self._complete.discard(prefix)
+
+    def remove(self, kind: str, entry_id: UUID) -> None:
+        with self._lock:
+            ref = self._refs.get((kind, entry_id))
+            if ref is not None:
+                self._remove(ref)
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Top-N mục có từ bắt đầu bằng prefix, ưu tiên khớp từ đầu tên rồi tên ngắn
+        Cắt từ top-k đã giữ sẵn; chỉ xếp hạng lại toàn bộ khoảng khớp prefix (bisect) khi
+        prefix dài chưa có trong LRU hoặc danh sách đã bị xóa bớt còn < limit
+        """
+        query = normalize_text(prefix)
+        if not query:
+            return []
+        with self._lock:
+            top = self._cached_top(query)
+            if len(query) <= SHORT_PREFIX and top is None:
+                top = []  # prefix ngắn luôn được dựng sẵn: không có = không mục nào khớp
+            elif top is None or (len(top) < limit and query not in self._complete):
+                top = self._rank(self._range(query), self._entries, SHORT_PREFIX_TOP)
+                self._store_top(query, top)
+            ranked = top[:limit]
+            return [
+                dict(zip(("type", "id", "label"), self._entries[ref]))
+                for _, _, _, ref in ranked
+            ]
+
+    def _apply(self, entry: Entry) -> None:
+        entry_id = UUID(entry["id"])
+        if entry["op"] == "upsert":
+            self.upsert(entry["kind"], entry_id, entry["label"])
+        else:
+            self.remove(entry["kind"], entry_id)
+
+    def _remove(self, ref: int) -> None:
+        """Gỡ mục khỏi _terms, _entries, top-k (gọi khi đang giữ lock)"""
+        kind, entry_id, label = self._entries[ref]
+        for prefix, rank in self._prefix_ranks(ref, label).items():
+            top = self._cached_top(prefix)
+            if not top:
+                continue
+            i = bisect.bisect_left(top, rank)
+            if i < len(top) and top[i] == rank:
+                del top[i]
+            if not top and prefix in self._complete and len(prefix) <= SHORT_PREFIX:
+                del self._top[prefix]
+                self._complete.discard(prefix)
+        for term in self._terms_for(ref, label):
+            i = bisect.bisect_left(self._terms, term)
+            if i < len(self._terms) and self._terms[i] == term:
+                del self._terms[i]
+        del self._entries[ref]
+        del self._refs[(kind, entry_id)]
+
+    def _cached_top(self, prefix: str) -> List[Rank] | None:
+        if len(prefix) <= SHORT_PREFIX:
+            return self._top.get(prefix)
+        top = self._long_top.get(prefix)
+        if top is not None:
+            self._long_top.move_to_end(prefix)
+        return top
+
+    def _store_top(self, prefix: str, top: List[Rank]) -> None:
+        if len(top) < SHORT_PREFIX_TOP:
+            self._complete.add(prefix)
+        else:
+            self._complete.discard(prefix)
+        if len(prefix) <= SHORT_PREFIX:
+            self._top[prefix] = top
+            return
+        self._long_top[prefix] = top
+        while len(self._long_top) > PREFIX_CACHE_SIZE:
+            evicted, _ = self._long_top.popitem(last=False)
+            self._complete.discard(evicted)
+
+    def _range(self, query: str):
+        """Các term bắt đầu bằng query (liên tiếp trong mảng đã sắp xếp)"""
+        start = bisect.bisect_left(self._terms, (query,))
+        return itertools.takewhile(
+            lambda t: t[0].startswith(query), itertools.islice(self._terms, start, None)
+        )
+
+    @staticmethod
+    def _rank(
+        terms: Iterable[Tuple[str, int, int]],
+        entries: Dict[int, Tuple[str, UUID, str]],
+        limit: int,
+    ) -> List[Rank]:
+        """Top `limit` mục trong các term, mỗi mục tính theo vị trí khớp sớm nhất"""
+        matches: Dict[int, int] = {}
+        for _, position, ref in terms:
+            if position < matches.get(ref, position + 1):
+                matches[ref] = position
+        return heapq.nsmallest(
+            limit,
+            (
+                (position, len(entries[ref][2]), entries[ref][2], ref)
+                for ref, position in matches.items()
+            ),
+        )
+
+    def _prefix_ranks(self, ref: int, label: str) -> Dict[str, Rank]:
+        """
+        Prefix đang giữ top-k (mọi prefix ngắn + prefix dài trong LRU) mà mục khớp
+        -> Rank của mục với prefix đó (vị trí khớp sớm nhất)
+        """
+        ranks: Dict[str, Rank] = {}
+        for term, position, _ in self._terms_for(ref, label):  # vị trí tăng dần
+            for length in range(1, len(term) + 1):
+                prefix = term[:length]
+                if prefix not in ranks and (
+                    length <= SHORT_PREFIX or prefix in self._long_top
+                ):
+                    ranks[prefix] = (position, len(label), label, ref)
+        return ranks
+
+    def _terms_for(self, ref: int, label: str) -> List[Tuple[str, int, int]]:
+        words = normalize_text(label).split()
+        return [(" ".join(words[i:]), i, ref) for i in range(len(words))]
+
+
+# Gợi ý tên sản phẩm + danh mục của worker hiện tại
+suggest_index = SuggestIndex("suggest")
@@ -0,0 +1,27 @@
+"""
+Text helpers - chuẩn hóa tiếng Việt cho tìm kiếm không dấu
+VD: "Áo Thun Đỏ" -> "ao thun do"
+"""
+import re
+import unicodedata
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def strip_diacritics(text: str) -> str:
+    """Bỏ dấu tiếng Việt (đ/Đ không phải dấu kết hợp nên đổi riêng)"""
+    text = text.replace("đ", "d").replace("Đ", "D")
+    decomposed = unicodedata.normalize("NFD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def normalize_text(text: str | None) -> str:
+    """Bỏ dấu, lowercase, tách từ rồi nối lại bằng 1 khoảng trắng"""
+    if not text:
+        return ""
+    return " ".join(TOKEN_RE.findall(strip_diacritics(text).lower()))
+
+
+def build_search_text(*parts: str | None) -> str:
+    """Giá trị cột product.search_text từ các trường cần tìm (tên, mô tả...)"""
+    return " ".join(filter(None, (normalize_text(p) for p in parts)))
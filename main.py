@@ -17,10 +17,13 @@ from app.routers.address_router import addressRouter
 from app.routers.checkout_router import checkoutRouter
 from app.routers.goship_router import goshipRouter
 from app.routers.chatbot_router import chatbotRouter
+from app.routers.media_router import mediaRouter
 from app.core.cloudinary import cloud_config
 from contextlib import asynccontextmanager
 from app.services.seed_admin import seed_admin, seed_roles
-from app.core.database import get_session
+from app.core.database import get_session, dispose_engines
+from app.core.image_pipeline import image_pipeline
+from app.utils.response_helper import ORJSONResponse
 
 
 def run_seeders():
@@ -32,7 +35,10 @@ def run_seeders():
 @asynccontextmanager
 async def lifespan(app):
     run_seeders()
+    image_pipeline.resume_pending()
     yield
+    image_pipeline.shutdown()
+    await dispose_engines()
 
 
 app = FastAPI(
@@ -47,6 +53,7 @@ app = FastAPI(
     """,
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 cloud_config()
@@ -73,6 +80,7 @@ app.include_router(addressRouter, prefix=PREFIX)
 app.include_router(checkoutRouter, prefix=PREFIX)
 app.include_router(goshipRouter, prefix=PREFIX)
 app.include_router(chatbotRouter, prefix=PREFIX)
+app.include_router(mediaRouter, prefix=PREFIX)
 
 
 @app.get("/")
@@ -0,0 +1,83 @@
+"""
+Cấu hình test dùng chung
+- Settings: biến môi trường tối thiểu (không cần file .env)
+- engine/session: SQLite in-memory, tạo bảng từ metadata của models
+- file_engine/async_engine: sync + async (aiosqlite) cùng 1 file SQLite -> seed bằng session sync,
+  route `async def` đọc qua async_engine thấy cùng dữ liệu (2 engine in-memory là 2 DB riêng)
+- statements: đếm câu SQL gửi xuống DB (event before_cursor_execute)
+- anyio_backend: test `async def` đánh dấu @pytest.mark.anyio chạy trên asyncio
+"""
+import os
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("REFRESH_TOKEN_KEY", "test-refresh")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("CLOUDINARY_CLOUD_NAME", "test")
+os.environ.setdefault("CLOUDINARY_API_KEY", "0")
+os.environ.setdefault("CLOUDINARY_API_SECRET", "test")
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool, StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+import app.models  # noqa: F401 - đăng ký toàn bộ bảng vào SQLModel.metadata
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False}
+    )
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def async_engine(file_engine):
+    # NullPool: đóng kết nối aiosqlite ngay khi trả -> không cần await dispose(),
+    # dùng được từ event loop của test lẫn của TestClient
+    return create_async_engine(
+        file_engine.url.set(drivername="sqlite+aiosqlite"), poolclass=NullPool
+    )
+
+
+@pytest.fixture
+def session(engine):
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def statements(engine):
+    """Danh sách câu SQL đã chạy; test tự clear() trước đoạn cần đếm"""
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield executed
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1,51 @@
+"""
+Uploader giả cho test: không gọi mạng, ghi lại ảnh đã upload/xóa
+"""
+import threading
+import time
+from typing import BinaryIO, Dict, List, Set
+
+from app.core.image_uploader import ImageUploader, UploadedImage
+
+
+class FakeUploader(ImageUploader):
+    """
+    - fail: tên file upload lỗi
+    - delays: tên file -> số giây chờ trước khi upload xong
+    """
+
+    def __init__(
+        self,
+        fail: Set[str] = frozenset(),
+        delays: Dict[str, float] | None = None,
+        fail_delete: bool = False,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.fail = set(fail)
+        self.delays = delays or {}
+        self.fail_delete = fail_delete
+        self.uploaded: List[str] = []
+        self.deleted: List[str] = []
+        self.deleted_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def upload(self, file: BinaryIO, filename: str | None = None) -> UploadedImage:
+        time.sleep(self.delays.get(filename, 0))
+        if filename in self.fail:
+            raise RuntimeError(f"upload {filename} lỗi")
+        public_id = f"fake/{filename}"
+        with self._lock:
+            self.uploaded.append(public_id)
+        return UploadedImage(
+            public_id=public_id,
+            url=f"https://cdn.test/{public_id}",
+            thumbnail_url=f"https://cdn.test/thumb/{public_id}",
+        )
+
+    def delete(self, public_id: str) -> None:
+        if self.fail_delete:
+            raise RuntimeError("CDN không phản hồi")
+        with self._lock:
+            self.deleted.append(public_id)
+        self.deleted_event.set()
@@ -0,0 +1,103 @@
+"""
+Route `async def` (danh mục, chi tiết sản phẩm) chạy trên async engine: dữ liệu seed bằng
+session sync đọc được qua AsyncSession, cache async
+"""
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import shared_cache
+from app.core.database import get_async_read_session, get_async_session, to_async_url
+from app.enum.role_enum import ImageStatus
+from app.models import Category, Product, ProductDetail, ProductImage
+from app.routers.category_router import categoryRouter
+from app.routers.product_router import productRouter
+
+
+@pytest.fixture(autouse=True)
+def clear_shared_cache():
+    shared_cache.clear()
+    yield
+    shared_cache.clear()
+
+
+@pytest.fixture
+def catalog(file_engine):
+    category = Category(name="Áo")
+    product = Product(name="Áo thun", price="100.000", price_vnd=100000, category_id=category.id)
+    detail = ProductDetail(product_id=product.id, color="red", size="M", stock=3)
+    ready = ProductImage(
+        product_id=product.id,
+        cloudinary_public_id="cdn/a",
+        url="https://cdn.test/a",
+        thumbnail_url="https://cdn.test/thumb/a",
+        status=ImageStatus.READY,
+    )
+    pending = ProductImage(
+        product_id=product.id,
+        cloudinary_public_id="pending:b.jpg",
+        url="",
+        thumbnail_url="",
+        status=ImageStatus.PENDING,
+    )
+    with Session(file_engine) as session:
+        session.add_all([category, product, detail, ready, pending])
+        session.commit()
+        return {"category": category.id, "product": product.id, "image": ready.id}
+
+
+@pytest.fixture
+def client(async_engine):
+    app = FastAPI()
+    app.include_router(categoryRouter)
+    app.include_router(productRouter)
+    sessions = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override():
+        async with sessions() as session:
+            yield session
+
+    app.dependency_overrides[get_async_read_session] = override
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.anyio
+async def test_list_categories_reads_through_async_session(client, catalog):
+    async with client:
+        response = await client.get("/categories/")
+
+    assert response.status_code == 200
+    assert [c["name"] for c in response.json()] == ["Áo"]
+
+
+@pytest.mark.anyio
+async def test_product_detail_loads_ready_images_and_details(client, catalog):
+    async with client:
+        response = await client.get(f"/products/{catalog['product']}")
+        missing = await client.get(f"/products/{catalog['category']}")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["name"] == "Áo thun"
+    assert [image["id"] for image in body["images"]] == [str(catalog["image"])]
+    assert [detail["color"] for detail in body["product_details"]] == ["red"]
+    assert missing.status_code == 404
+
+
+def test_sqlite_url_maps_to_aiosqlite():
+    assert to_async_url("sqlite://").drivername == "sqlite+aiosqlite"
+    assert to_async_url("mysql+pymysql://u:p@db/shop").drivername == "mysql+aiomysql"
+
+
+@pytest.mark.anyio
+async def test_app_async_session_dependency_opens_connection():
+    sessions = get_async_session()
+    session = await anext(sessions)
+    try:
+        assert (await session.exec(text("SELECT 1"))).scalar() == 1
+    finally:
+        await sessions.aclose()
@@ -0,0 +1,166 @@
+"""
+Cache backends: MemoryCache (TTL + LRU, gỡ liên kết tag) và RedisCache trên fakeredis,
+aget/aset không chặn event loop
+"""
+import threading
+
+import fakeredis
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import CacheBackend, MemoryCache, RedisCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def redis_cache():
+    return RedisCache(ttl=60, prefix="test:", client=fakeredis.FakeRedis())
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        CacheBackend()
+
+
+# ==================== MEMORY ====================
+
+
+def test_memory_get_set_and_ttl(clock):
+    cache = MemoryCache(maxsize=10, ttl=30)
+    cache.set("a", {"x": 1}, tags=["product:1"])
+    assert cache.get("a") == {"x": 1}
+
+    clock.now += 31
+    assert cache.get("a") is None
+    assert cache._tags == {}
+    assert cache._key_tags == {}
+
+
+def test_memory_lru_eviction_unlinks_tags(clock):
+    cache = MemoryCache(maxsize=2, ttl=30)
+    for i in range(100):
+        cache.set(f"products:cursor:{i}", i, tags=["products:all", f"product:{i}"])
+
+    assert len(cache._data) == 2
+    assert cache._tags["products:all"] == {"products:cursor:98", "products:cursor:99"}
+    assert set(cache._key_tags) == {"products:cursor:98", "products:cursor:99"}
+    assert len(cache._tags) == 3
+
+
+def test_memory_delete_and_overwrite_unlink_tags(clock):
+    cache = MemoryCache(maxsize=10, ttl=30)
+    cache.set("a", 1, tags=["product:1"])
+    cache.set("a", 2, tags=["product:2"])
+    assert "product:1" not in cache._tags
+
+    cache.delete("a")
+    assert cache._tags == {}
+    assert cache._key_tags == {}
+
+
+def test_memory_invalidate_tags(clock):
+    cache = MemoryCache(maxsize=10, ttl=30)
+    cache.set("a", 1, tags=["product:1", "products:all"])
+    cache.set("b", 2, tags=["products:all"])
+    cache.set("c", 3, tags=["category:1"])
+
+    cache.invalidate_tags("product:1")
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache._tags["products:all"] == {"b"}
+
+    cache.invalidate_tags("products:all")
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert set(cache._tags) == {"category:1"}
+
+
+# ==================== REDIS ====================
+
+
+def test_redis_get_set_roundtrip(redis_cache):
+    marker = object()
+    assert redis_cache.get("missing", marker) is marker
+
+    redis_cache.set("a", {"items": [1, 2], "name": "Áo"})
+    assert redis_cache.get("a") == {"items": [1, 2], "name": "Áo"}
+    assert redis_cache.client.exists("test:a")
+
+    redis_cache.delete("a")
+    assert redis_cache.get("a") is None
+    assert redis_cache.stats()["hits"] == 1
+
+
+def test_redis_ttl(redis_cache):
+    redis_cache.set("default", 1)
+    redis_cache.set("short", 1, ttl=5, tags=["product:1"])
+
+    assert 0 < redis_cache.client.ttl("test:default") <= 60
+    assert 0 < redis_cache.client.ttl("test:short") <= 5
+    # Tag sống lâu hơn key
+    assert redis_cache.client.ttl("test:tag:product:1") > 5
+
+
+def test_redis_invalidate_tags(redis_cache):
+    redis_cache.set("a", 1, tags=["product:1", "products:all"])
+    redis_cache.set("b", 2, tags=["products:all"])
+    redis_cache.set("c", 3, tags=["category:1"])
+
+    redis_cache.invalidate_tags("products:all")
+    assert redis_cache.get("a") is None
+    assert redis_cache.get("b") is None
+    assert redis_cache.get("c") == 3
+    assert not redis_cache.client.exists("test:tag:products:all")
+
+
+def test_redis_clear_only_touches_prefix(redis_cache):
+    redis_cache.client.set("other:key", 1)
+    redis_cache.set("a", 1, tags=["product:1"])
+
+    redis_cache.clear()
+    assert redis_cache.get("a") is None
+    assert redis_cache.client.get("other:key") == b"1"
+
+
+# ==================== ASYNC ====================
+
+
+@pytest.mark.anyio
+async def test_redis_async_calls_run_off_the_event_loop(redis_cache):
+    loop_thread = threading.get_ident()
+    threads = []
+    real_get = redis_cache.client.get
+
+    def recording_get(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return real_get(*args, **kwargs)
+
+    redis_cache.client.get = recording_get
+    await redis_cache.aset("a", {"x": 1}, tags=["product:1"])
+
+    assert await redis_cache.aget("a") == {"x": 1}
+    assert threads and loop_thread not in threads
+
+
+@pytest.mark.anyio
+async def test_memory_async_calls(clock):
+    cache = MemoryCache(maxsize=10, ttl=30)
+    await cache.aset("a", 1, tags=["product:1"])
+
+    assert await cache.aget("a") == 1
+    cache.invalidate_tags("product:1")
+    assert await cache.aget("a", "miss") == "miss"
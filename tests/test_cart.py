@@ -0,0 +1,208 @@
+"""
+Giỏ hàng: 1 transaction / thao tác + total theo delta, upsert, thao tác batch,
+quyền sở hữu dòng, tổng tiền khi price_vnd chưa backfill
+"""
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import event
+from sqlmodel import select
+
+from app.models import CartItem, Category, Product, ProductDetail, User
+from app.repositories.cart_repository import CartRepository
+from app.schemas.cart_schemas import CartBatchOperation
+from app.services.cart_service import CartService
+
+
+@pytest.fixture
+def service():
+    return CartService(CartRepository())
+
+
+def seed(session, price: str = "100.000", price_vnd: int | None = 100000):
+    user = User(username="buyer", email="buyer@example.com", password_hashed="x")
+    category = Category(name="Áo")
+    product = Product(name="Áo thun", price=price, price_vnd=price_vnd, category_id=category.id)
+    detail = ProductDetail(product_id=product.id, stock=10)
+    session.add_all([user, category, product, detail])
+    session.commit()
+    return user, detail
+
+
+@pytest.mark.parametrize("op", ["add", "set"])
+@pytest.mark.parametrize("quantity", [0, -3])
+def test_batch_operation_rejects_non_positive_quantity(op, quantity):
+    with pytest.raises(ValidationError):
+        CartBatchOperation(op=op, detail_id=ProductDetail().id, quantity=quantity)
+
+
+def test_batch_applies_operations_in_order(session, service):
+    user, detail = seed(session)
+    operations = [
+        CartBatchOperation(op="add", detail_id=detail.id, quantity=2),
+        CartBatchOperation(op="add", detail_id=detail.id, quantity=3),
+        CartBatchOperation(op="set", detail_id=detail.id, quantity=4),
+    ]
+
+    result = service.apply_batch(user, operations, session)
+
+    assert [item["quantity"] for item in result["items"]] == [4]
+    assert result["cart"].total == 4
+
+
+def test_batch_remove_deletes_line(session, service):
+    user, detail = seed(session)
+    service.apply_batch(user, [CartBatchOperation(op="add", detail_id=detail.id)], session)
+
+    result = service.apply_batch(
+        user, [CartBatchOperation(op="remove", detail_id=detail.id)], session
+    )
+
+    assert result["items"] == []
+    assert result["cart"].total == 0
+
+
+def test_update_and_remove_check_cart_owner(session, service):
+    user, detail = seed(session)
+    other = User(username="other", email="other@example.com", password_hashed="x")
+    session.add(other)
+    session.commit()
+    cart = service.apply_batch(user, [CartBatchOperation(op="add", detail_id=detail.id)], session)
+    item_id = cart["items"][0]["id"]
+
+    with pytest.raises(HTTPException) as exc:
+        service.update_cart_item(other, item_id, 3, session)
+    assert exc.value.status_code == 403
+    with pytest.raises(HTTPException) as exc:
+        service.remove_from_cart(other, uuid4(), session)
+    assert exc.value.status_code == 404
+
+    assert service.update_cart_item(user, item_id, 3, session)["cart_item"].quantity == 3
+    service.remove_from_cart(user, item_id, session)
+    assert service.get_my_cart(user, session)["items"] == []
+
+
+def test_cart_subtotal_falls_back_to_price_string(session, service):
+    user, detail = seed(session, price="150.000", price_vnd=None)  # chưa backfill
+
+    result = service.apply_batch(
+        user, [CartBatchOperation(op="add", detail_id=detail.id, quantity=2)], session
+    )
+
+    assert result["items"][0]["line_total"] == 300000
+    assert result["subtotal"] == 300000
+
+
+def test_batch_add_then_remove_new_line(session, service):
+    user, detail = seed(session)
+
+    result = service.apply_batch(
+        user,
+        [
+            CartBatchOperation(op="add", detail_id=detail.id, quantity=2),
+            CartBatchOperation(op="remove", detail_id=detail.id),
+        ],
+        session,
+    )
+
+    assert result["items"] == []
+    assert result["cart"].total == 0
+
+
+def test_batch_concurrent_insert_of_same_line_is_409(session, service, monkeypatch):
+    user, detail = seed(session)
+    service.apply_batch(user, [CartBatchOperation(op="add", detail_id=detail.id)], session)
+    # Request song song vừa thêm dòng sau khi batch này đọc giỏ -> batch tự INSERT trùng
+    monkeypatch.setattr(service.repository, "get_cart_items", lambda cart_id, session: [])
+
+    with pytest.raises(HTTPException) as exc:
+        service.apply_batch(user, [CartBatchOperation(op="add", detail_id=detail.id)], session)
+
+    assert exc.value.status_code == 409
+    assert session.exec(select(CartItem)).one().quantity == 1
+
+
+def test_add_same_detail_twice_sums_into_one_row(session, service):
+    user, detail = seed(session)
+
+    first = service.add_to_cart(user, detail.product_id, detail.id, 2, session)
+    second = service.add_to_cart(user, detail.product_id, detail.id, 3, session)
+
+    assert first["message"] == "Thêm sản phẩm vào giỏ hàng thành công"
+    assert second["message"] == "Cập nhật số lượng sản phẩm trong giỏ hàng"
+    (row,) = session.exec(select(CartItem)).all()
+    assert row.quantity == 5 and second["cart_item"].id == row.id
+    assert service.get_my_cart(user, session)["cart"].total == 5
+
+
+def test_upsert_rejects_unsupported_dialect(session, monkeypatch):
+    monkeypatch.setattr(session.get_bind().dialect, "name", "postgresql")
+
+    with pytest.raises(NotImplementedError):
+        CartRepository().upsert_cart_item(uuid4(), uuid4(), uuid4(), 1, session)
+
+
+@pytest.fixture
+def commits(session):
+    """Số lần commit của session"""
+    counter = {"count": 0}
+
+    def after_commit(_):
+        counter["count"] += 1
+
+    event.listen(session, "after_commit", after_commit)
+    yield counter
+    event.remove(session, "after_commit", after_commit)
+
+
+def cart_state(session, user):
+    """(cart.total, {detail_id: quantity}) đọc lại từ DB"""
+    session.expire_all()
+    cart = CartRepository().get_cart_by_user_id(user.id, session)
+    items = CartRepository().get_cart_items(cart.id, session)
+    return cart.total, {item.detail_id: item.quantity for item in items}
+
+
+def test_each_cart_mutation_commits_once_and_moves_total_by_delta(session, service, commits):
+    user, detail = seed(session)
+    other = ProductDetail(product_id=detail.product_id, stock=10)
+    session.add(other)
+    session.commit()
+    service.add_to_cart(user, detail.product_id, other.id, 4, session)
+    commits["count"] = 0
+
+    item_id = service.add_to_cart(user, detail.product_id, detail.id, 2, session)["cart_item"].id
+    assert commits["count"] == 1
+    assert cart_state(session, user) == (6, {other.id: 4, detail.id: 2})
+
+    service.update_cart_item(user, item_id, 5, session)
+    assert commits["count"] == 2
+    assert cart_state(session, user) == (9, {other.id: 4, detail.id: 5})
+
+    service.remove_from_cart(user, item_id, session)
+    assert commits["count"] == 3
+    assert cart_state(session, user) == (4, {other.id: 4})
+
+
+def test_failed_cart_mutation_leaves_total_unchanged(session, service, commits, monkeypatch):
+    user, detail = seed(session)
+    item_id = service.add_to_cart(user, detail.product_id, detail.id, 2, session)["cart_item"].id
+    commits["count"] = 0
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("DB lỗi giữa chừng")
+
+    monkeypatch.setattr(service.repository, "increment_cart_total", fail)
+    for mutation in (
+        lambda: service.add_to_cart(user, detail.product_id, detail.id, 3, session),
+        lambda: service.update_cart_item(user, item_id, 7, session),
+        lambda: service.remove_from_cart(user, item_id, session),
+    ):
+        with pytest.raises(RuntimeError):
+            mutation()
+        session.rollback()  # session của request bị đóng -> rollback
+
+        assert commits["count"] == 0
+        assert cart_state(session, user) == (2, {detail.id: 2})
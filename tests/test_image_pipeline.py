@@ -0,0 +1,182 @@
+"""
+Image pipeline: claim ảnh giữa các worker, file spool bị mất, ảnh failed bỏ public_id tạm,
+loader chỉ trả ảnh ready, dọn file spool khi commit lỗi / xóa sản phẩm, tắt app không chờ backoff
+"""
+import io
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import UploadFile
+from sqlmodel import Session, select
+
+from app.core import image_pipeline as pipeline_module
+from app.core.image_pipeline import PENDING_PREFIX, ImagePipeline
+from app.enum.role_enum import ImageStatus
+from app.models import Category, Product, ProductImage
+from app.repositories.product_repository import (
+    AsyncProductRepository,
+    ProductRepository,
+    ready_images,
+)
+from app.services.product_service import ProductService
+from fakes import FakeUploader
+
+
+@pytest.fixture
+def pipeline_engine(engine, monkeypatch):
+    # Pipeline dùng engine toàn cục -> trỏ sang DB test
+    monkeypatch.setattr(pipeline_module, "engine", engine)
+    return engine
+
+
+def make_pipeline(tmp_path, uploader=None, **kwargs) -> ImagePipeline:
+    return ImagePipeline(
+        uploader or FakeUploader(),
+        spool_dir=str(tmp_path),
+        retries=1,
+        backoff=0,
+        **kwargs,
+    )
+
+
+def seed_images(session, pipeline: ImagePipeline, count: int):
+    category = Category(name="Áo")
+    product = Product(name="Áo thun", price="100.000", price_vnd=100000, category_id=category.id)
+    images = [pipeline.spool(io.BytesIO(b"img"), f"a{i}.jpg") for i in range(count)]
+    for image in images:
+        image.product_id = product.id
+    session.add_all([category, product, *images])
+    session.commit()
+    return product, images
+
+
+def test_claim_is_exclusive_between_workers(pipeline_engine, session, tmp_path):
+    worker_a, worker_b = make_pipeline(tmp_path), make_pipeline(tmp_path)
+    _, images = seed_images(session, worker_a, 2)
+    ids = [image.id for image in images]
+
+    assert worker_a._claim(ids) == set(ids)
+    assert worker_b._claim(ids) == set()
+
+
+def test_stale_processing_image_can_be_reclaimed(pipeline_engine, session, tmp_path):
+    pipeline = make_pipeline(tmp_path, lease=60)
+    _, (image,) = seed_images(session, pipeline, 1)
+    image.status = ImageStatus.PROCESSING
+    image.claimed_at = datetime.now() - timedelta(seconds=120)
+    session.add(image)
+    session.commit()
+
+    assert pipeline._claim([image.id]) == {image.id}
+
+
+def test_missing_spool_file_fails_only_that_image(pipeline_engine, session, tmp_path):
+    uploader = FakeUploader()
+    pipeline = make_pipeline(tmp_path, uploader)
+    product, (lost, kept) = seed_images(session, pipeline, 2)
+    jobs = {
+        image.id: image.cloudinary_public_id.removeprefix(PENDING_PREFIX)
+        for image in (lost, kept)
+    }
+    (tmp_path / jobs[lost.id]).unlink()
+
+    pipeline._process(product.id, jobs)
+
+    with Session(pipeline_engine) as check:
+        lost_row = check.get(ProductImage, lost.id)
+        kept_row = check.get(ProductImage, kept.id)
+        assert lost_row.status == ImageStatus.FAILED
+        assert lost_row.cloudinary_public_id is None
+        assert kept_row.status == ImageStatus.READY
+        assert kept_row.cloudinary_public_id == f"fake/{kept.id}"
+    assert uploader.uploaded == [f"fake/{kept.id}"]
+
+
+def test_failed_upload_clears_pending_public_id(pipeline_engine, session, tmp_path):
+    pipeline = make_pipeline(tmp_path)
+    product, (image,) = seed_images(session, pipeline, 1)
+    pipeline.uploader = FakeUploader(fail={str(image.id)})
+
+    pipeline._process(
+        product.id, {image.id: image.cloudinary_public_id.removeprefix(PENDING_PREFIX)}
+    )
+
+    with Session(pipeline_engine) as check:
+        row = check.get(ProductImage, image.id)
+        assert row.status == ImageStatus.FAILED
+        assert row.cloudinary_public_id is None
+
+
+def test_ready_images_loader_skips_unfinished_images(pipeline_engine, session, tmp_path):
+    pipeline = make_pipeline(tmp_path)
+    product, (ready, pending, failed) = seed_images(session, pipeline, 3)
+    ready.status, ready.cloudinary_public_id = ImageStatus.READY, "cdn/ready"
+    failed.status, failed.cloudinary_public_id = ImageStatus.FAILED, None
+    session.add_all([ready, failed])
+    session.commit()
+
+    with Session(pipeline_engine) as fresh:
+        loaded = fresh.exec(
+            select(Product).options(ready_images()).where(Product.id == product.id)
+        ).one()
+        assert [image.id for image in loaded.images] == [ready.id]
+
+
+class FailingCommitRepository(ProductRepository):
+    def refresh_summary(self, product_id, session):
+        raise RuntimeError("DB lỗi khi commit")
+
+
+def spooled_files(tmp_path) -> list:
+    return [path.name for path in tmp_path.iterdir()]
+
+
+def test_failed_product_commit_removes_spool_files(session, tmp_path):
+    pipeline = make_pipeline(tmp_path)
+    category = Category(name="Áo")
+    session.add(category)
+    session.commit()
+    service = ProductService(FailingCommitRepository(), AsyncProductRepository(), pipeline)
+    upload = UploadFile(io.BytesIO(b"img"), filename="a.jpg")
+
+    with pytest.raises(RuntimeError):
+        service.create_product(session, "Áo len", None, "100.000", category.id, [upload])
+
+    assert spooled_files(tmp_path) == []
+
+
+def test_deleting_product_removes_unclaimed_spool_files(session, tmp_path):
+    pipeline = make_pipeline(tmp_path)
+    product, _ = seed_images(session, pipeline, 2)
+    assert len(spooled_files(tmp_path)) == 2
+    service = ProductService(ProductRepository(), AsyncProductRepository(), pipeline)
+
+    service.delete_product(product.id, session)
+
+    assert spooled_files(tmp_path) == []
+
+
+def test_shutdown_interrupts_backoff_and_leaves_image_pending(pipeline_engine, session, tmp_path):
+    pipeline = make_pipeline(tmp_path)
+    pipeline.retries, pipeline.backoff = 3, 60
+    product, (image,) = seed_images(session, pipeline, 1)
+    pipeline.uploader = FakeUploader(fail={str(image.id)})
+    pipeline.submit(product.id, [image])
+    # Chờ worker claim ảnh; lượt upload đầu lỗi ngay -> job chờ backoff 60s
+    deadline = time.monotonic() + 5
+    with Session(pipeline_engine) as check:
+        while check.get(ProductImage, image.id).status != ImageStatus.PROCESSING:
+            assert time.monotonic() < deadline
+            check.expire_all()
+            time.sleep(0.01)
+
+    started = time.monotonic()
+    pipeline.shutdown()
+
+    assert time.monotonic() - started < 5
+    with Session(pipeline_engine) as check:
+        row = check.get(ProductImage, image.id)
+        assert row.status == ImageStatus.PENDING
+        assert row.claimed_at is None
+    assert len(spooled_files(tmp_path)) == 1
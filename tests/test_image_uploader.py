@@ -0,0 +1,57 @@
+"""
+ImageUploader.upload_many: song song, báo lỗi từng file, dọn ảnh upload muộn
+"""
+import io
+import logging
+
+import pytest
+
+from app.core.image_uploader import ImageUploader
+from fakes import FakeUploader
+
+
+def files(*names: str):
+    return [(io.BytesIO(b"img"), name) for name in names]
+
+
+def test_uploader_is_abstract():
+    with pytest.raises(TypeError):
+        ImageUploader()
+
+
+def test_upload_many_keeps_input_order():
+    uploader = FakeUploader(delays={"a.jpg": 0.05}, max_workers=3)
+
+    uploaded, failures = uploader.upload_many(files("a.jpg", "b.jpg", "c.jpg"))
+
+    assert [image.filename for image in uploaded] == ["a.jpg", "b.jpg", "c.jpg"]
+    assert failures == []
+
+
+def test_upload_many_reports_partial_failures():
+    uploader = FakeUploader(fail={"b.jpg"}, max_workers=2)
+
+    uploaded, failures = uploader.upload_many(files("a.jpg", "b.jpg", "c.jpg"))
+
+    assert [image.filename for image in uploaded] == ["a.jpg", "c.jpg"]
+    assert [(f.filename, f.error) for f in failures] == [("b.jpg", "upload b.jpg lỗi")]
+
+
+def test_upload_finishing_after_timeout_is_deleted():
+    uploader = FakeUploader(delays={"slow.jpg": 0.5}, max_workers=2, timeout=0.1)
+
+    uploaded, failures = uploader.upload_many(files("fast.jpg", "slow.jpg"))
+
+    assert [image.filename for image in uploaded] == ["fast.jpg"]
+    assert [(f.filename, f.error) for f in failures] == [("slow.jpg", "timeout")]
+    assert uploader.deleted_event.wait(timeout=2)
+    assert uploader.deleted == ["fake/slow.jpg"]
+
+
+def test_delete_quietly_logs_failures(caplog):
+    uploader = FakeUploader(fail_delete=True)
+
+    with caplog.at_level(logging.ERROR, logger="app.core.image_uploader"):
+        uploader.delete_quietly("fake/a.jpg")
+
+    assert "fake/a.jpg" in caplog.text
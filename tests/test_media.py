@@ -0,0 +1,70 @@
+"""
+/media: chỉ tạo biến thể trong danh sách cho phép, file gốc hỏng -> 415
+"""
+import io
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.core.image_uploader import local_storage
+from app.routers.media_router import mediaRouter
+
+
+@pytest.fixture
+def media_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(local_storage, "media_root", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(mediaRouter)
+    return TestClient(app)
+
+
+def store_png(size=(400, 300)) -> str:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "red").save(buffer, format="PNG")
+    buffer.seek(0)
+    return local_storage.upload(buffer, "a.png").public_id
+
+
+def test_allowed_variant_is_resized(media_root, client):
+    name = store_png()
+
+    response = client.get(f"/media/{name}", params={"w": 100, "h": 100, "format": "webp"})
+
+    assert response.status_code == 200
+    assert Image.open(io.BytesIO(response.content)).size == (100, 100)
+
+
+def test_jpeg_alias_shares_jpg_variant(media_root, client):
+    name = store_png()
+
+    client.get(f"/media/{name}", params={"format": "jpeg"})
+    client.get(f"/media/{name}", params={"format": "jpg"})
+
+    assert os.listdir(media_root / local_storage.VARIANT_DIR / name) == ["0x0.jpg"]
+
+
+@pytest.mark.parametrize("params", [{"w": 101, "h": 100}, {"w": 1999}, {"h": 300}])
+def test_unlisted_size_is_rejected_without_writing(media_root, client, params):
+    name = store_png()
+
+    response = client.get(f"/media/{name}", params=params)
+
+    assert response.status_code == 400
+    assert not (media_root / local_storage.VARIANT_DIR).exists()
+
+
+def test_corrupt_original_returns_415(media_root, client):
+    name = local_storage.upload(io.BytesIO(b"not an image"), "a.jpg").public_id
+
+    response = client.get(f"/media/{name}", params={"w": 300, "h": 300})
+
+    assert response.status_code == 415
+    assert not (media_root / local_storage.VARIANT_DIR).exists()
@@ -0,0 +1,52 @@
+"""
+Danh sách đơn hàng admin: số câu SQL không đổi theo số đơn trong trang
+(1 SELECT đơn + email + payment status + số item, 1 COUNT)
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.enum.role_enum import OrderStatus
+from app.models import Category, Order, OrderItem, PaymentDetail, Product, User
+from app.repositories.order_repository import OrderRepository
+from app.services.order_service import OrderService
+
+
+def seed_orders(session, count: int) -> None:
+    category = Category(name="Áo")
+    product = Product(name="Áo thun", price="100000", category_id=category.id)
+    session.add_all([category, product])
+    started = datetime(2026, 1, 1)
+    for i in range(count):
+        user = User(username=f"user{i}", email=f"user{i}@example.com", password_hashed="x")
+        payment = PaymentDetail(amount=100000, provider="vnpay", status="paid")
+        order = Order(
+            user_id=user.id,
+            payment_id=payment.id,
+            total=100000,
+            status=OrderStatus.PENDING,
+            create_at=started + timedelta(minutes=i),
+        )
+        session.add_all([user, payment, order])
+        session.add_all(
+            OrderItem(order_id=order.id, product_id=product.id, quantity=1)
+            for _ in range(2)
+        )
+    session.commit()
+    session.expunge_all()
+
+
+@pytest.mark.parametrize("count", [3, 50])
+def test_get_all_orders_query_count_is_constant(session, statements, count):
+    seed_orders(session, count)
+    service = OrderService(OrderRepository())
+
+    statements.clear()
+    result = service.get_all_orders(session, limit=50)
+
+    assert len(statements) == 2
+    assert len(result["orders"]) == count
+    first = result["orders"][0]
+    assert first["user_email"] == f"user{count - 1}@example.com"
+    assert first["payment_status"] == "paid"
+    assert first["items_count"] == 2
@@ -0,0 +1,76 @@
+"""
+Giá VND: parse chuỗi price, fallback khi price_vnd chưa backfill, tổng tiền đơn hàng
+"""
+import pytest
+from fastapi import HTTPException
+
+from app.models import Cart, CartItem, Category, Product, ProductDetail, User
+from app.repositories.order_repository import OrderRepository
+from app.services.order_service import OrderService
+from app.utils.price import parse_price, unit_price
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("150000", 150000),
+        ("150.000", 150000),
+        ("150,000đ", 150000),
+        ("1.250.000 VND", 1250000),
+        ("150000.0", 150000),
+        ("99,5", 100),
+        (120000, 120000),
+        ("liên hệ", None),
+        (None, None),
+    ],
+)
+def test_parse_price(value, expected):
+    assert parse_price(value) == expected
+
+
+def test_unit_price_falls_back_to_price_string():
+    assert unit_price(90000, "100.000") == 90000
+    assert unit_price(None, "100.000") == 100000
+    assert unit_price(None, "liên hệ") is None
+
+
+def seed_cart(session, *products: Product) -> User:
+    user = User(username="buyer", email="buyer@example.com", password_hashed="x")
+    cart = Cart(user_id=user.id)
+    session.add_all([user, cart])
+    for product in products:
+        detail = ProductDetail(product_id=product.id, stock=10)
+        session.add_all([product, detail])
+        session.add(
+            CartItem(cart_id=cart.id, product_id=product.id, detail_id=detail.id, quantity=2)
+        )
+    session.commit()
+    return user
+
+
+def make_product(category: Category, price: str, price_vnd: int | None) -> Product:
+    return Product(name=f"SP {price}", price=price, price_vnd=price_vnd, category_id=category.id)
+
+
+def test_order_total_uses_price_string_when_price_vnd_missing(session):
+    category = Category(name="Áo")
+    session.add(category)
+    user = seed_cart(
+        session,
+        make_product(category, "100.000", 100000),
+        make_product(category, "50.000", None),  # chưa backfill
+    )
+
+    result = OrderService(OrderRepository()).create_order_from_cart(user, session)
+
+    assert result["total"] == 2 * 100000 + 2 * 50000
+
+
+def test_order_rejects_unreadable_price(session):
+    category = Category(name="Áo")
+    session.add(category)
+    user = seed_cart(session, make_product(category, "liên hệ", None))
+
+    with pytest.raises(HTTPException) as exc:
+        OrderService(OrderRepository()).create_order_from_cart(user, session)
+    assert exc.value.status_code == 400
@@ -0,0 +1,107 @@
+"""
+GET /products: query params lọc/sắp xếp/phân trang qua HTTP, cache sau khi đổi danh mục
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import select
+
+from app.core.cache import shared_cache
+from app.core.database import get_read_session
+from app.core.image_pipeline import image_pipeline
+from app.models import Category, CategoryIn, ProductDetailIn
+from app.repositories.category_repository import AsyncCategoryRepository, CategoryRepository
+from app.repositories.product_repository import AsyncProductRepository, ProductRepository
+from app.routers.product_router import productRouter
+from app.services.category_service import CategoryService
+from app.services.product_service import ProductService
+from app.utils.search_index import suggest_index
+
+
+@pytest.fixture(autouse=True)
+def clear_shared_cache():
+    shared_cache.clear()
+    yield
+    shared_cache.clear()
+
+
+@pytest.fixture
+def client(session):
+    app = FastAPI()
+    app.include_router(productRouter)
+    app.dependency_overrides[get_read_session] = lambda: session
+    return TestClient(app)
+
+
+@pytest.fixture
+def catalog(session):
+    category = Category(name="Áo")
+    session.add(category)
+    session.commit()
+    service = ProductService(ProductRepository(), AsyncProductRepository(), image_pipeline)
+    products = {}
+    for name, price, color, stock in [
+        ("Áo đỏ", "100.000", "red", 5),
+        ("Áo xanh", "250.000", "blue", 0),
+        ("Áo đen", "400.000", "black", 2),
+    ]:
+        result = service.create_product(session, name, None, price, category.id, [])
+        product_id = result["payload"]["product"]["id"]
+        service.add_product_detail(
+            product_id, ProductDetailIn(color=color, size="M", stock=stock), session
+        )
+        products[name] = product_id
+    return products
+
+
+def names(response) -> list:
+    assert response.status_code == 200, response.json()
+    return [product["name"] for product in response.json()["data"]]
+
+
+def test_list_without_filters(client, catalog):
+    response = client.get("/products")
+
+    assert sorted(names(response)) == sorted(catalog)
+    facets = response.json()["facets"]
+    assert {c["value"] for c in facets["colors"]} == {"red", "blue", "black"}
+
+
+@pytest.mark.parametrize(
+    "params, expected",
+    [
+        ({"min_price": 200000}, ["Áo xanh", "Áo đen"]),
+        ({"max_price": 300000, "sort": "price_desc"}, ["Áo xanh", "Áo đỏ"]),
+        ({"color": "red"}, ["Áo đỏ"]),
+        ({"in_stock": True, "sort": "price_asc"}, ["Áo đỏ", "Áo đen"]),
+        ({"sort": "price_desc", "limit": 2}, ["Áo đen", "Áo xanh"]),
+    ],
+)
+def test_list_with_filters(client, catalog, params, expected):
+    response = client.get("/products", params=params)
+
+    result = names(response)
+    if "sort" in params:
+        assert result == expected
+    else:
+        assert sorted(result) == sorted(expected)
+
+
+def test_invalid_filter_is_422(client, catalog):
+    assert client.get("/products", params={"min_price": -1}).status_code == 422
+
+
+def test_category_rename_refreshes_cached_lists_and_suggest(client, catalog, session, monkeypatch):
+    monkeypatch.setattr(suggest_index, "position", None)  # index toàn cục: dựng lại cho DB test
+    category = session.exec(select(Category)).one()
+    product_service = ProductService(ProductRepository(), AsyncProductRepository(), image_pipeline)
+    assert {p["category_name"] for p in client.get("/products").json()["data"]} == {"Áo"}
+    assert product_service.suggest("ao", session)["data"][0]["label"] == "Áo"
+
+    CategoryService(CategoryRepository(), AsyncCategoryRepository()).update_category(
+        category.id, CategoryIn(name="Áo nam"), session
+    )
+
+    assert {p["category_name"] for p in client.get("/products").json()["data"]} == {"Áo nam"}
+    labels = [s["label"] for s in product_service.suggest("ao", session)["data"]]
+    assert "Áo nam" in labels and "Áo" not in labels
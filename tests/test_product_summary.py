@@ -0,0 +1,67 @@
+"""
+product_summary (read model): cập nhật cùng transaction với bảng gốc
+"""
+from sqlmodel import select
+
+from app.core.image_pipeline import image_pipeline
+from app.models import Category, Product, ProductDetailIn, ProductSummary
+from app.repositories.product_repository import AsyncProductRepository, ProductRepository
+from app.scripts.backfill_price import backfill_price_vnd
+from app.services.product_service import ProductService
+
+
+def make_service() -> ProductService:
+    return ProductService(ProductRepository(), AsyncProductRepository(), image_pipeline)
+
+
+def add_category(session) -> Category:
+    category = Category(name="Áo")
+    session.add(category)
+    session.commit()
+    return category
+
+
+def test_product_and_detail_writes_refresh_summary(session):
+    category = add_category(session)
+    service = make_service()
+
+    result = service.create_product(session, "Áo thun", "cotton", "150.000", category.id, [])
+    product_id = result["payload"]["product"]["id"]
+    service.add_product_detail(product_id, ProductDetailIn(color="đỏ", size="M", stock=7), session)
+
+    summary = session.get(ProductSummary, product_id)
+    session.refresh(summary)
+    assert summary.price_vnd == 150000
+    assert summary.category_name == "Áo"
+    assert summary.total_stock == 7
+    assert summary.variant_count == 1
+
+
+def test_refresh_summary_is_part_of_the_caller_transaction(session):
+    category = add_category(session)
+    repository = ProductRepository()
+    product = repository.create(
+        session, Product(name="Quần", price="200000", category_id=category.id)
+    )
+    repository.refresh_summary(product.id, session)
+
+    session.rollback()
+
+    assert session.exec(select(Product)).all() == []
+    assert session.exec(select(ProductSummary)).all() == []
+
+
+def test_backfill_price_updates_summary(session):
+    category = add_category(session)
+    product = Product(name="Giày", price="1.250.000", category_id=category.id)
+    session.add(product)
+    session.flush()
+    ProductRepository().refresh_summary(product.id, session)
+    session.commit()
+    assert session.get(ProductSummary, product.id).price_vnd is None
+
+    assert backfill_price_vnd(session) == 1
+
+    session.expire_all()
+    assert session.get(Product, product.id).price_vnd == 1250000
+    assert session.get(ProductSummary, product.id).price_vnd == 1250000
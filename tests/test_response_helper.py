@@ -0,0 +1,22 @@
+"""
+ORJSONResponse phải cho ra cùng JSON với JSONResponse + jsonable_encoder (đường cũ)
+"""
+import json
+
+from app.scripts.bench_serialization import build_payload, render_json, render_orjson
+
+
+def test_orjson_response_matches_json_response():
+    payload = build_payload(items=20)
+
+    assert json.loads(render_orjson(payload)) == json.loads(render_json(payload))
+
+
+def test_orjson_response_keeps_unicode_and_uuid_format():
+    payload = build_payload(items=1)
+    product = payload["payload"]["data"][0]
+
+    body = render_orjson(payload).decode()
+    assert str(product["product_id"]) in body
+    assert product["create_at"].isoformat() in body
+    assert product["category_name"] in body
@@ -0,0 +1,148 @@
+"""
+Index tìm kiếm trong process: xếp hạng, cập nhật từng phần và đồng bộ giữa các worker qua change log
+"""
+from uuid import uuid4
+
+import fakeredis
+import pytest
+
+from app.core.change_log import MemoryChangeLog, RedisChangeLog
+from app.core.image_pipeline import image_pipeline
+from app.models import Category, ProductIn
+from app.repositories.product_repository import AsyncProductRepository, ProductRepository
+from app.services.product_service import ProductService
+from app.utils.search_index import (
+    SHORT_PREFIX_TOP,
+    InvertedIndex,
+    SuggestIndex,
+    suggest_index,
+)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def log(request):
+    if request.param == "memory":
+        return MemoryChangeLog(maxlen=100)
+    return RedisChangeLog(prefix="test:", maxlen=100, client=fakeredis.FakeRedis())
+
+
+def fail_load():
+    raise AssertionError("không được dựng lại toàn bộ index")
+
+
+def test_inverted_index_requires_every_term_and_ranks_name_first():
+    in_name, in_description, partial = uuid4(), uuid4(), uuid4()
+    index = InvertedIndex("test", MemoryChangeLog())
+    index.build(
+        [
+            (in_name, "Áo thun đỏ", None),
+            (in_description, "Áo sơ mi", "màu đỏ, thun co giãn"),
+            (partial, "Áo khoác", None),
+        ]
+    )
+
+    ranked = [doc_id for doc_id, _ in index.search("ao thun do")]
+    assert ranked == [in_name, in_description]
+
+
+def test_write_in_another_worker_is_applied_as_delta(log):
+    # 2 instance cùng tên = cùng index ở 2 worker, chung change log
+    doc_id = uuid4()
+    worker_a, worker_b = InvertedIndex("products", log), InvertedIndex("products", log)
+    worker_a.sync(lambda: [(doc_id, "Áo thun", None)])
+    worker_b.sync(lambda: [(doc_id, "Áo thun", None)])
+
+    worker_b.publish_upsert(doc_id, "Quần jean", None)
+    worker_a.sync(fail_load)
+
+    assert worker_a.search("ao") == []
+    assert [d for d, _ in worker_a.search("quan jean")] == [doc_id]
+
+    worker_b.publish_remove(doc_id)
+    worker_a.sync(fail_load)
+    assert worker_a.search("quan") == []
+
+
+def test_index_rebuilds_when_log_was_trimmed_past_its_position():
+    log = MemoryChangeLog(maxlen=2)
+    index = SuggestIndex("suggest", log)
+    index.sync(lambda: [])
+    for i in range(3):
+        index.publish_upsert("product", uuid4(), f"Áo {i}")
+
+    rebuilt = ("product", uuid4(), "Áo từ DB")
+    index.sync(lambda: [rebuilt])
+
+    assert [s["label"] for s in index.suggest("ao")] == ["Áo từ DB"]
+
+
+def test_suggest_ranks_every_prefix_match():
+    index = SuggestIndex("test", MemoryChangeLog())
+    # Nhiều tên khớp "ao" ở vị trí từ thứ 2 đứng trước (alphabet) tên khớp ngay từ đầu
+    entries = [("product", uuid4(), f"Aa ao mau {i:02d}") for i in range(60)]
+    best = ("category", uuid4(), "Áo xuân")
+    entries.append(best)
+    index.build(entries)
+
+    for prefix in ("a", "ao", "ao x"):
+        suggestions = index.suggest(prefix, limit=3)
+        assert suggestions[0] == {"type": "category", "id": best[1], "label": "Áo xuân"}
+    assert len(index.suggest("ao", limit=3)) == 3
+
+
+def brute_force(entries, prefix, limit):
+    """Xếp hạng tham chiếu: quét mọi tên"""
+    ranked = []
+    for kind, entry_id, label in entries.values():
+        words = label.lower().split()
+        positions = [i for i in range(len(words)) if " ".join(words[i:]).startswith(prefix)]
+        if positions:
+            ranked.append((positions[0], len(label), label, kind, entry_id))
+    return [label for _, _, label, _, _ in sorted(ranked)[:limit]]
+
+
+def test_incremental_updates_match_full_ranking():
+    index = SuggestIndex("test", MemoryChangeLog())
+    entries = {}
+    for i in range(SHORT_PREFIX_TOP + 30):
+        entry = ("product", uuid4(), f"ba {'x' * (i % 7)} m{i}")
+        entries[entry[1]] = entry
+    index.build(entries.values())
+    index.suggest("ba x", limit=50)  # prefix dài: top-k vào LRU, từ đây cập nhật từng phần
+
+    # Xóa các mục top của "b" (danh sách top-k phải tự tính lại), đổi tên, thêm mới
+    for entry_id in [e[1] for e in sorted(entries.values(), key=lambda e: len(e[2]))[:60]]:
+        index.remove("product", entry_id)
+        del entries[entry_id]
+    renamed = next(iter(entries))
+    entries[renamed] = ("product", renamed, "b")
+    index.upsert(*entries[renamed])
+    added = ("category", uuid4(), "ba x")
+    entries[added[1]] = added
+    index.upsert(*added)
+
+    for prefix in ("b", "ba", "ba x", "m1"):
+        assert [s["label"] for s in index.suggest(prefix, limit=50)] == brute_force(
+            entries, prefix, 50
+        )
+
+
+def test_product_writes_reach_suggest_without_rebuild(session, monkeypatch):
+    monkeypatch.setattr(suggest_index, "position", None)  # index toàn cục: dựng lại cho DB test
+    category = Category(name="Danh mục")
+    session.add(category)
+    session.commit()
+    service = ProductService(ProductRepository(), AsyncProductRepository(), image_pipeline)
+    assert service.suggest("ao", session)["data"] == []
+
+    monkeypatch.setattr(service.repository, "get_suggest_entries", fail_load)
+    created = service.create_product(session, "Áo len", None, "100.000", category.id, [])
+    product_id = created["payload"]["product"]["id"]
+    assert [s["label"] for s in service.suggest("ao", session)["data"]] == ["Áo len"]
+
+    service.update_product(product_id, ProductIn.model_construct(name="Quần len"), session)
+    assert service.suggest("ao", session)["data"] == []
+    assert [s["label"] for s in service.suggest("len", session)["data"]] == ["Quần len"]
+
+    service.delete_product(product_id, session)
+    assert service.suggest("quan", session)["data"] == []